@@ -0,0 +1,405 @@
+"""Headless JSON API over the tracker's task store
+
+Serves the same data layer as the Streamlit UI (tracker_data.py), so both
+can run side by side on one SQLite file:
+
+    uvicorn api:app --port 8000
+    python api.py --port 8000 --workers 4
+
+Requests use HTTP Basic auth with the tracker's users: admins can write,
+report users can only read. Reads send a weak ETag derived from the data
+version and answer If-None-Match with 304 without running the query.
+
+    GET    /api/health
+    GET    /api/interns
+    GET    /api/interns/{intern}/tasks?limit=&after=&search=&order=day|rank&day_from=&day_to=
+    GET    /api/interns/{intern}/tasks/recent?date=YYYY-MM-DD&limit=
+    GET    /api/interns/{intern}/stats?period=month|week
+    PUT    /api/interns/{intern}/tasks/{YYYY-MM-DD}    {"task": "..."}
+    PATCH  /api/interns/{intern}/tasks/{id}            {"task": "..."}
+    DELETE /api/interns/{intern}/tasks/{id}
+    POST   /api/interns/{intern}/tasks/batch           {"tasks": [{"date": "...", "task": "..."}]}
+    GET    /api/interns/{intern}/sync?since=&limit=
+    POST   /api/interns/{intern}/sync                  {"changes": [{"kind", "key", "value", "deleted", "base", "updated_at"}]}
+
+The sync endpoints let the IndexedDB client (script.js) pull what changed
+since its cursor and push edits made offline. Browsers on other origins
+are allowed through CORS, set with API_CORS_ORIGINS (comma separated).
+"""
+import argparse
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import os
+from datetime import date
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
+
+import tracker_data as tracker
+
+# ---------------- CONFIG ----------------
+API_MAX_PAGE_SIZE = 200
+API_MAX_BATCH = 1000  # tasks per batch request
+API_WRITE_BATCH_SIZE = 64  # single saves grouped into one transaction
+API_WRITE_BATCH_WAIT = 0.002  # seconds the first save waits for others to join its transaction
+API_CORS_ORIGINS = [origin.strip() for origin in os.environ.get("API_CORS_ORIGINS", "*").split(",") if origin.strip()]
+
+# ---------------- RESPONSES ----------------
+def json_response(payload, status_code=200, headers=None):
+    """Compact JSON response"""
+    body = json.dumps(payload, default=str, separators=(",", ":"))
+    return Response(body, status_code, headers, media_type="application/json")
+
+async def error_response(request, exc):
+    """Errors as {"error": detail} JSON"""
+    return json_response({"error": exc.detail}, exc.status_code, getattr(exc, "headers", None))
+
+def make_etag(*parts):
+    """Weak ETag of the values a response depends on"""
+    digest = hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def etag_matches(request, etag):
+    """Check If-None-Match against an ETag"""
+    header = request.headers.get("if-none-match", "")
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+async def conditional_get(request, intern_id, build):
+    """Answer a read with an ETag, or 304 if the client's copy is current
+
+    The ETag comes from the intern's data version, start date and today's
+    date (streaks and gaps move daily), so a match skips the query
+    entirely. The data version is read from the database itself (the
+    change log's epoch and sequence number), so tags stay valid across
+    restarts and between workers and change with any write. Unversioned
+    stores hash the built response instead.
+    """
+    backend = tracker.get_backend()
+    version = await run_in_threadpool(backend.data_version, intern_id)
+    if version is not None:
+        start_date = await run_in_threadpool(tracker.get_setting, "start_date", intern_id)
+        etag = make_etag(version, start_date, date.today(), request.url.path, str(request.query_params))
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        payload = await run_in_threadpool(build)
+    else:
+        payload = await run_in_threadpool(build)
+        etag = make_etag(payload)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+    return json_response(payload, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+# ---------------- REQUEST HELPERS ----------------
+def authenticate(request, write=False):
+    """Check HTTP Basic credentials; writes need the admin role"""
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    try:
+        username, _, password = base64.b64decode(credentials).decode("utf-8").partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        username = password = ""
+    user = tracker.authenticate_user(username, password) if scheme.lower() == "basic" and username else None
+    if not user:
+        raise HTTPException(401, "Authentication required", {"WWW-Authenticate": 'Basic realm="tracker"'})
+    if write and user["role"] != "admin":
+        raise HTTPException(403, "Only admins can change tasks")
+    return user
+
+async def get_intern(request, write=False):
+    """Authenticate and get the intern ID from the path, 404 if unknown"""
+    await run_in_threadpool(authenticate, request, write)
+    intern_id = request.path_params["intern_id"]
+    interns = await run_in_threadpool(tracker.get_interns)
+    if not any(intern["intern_id"] == intern_id for intern in interns):
+        raise HTTPException(404, f"Unknown intern: {intern_id}")
+    return intern_id
+
+def int_param(request, name, default, minimum=None, maximum=None):
+    """Read an integer query parameter, clamped to the given bounds"""
+    value = request.query_params.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise HTTPException(400, f"{name} must be an integer")
+    if minimum is not None:
+        value = max(value, minimum)
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD date, 400 if invalid"""
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(400, f"Invalid date: {value!r}, expected YYYY-MM-DD")
+
+async def read_task_text(request):
+    """Read the {"task": "..."} body of a write"""
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(400, "Body must be JSON")
+    task_text = body.get("task") if isinstance(body, dict) else None
+    if not isinstance(task_text, str) or not task_text.strip():
+        raise HTTPException(400, 'Body must be {"task": "<non-empty text>"}')
+    return task_text.strip()
+
+def parse_cursor(value):
+    """Turn an `after` parameter back into a report cursor"""
+    if not value:
+        return None
+    try:
+        if "," in value:
+            rank, day_number = value.split(",", 1)
+            return float(rank), int(day_number)
+        return int(value)
+    except ValueError:
+        raise HTTPException(400, f"Invalid cursor: {value!r}")
+
+def format_cursor(cursor):
+    """Turn a report cursor into an `after` parameter"""
+    if isinstance(cursor, tuple):
+        return f"{cursor[0]!r},{cursor[1]}"
+    return str(cursor)
+
+def call_in_transaction(call, *args, **kwargs):
+    """Run a single write in a transaction, so its errors are raised rather than only reported"""
+    with tracker.get_backend().transaction():
+        return call(*args, **kwargs)
+
+async def run_write(call, *args, **kwargs):
+    """Run a data-layer write, 503 if the database refused it"""
+    backend = tracker.get_backend()
+    try:
+        return await run_in_threadpool(call, *args, **kwargs)
+    except backend.errors as e:
+        raise HTTPException(503, f"Database error: {str(e)}")
+
+# ---------------- GROUPED WRITES ----------------
+def save_tasks(rows):
+    """Save (intern_id, date, task) rows in one transaction
+
+    Returns "saved"/"updated" per row. If the transaction fails, the rows
+    are retried one by one so only the failing ones get their error back.
+    """
+    backend = tracker.get_backend()
+    try:
+        with backend.transaction():
+            return [tracker.save_or_update_task(task_date, task_text, intern_id)[0] for intern_id, task_date, task_text in rows]
+    except backend.errors as e:
+        if len(rows) == 1:
+            return [e]
+    return [save_tasks([row])[0] for row in rows]
+
+class WriteBatcher:
+    """Group single-task saves arriving together into one transaction
+
+    The first save of a batch waits API_WRITE_BATCH_WAIT seconds for others
+    to join, then the whole batch commits at once, which keeps the writer
+    lock and commit overhead per batch rather than per request.
+    """
+
+    def __init__(self, max_size=API_WRITE_BATCH_SIZE, wait=API_WRITE_BATCH_WAIT):
+        self.max_size = max_size
+        self.wait = wait
+        self.pending = []  # (row, future)
+        self.flusher = None
+
+    async def save(self, intern_id, task_date, task_text):
+        """Queue a save and wait for its batch, returning "saved" or "updated" """
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(((intern_id, task_date, task_text), future))
+        if self.flusher is None:
+            self.flusher = asyncio.create_task(self.flush())
+        result = await future
+        if isinstance(result, Exception):
+            raise HTTPException(503, f"Database error: {str(result)}")
+        return result
+
+    async def flush(self):
+        """Write pending saves in batches until none are left"""
+        try:
+            await asyncio.sleep(self.wait)
+            while self.pending:
+                batch, self.pending = self.pending[:self.max_size], self.pending[self.max_size:]
+                try:
+                    results = await run_in_threadpool(save_tasks, [row for row, _ in batch])
+                except Exception as e:
+                    results = [e] * len(batch)
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            self.flusher = None
+
+write_batcher = WriteBatcher()
+
+# ---------------- ENDPOINTS ----------------
+async def health(request):
+    backend = tracker.get_backend()
+    return json_response({"status": "ok", "backend": backend.label, "persistent": backend.persistent})
+
+async def list_interns(request):
+    await run_in_threadpool(authenticate, request)
+    interns = await run_in_threadpool(tracker.get_interns)
+    return json_response({"interns": interns})
+
+async def list_tasks(request):
+    """One page of the intern's numbered tasks, by day or by search rank"""
+    intern_id = await get_intern(request)
+    limit = int_param(request, "limit", tracker.DEFAULT_REPORT_PAGE_SIZE, 1, API_MAX_PAGE_SIZE)
+    after = parse_cursor(request.query_params.get("after"))
+    search_term = request.query_params.get("search", "").strip()
+    order = request.query_params.get("order", "day")
+    if order not in ("day", "rank"):
+        raise HTTPException(400, "order must be day or rank")
+    day_range = (
+        int_param(request, "day_from", 1, 1),
+        int_param(request, "day_to", tracker.TOTAL_DAYS, 1)
+    )
+
+    def build():
+        tasks, has_more = tracker.get_report_page(day_range, search_term, after, limit, order, intern_id)
+        return {
+            "tasks": tasks,
+            "total": tracker.count_report_tasks(day_range, search_term, intern_id),
+            "next": format_cursor(tracker.report_cursor(tasks[-1], order)) if has_more else None
+        }
+    return await conditional_get(request, intern_id, build)
+
+async def recent_tasks(request):
+    """The latest tasks, optionally only those on one date"""
+    intern_id = await get_intern(request)
+    filter_date = parse_date(request.query_params["date"]) if request.query_params.get("date") else None
+    limit = int_param(request, "limit", 20, 1, API_MAX_PAGE_SIZE)
+    return await conditional_get(request, intern_id, lambda: {
+        "tasks": tracker.get_tasks_with_filter(filter_date, limit, intern_id)
+    })
+
+async def task_stats(request):
+    """Task counts, day range, streaks, missed days and per-period counts"""
+    intern_id = await get_intern(request)
+    period_type = request.query_params.get("period", "month")
+    if period_type not in tracker.PERIOD_FORMATS:
+        raise HTTPException(400, "period must be month or week")
+    return await conditional_get(request, intern_id, lambda: {
+        "stats": tracker.get_task_stats(intern_id),
+        "periods": tracker.get_period_counts(period_type, intern_id),
+        "gaps": tracker.get_gap_reports([intern_id]).get(intern_id)
+    })
+
+async def save_task(request):
+    """Save or replace the task on a date"""
+    intern_id = await get_intern(request, write=True)
+    task_date = parse_date(request.path_params["task_date"])
+    task_text = await read_task_text(request)
+    action = await write_batcher.save(intern_id, task_date, task_text)
+    return json_response({"date": task_date, "action": action}, 200 if action == "updated" else 201)
+
+async def update_task(request):
+    """Change the text of a task by ID"""
+    intern_id = await get_intern(request, write=True)
+    task_text = await read_task_text(request)
+    task_id = request.path_params["task_id"]
+    if not await run_write(call_in_transaction, tracker.update_task, task_id, task_text, intern_id):
+        raise HTTPException(404, f"Unknown task: {task_id}")
+    return Response(status_code=204)
+
+async def delete_task(request):
+    """Delete a task by ID"""
+    intern_id = await get_intern(request, write=True)
+    task_id = request.path_params["task_id"]
+    if not await run_write(call_in_transaction, tracker.delete_task, task_id, intern_id):
+        raise HTTPException(404, f"Unknown task: {task_id}")
+    return Response(status_code=204)
+
+async def save_task_batch(request):
+    """Validate, deduplicate and upsert many tasks in one transaction"""
+    intern_id = await get_intern(request, write=True)
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(400, "Body must be JSON")
+    records = body.get("tasks") if isinstance(body, dict) else None
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise HTTPException(400, 'Body must be {"tasks": [{"date": "YYYY-MM-DD", "task": "..."}]}')
+    if len(records) > API_MAX_BATCH:
+        raise HTTPException(413, f"At most {API_MAX_BATCH} tasks per batch")
+    result = await run_write(tracker.import_tasks, records, intern_id)
+    return json_response(result, 200 if not result["rejected"] else 207)
+
+async def pull_changes(request):
+    """Tasks and settings changed after the client's cursor"""
+    intern_id = await get_intern(request)
+    since = int_param(request, "since", 0, 0)
+    limit = int_param(request, "limit", tracker.SYNC_PAGE_SIZE, 1, tracker.SYNC_PAGE_SIZE)
+    try:
+        result = await run_write(tracker.get_sync_changes, since, limit, intern_id)
+    except NotImplementedError as e:
+        raise HTTPException(501, str(e))
+    return json_response(result)
+
+async def push_changes(request):
+    """Apply a client's offline changes; losing ones come back as conflicts"""
+    intern_id = await get_intern(request, write=True)
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(400, "Body must be JSON")
+    changes = body.get("changes") if isinstance(body, dict) else None
+    if not isinstance(changes, list):
+        raise HTTPException(400, 'Body must be {"changes": [...]}')
+    if len(changes) > API_MAX_BATCH:
+        raise HTTPException(413, f"At most {API_MAX_BATCH} changes per push")
+    try:
+        result = await run_write(tracker.push_sync_changes, changes, intern_id)
+    except NotImplementedError as e:
+        raise HTTPException(501, str(e))
+    return json_response(result)
+
+app = Starlette(
+    routes=[
+        Route("/api/health", health),
+        Route("/api/interns", list_interns),
+        Route("/api/interns/{intern_id}/tasks", list_tasks),
+        Route("/api/interns/{intern_id}/tasks/recent", recent_tasks),
+        Route("/api/interns/{intern_id}/tasks/batch", save_task_batch, methods=["POST"]),
+        Route("/api/interns/{intern_id}/tasks/{task_id:int}", update_task, methods=["PATCH"]),
+        Route("/api/interns/{intern_id}/tasks/{task_id:int}", delete_task, methods=["DELETE"]),
+        Route("/api/interns/{intern_id}/tasks/{task_date}", save_task, methods=["PUT"]),
+        Route("/api/interns/{intern_id}/stats", task_stats),
+        Route("/api/interns/{intern_id}/sync", pull_changes),
+        Route("/api/interns/{intern_id}/sync", push_changes, methods=["POST"]),
+    ],
+    middleware=[
+        Middleware(
+            CORSMiddleware, allow_origins=API_CORS_ORIGINS, allow_methods=["*"],
+            allow_headers=["Authorization", "Content-Type", "If-None-Match"], expose_headers=["ETag"]
+        )
+    ],
+    exception_handlers={HTTPException: error_response}
+)
+
+def main(argv=None):
+    """Serve the API with uvicorn"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on (default: 8000)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: 1)")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Benchmark the tracker's data paths outside Streamlit
+
+Seeds a fresh SQLite database with synthetic interns and tasks, then
+times the core functions of tracker_data and reports throughput, p50/p95
+latency and peak memory for each one:
+
+    python benchmark.py --interns 20 --days 548 --task-words 40
+    python benchmark.py --json results.json
+    python benchmark.py --baseline results.json   # compare with an earlier run
+"""
+import argparse
+import json
+import logging
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import nullcontext
+from datetime import date, timedelta
+from pathlib import Path
+
+import tracker_data as tracker
+
+WORDS = (
+    "reviewed fixed implemented tested deployed documented refactored designed "
+    "meeting api database sqlite python streamlit frontend backend dashboard report "
+    "export import login cache index query bug feature sprint standup client "
+    "analysis chart migration schema performance security review training"
+).split()
+SEARCH_TERMS = ["sqlite", "dashboard report", '"fixed bug"']
+
+def synthetic_task(rng, words):
+    """Random task text of roughly the given number of words"""
+    return " ".join(rng.choice(WORDS) for _ in range(max(1, int(rng.gauss(words, words / 4)))))
+
+def seed_database(backend, interns, days, task_words, fill, seed):
+    """Create interns with a start date and a task on a `fill` share of their days"""
+    rng = random.Random(seed)
+    start_date = date.today() - timedelta(days=days - 1)
+    intern_ids = []
+    for index in range(interns):
+        intern_id = f"bench_{index:04d}"
+        backend.add_intern(intern_id, f"Bench Intern {index}")
+        backend.save_setting(intern_id, "start_date", start_date.isoformat())
+        rows = []
+        for offset in range(days):
+            if rng.random() < fill:
+                task_date = start_date + timedelta(days=offset)
+                rows.append((
+                    task_date.isoformat(), synthetic_task(rng, task_words),
+                    offset + 1, tracker.format_task_date(task_date.isoformat())
+                ))
+        if rows:
+            backend.upsert_tasks(intern_id, rows)
+        intern_ids.append(intern_id)
+    return start_date, intern_ids
+
+def result_size(result):
+    """Rows or bytes produced by a call, for the report"""
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if result is None:
+        return 0
+    return len(result) if hasattr(result, "__len__") else 1
+
+def run_benchmark(name, call, repeat, warmup, cold, backend):
+    """Time repeated calls, then measure peak memory of one traced call"""
+    for _ in range(warmup):
+        call()
+    
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        if cold:
+            backend.manager.query_cache.invalidate()
+        started = time.perf_counter()
+        result = call()
+        timings.append(time.perf_counter() - started)
+        size = result_size(result)
+    
+    if cold:
+        backend.manager.query_cache.invalidate()
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    timings.sort()
+    return {
+        "name": name,
+        "calls": repeat,
+        "size": size,
+        "p50_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "throughput": repeat / sum(timings) if sum(timings) else float("inf"),
+        "peak_kib": peak / 1024
+    }
+
+def build_benchmarks(intern_id, start_date, days, task_words, seed):
+    """Named zero-argument calls of each data path"""
+    rng = random.Random(seed + 1)
+    day_range = (1, days)
+    
+    def save_task():
+        task_date = start_date + timedelta(days=rng.randrange(days))
+        return tracker.save_or_update_task(task_date, synthetic_task(rng, task_words), intern_id=intern_id)
+    
+    benchmarks = [
+        ("save_or_update_task", save_task),
+        ("get_tasks_sorted_by_day", lambda: tracker.get_tasks_sorted_by_day(intern_id=intern_id)),
+        ("get_tasks_with_filter", lambda: tracker.get_tasks_with_filter(limit=20, intern_id=intern_id)),
+        ("get_tasks_with_filter(date)", lambda: tracker.get_tasks_with_filter(
+            start_date + timedelta(days=rng.randrange(days)), intern_id=intern_id
+        )),
+        ("get_task_stats", lambda: tracker.get_task_stats(intern_id)),
+        ("get_tasks_for_download", lambda: tracker.get_tasks_for_download(intern_id=intern_id)),
+        ("create_csv_download", lambda: tracker.create_csv_download(intern_id)),
+        ("create_excel_download", lambda: tracker.create_excel_download(intern_id)),
+        ("get_gap_reports(all)", lambda: tracker.get_gap_reports()),
+    ]
+    for term in SEARCH_TERMS:
+        benchmarks.append((f"search {term}", lambda term=term: (
+            tracker.count_report_tasks(day_range, term, intern_id=intern_id),
+            tracker.get_report_page(day_range, term, intern_id=intern_id)[0]
+        )[1]))
+        benchmarks.append((f"search {term} (rank)", lambda term=term: tracker.get_report_page(
+            day_range, term, order="rank", intern_id=intern_id
+        )[0]))
+    return benchmarks
+
+def check_search_plan(backend, intern_id):
+    """Exit if report searches stop driving the join from the full-text index
+    
+    With the tasks table as the outer loop, SQLite reruns the MATCH for
+    every task and a day-ordered search grows quadratic with the log.
+    """
+    from_clause, conditions, params, searched = tracker.report_query_parts(
+        backend.manager, (1, tracker.TOTAL_DAYS), SEARCH_TERMS[0], intern_id
+    )
+    if not searched:
+        return
+    plan = [
+        row[3] for row in backend.manager.writer.execute(
+            f"EXPLAIN QUERY PLAN SELECT tasks.id FROM {from_clause} "
+            f"WHERE {' AND '.join(conditions)} ORDER BY tasks.day_number",
+            params
+        )
+    ]
+    if not plan[0].startswith("SCAN tasks_fts"):
+        sys.exit("benchmark: report search does not start from tasks_fts:\n  " + "\n  ".join(plan))
+
+def print_results(results, baseline=None):
+    """Print a results table, with the p50 change against a baseline run"""
+    previous = {result["name"]: result for result in (baseline or {}).get("results", [])}
+    header = f"{'benchmark':32} {'calls':>6} {'size':>8} {'p50 ms':>9} {'p95 ms':>9} {'ops/s':>9} {'peak KiB':>9}"
+    if previous:
+        header += f" {'p50 vs base':>12}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        line = (
+            f"{result['name'][:32]:32} {result['calls']:>6} {result['size']:>8} "
+            f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['throughput']:>9.1f} "
+            f"{result['peak_kib']:>9.1f}"
+        )
+        if result["name"] in previous and previous[result["name"]]["p50_ms"]:
+            change = result["p50_ms"] / previous[result["name"]]["p50_ms"] - 1
+            line += f" {change:>+11.1%}"
+        print(line)
+
+def parse_args(argv=None):
+    """Parse the command line"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interns", type=int, default=10, help="interns to seed (default: 10)")
+    parser.add_argument("--days", type=int, default=548, help="days in each intern's log (default: 548)")
+    parser.add_argument("--task-words", type=int, default=30, help="average words per task (default: 30)")
+    parser.add_argument("--fill", type=float, default=0.9, help="share of days with a task (default: 0.9)")
+    parser.add_argument("--repeat", type=int, default=30, help="timed calls per benchmark (default: 30)")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed calls first (default: 2)")
+    parser.add_argument("--warm-cache", action="store_true", help="keep the query cache between calls")
+    parser.add_argument("--only", action="append", default=[], help="run benchmarks whose name contains this")
+    parser.add_argument("--seed", type=int, default=1, help="random seed (default: 1)")
+    parser.add_argument("--workdir", help="directory for the database, created if missing (default: a temporary one, removed afterwards)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare with results written by an earlier --json run")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Seed a database, run the benchmarks and report them"""
+    args = parse_args(argv)
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    json_path = Path(args.json).resolve() if args.json else None
+    
+    logging.basicConfig(level=logging.WARNING)
+    # A given workdir is kept; the default temporary one is removed afterwards
+    workdir_context = nullcontext(args.workdir) if args.workdir else tempfile.TemporaryDirectory(prefix="tracker_bench_")
+    with workdir_context as workdir_name:
+        workdir = Path(workdir_name)
+        workdir.mkdir(parents=True, exist_ok=True)
+        if (workdir / "benchmark.db").exists():
+            sys.exit(f"benchmark: {workdir} already has a benchmark.db; remove it or pick another --workdir")
+        backend = tracker.connect_sqlite(str(workdir / "benchmark.db"))
+        if backend is None:
+            sys.exit("benchmark: could not open the SQLite database")
+        tracker.set_backend(backend)
+        
+        started = time.perf_counter()
+        start_date, intern_ids = seed_database(
+            backend, args.interns, args.days, args.task_words, args.fill, args.seed
+        )
+        print(
+            f"Seeded {args.interns} interns x {args.days} days ({args.task_words} words/task) "
+            f"in {time.perf_counter() - started:.2f}s at {workdir}"
+        )
+        
+        check_search_plan(backend, intern_ids[0])
+        benchmarks = build_benchmarks(intern_ids[0], start_date, args.days, args.task_words, args.seed)
+        if args.only:
+            benchmarks = [(name, call) for name, call in benchmarks if any(part in name for part in args.only)]
+        results = [
+            run_benchmark(name, call, args.repeat, args.warmup, not args.warm_cache, backend)
+            for name, call in benchmarks
+        ]
+        print_results(results, baseline)
+        print(f"Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+        
+        if json_path:
+            json_path.write_text(json.dumps({
+                "settings": {key: value for key, value in vars(args).items() if key not in ("json", "baseline")},
+                "python": sys.version.split()[0],
+                "results": results
+            }, indent=2))
+
+if __name__ == "__main__":
+    main()
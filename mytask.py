@@ -1,101 +1,32 @@
 import streamlit as st
-from datetime import date, timedelta, datetime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from datetime import date, timedelta
 import pandas as pd
-import io
-import csv
-import sqlite3
-from pathlib import Path
+import json
+from tracker_data import (
+    DEFAULT_INTERN, DEFAULT_REPORT_PAGE_SIZE, IMPORT_FILE_TYPES, PROFILE_LOG_FILE, TOTAL_DAYS,
+    SQLiteBackend, get_backend, set_intern_resolver, set_message_handler, log_message, profiled, rerun_profile,
+    get_interns, add_intern, check_date_exists, save_or_update_task, update_task, delete_task,
+    get_task_stats, get_task_count, get_period_counts, get_report_bounds,
+    count_report_tasks, get_report_page, report_cursor, get_tasks_with_filter, get_setting,
+    save_setting, authenticate_user, compute_analytics, get_gap_reports, read_import_file, import_tasks,
+    list_backups, submit_job, get_job, cancel_job, list_jobs, read_job_result
+)
 
 # ---------------- CONFIG ----------------
-TOTAL_DAYS = 548
-# User credentials
-USERS = {
-    "admin": "admin@asmath",  # Full admin access
-    "admin2": "admin@AHBETA"  # Report-only access
-}
-
-# SQLite Database File
-DB_FILE = "internship_tracker.db"
+# Storage, exports and statistics are configured in tracker_data.py
 
-# ---------------- SQLITE DATABASE FUNCTIONS ----------------
-@st.cache_resource
-def get_db_connection():
-    """Establish SQLite connection"""
-    try:
-        conn = sqlite3.connect(DB_FILE, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
-        create_tables(conn)
-        st.success("✅ Connected to SQLite Database!")
-        return conn
-    except Exception as e:
-        st.error(f"❌ Database Connection Failed: {str(e)}")
-        st.info("⚠️ Falling back to local data storage...")
-        return None
-
-def create_tables(conn):
-    """Create necessary tables if they don't exist"""
-    try:
-        cursor = conn.cursor()
-        
-        # Create users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                role TEXT NOT NULL DEFAULT 'viewer',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create tasks table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_date TEXT UNIQUE NOT NULL,
-                task TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create settings table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS settings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                setting_key TEXT UNIQUE NOT NULL,
-                setting_value TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Create indexes for better performance
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_date ON tasks(task_date)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)")
-        
-        conn.commit()
-        
-        # Initialize default users
-        for username, password in USERS.items():
-            role = "admin" if username == "admin" else "viewer"
-            try:
-                cursor.execute("""
-                    INSERT INTO users (username, password, role)
-                    VALUES (?, ?, ?)
-                """, (username, password, role))
-            except sqlite3.IntegrityError:
-                pass  # User already exists
-        
-        conn.commit()
-        
-    except Exception as e:
-        conn.rollback()
-        st.error(f"Error creating tables: {str(e)}")
+# Report pagination
+REPORT_PAGE_SIZES = [10, 25, 50, 100]
 
-# Initialize database connection
-conn = get_db_connection()
+# Job results offered as downloads: button label, file extension, MIME type
+JOB_DOWNLOADS = {
+    "csv_export": ("⬇️ Save CSV", "csv", "text/csv"),
+    "excel_export": ("⬇️ Save Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
 
 # ---------------- DYNAMIC CSS ----------------
+@profiled("render")
 def apply_custom_css():
     st.markdown("""
     <style>
@@ -123,6 +54,12 @@ def apply_custom_css():
         border-left: 5px solid #4CAF50;
     }
     
+    .report-card mark {
+        background: #ffeb3b;
+        padding: 0 2px;
+        border-radius: 3px;
+    }
+    
     .day-header {
         background: #4CAF50;
         color: white;
@@ -267,346 +204,162 @@ def apply_custom_css():
     </style>
     """, unsafe_allow_html=True)
 
-# ---------------- HELPER FUNCTIONS ----------------
-def execute_query(query, params=None, fetch=False, fetchone=False):
-    """Execute a database query"""
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute(query, params or ())
-            
-            if fetch:
-                result = cursor.fetchall()
-                return [dict(row) for row in result]
-            elif fetchone:
-                result = cursor.fetchone()
-                return dict(result) if result else None
-            else:
-                conn.commit()
-                return cursor.lastrowid
-        except Exception as e:
-            conn.rollback()
-            st.error(f"Database error: {str(e)}")
-            return None
-    else:
-        return None
+# ---------------- SESSION ----------------
+def get_current_intern():
+    """Get the intern whose log this session is working with"""
+    return st.session_state.get('intern_id', DEFAULT_INTERN)
 
-def check_date_exists(selected_date):
-    """Check if a task exists for the given date"""
-    date_str = selected_date.isoformat()
-    
-    if conn:
-        result = execute_query(
-            "SELECT * FROM tasks WHERE task_date = ?",
-            (date_str,),
-            fetchone=True
-        )
-        return result
-    else:
-        # Fallback to session state
-        for task in st.session_state.get('local_tasks', []):
-            if task.get("task_date") == date_str:
-                return task
-        return None
+def show_message(level, message):
+    """Show a data layer status message ("error", "success" or "info") in the page"""
+    # Background job threads have no page to show it in, so their messages are logged
+    if get_script_run_ctx(suppress_warning=True) is None:
+        log_message(level, message)
+        return
+    getattr(st, level)(message)
 
-def save_or_update_task(selected_date, task_text):
-    """Save or update task in SQLite"""
-    date_str = selected_date.isoformat()
-    existing_task = check_date_exists(selected_date)
-    
-    if conn:
-        if existing_task:
-            # Update existing task
-            execute_query(
-                """
-                UPDATE tasks 
-                SET task = ?, updated_at = CURRENT_TIMESTAMP 
-                WHERE task_date = ?
-                """,
-                (task_text, date_str)
-            )
-            action = "updated"
-            was_update = True
-        else:
-            # Insert new task
-            execute_query(
-                """
-                INSERT INTO tasks (task_date, task) 
-                VALUES (?, ?)
-                """,
-                (date_str, task_text)
-            )
-            action = "saved"
-            was_update = False
-    else:
-        # Fallback to session state
-        local_tasks = st.session_state.get('local_tasks', [])
-        task_index = None
-        
-        for i, task in enumerate(local_tasks):
-            if task.get("task_date") == date_str:
-                task_index = i
-                break
-        
-        if task_index is not None:
-            # Update existing task
-            local_tasks[task_index]["task"] = task_text
-            local_tasks[task_index]["updated_at"] = datetime.now().isoformat()
-            action = "updated"
-            was_update = True
-        else:
-            # Insert new task
-            new_task = {
-                "id": len(local_tasks) + 1,
-                "task_date": date_str,
-                "task": task_text,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
-            }
-            local_tasks.append(new_task)
-            action = "saved"
-            was_update = False
-        
-        st.session_state.local_tasks = local_tasks
-    
-    return action, was_update
+# ---------------- CACHED RESULTS ----------------
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_analytics(intern_id, data_version, start_date_str, today):
+    """Compute analytics, cached per intern, data version, start date and day"""
+    return compute_analytics(get_backend().get_task_frame(intern_id), start_date_str, today)
 
-def update_task(task_id, new_task):
-    """Update task by ID"""
-    if conn:
-        execute_query(
-            "UPDATE tasks SET task = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            (new_task, task_id)
-        )
-    else:
-        # Fallback to session state
-        for task in st.session_state.get('local_tasks', []):
-            if str(task.get("id")) == task_id:
-                task["task"] = new_task
-                task["updated_at"] = datetime.now().isoformat()
-                break
-
-def delete_task(task_id):
-    """Delete task by ID"""
-    if conn:
-        execute_query("DELETE FROM tasks WHERE id = ?", (task_id,))
-    else:
-        # Fallback to session state
-        local_tasks = st.session_state.get('local_tasks', [])
-        st.session_state.local_tasks = [
-            task for task in local_tasks 
-            if str(task.get("id")) != task_id
-        ]
+@profiled("python")
+def get_analytics(start_date_str, intern_id=None):
+    """Get the analytics charts, reusing the last result while data is unchanged"""
+    intern_id = intern_id or get_current_intern()
+    data_version = get_backend().data_version(intern_id)
+    if data_version is None:
+        # Unversioned stores (session state) are always recomputed
+        return compute_analytics(get_backend().get_task_frame(intern_id), start_date_str, date.today())
+    return build_analytics(intern_id, data_version, start_date_str, date.today())
 
-def get_tasks_sorted_by_day(start_date):
-    """Get all tasks sorted by day number"""
-    if conn:
-        tasks = execute_query(
-            "SELECT id, task_date, task FROM tasks ORDER BY task_date",
-            fetch=True
-        )
-    else:
-        # Fallback to session state
-        tasks = st.session_state.get('local_tasks', [])
-        tasks = sorted(tasks, key=lambda x: x.get("task_date", ""))
-    
-    if not tasks:
-        return []
-    
-    # Get start date
-    start_date_str = get_setting("start_date")
-    
-    # Calculate day numbers
-    tasks_with_days = []
-    for task in tasks:
-        task_date_str = task.get("task_date")
-        if isinstance(task_date_str, str):
-            task_date = date.fromisoformat(task_date_str)
-        else:
-            task_date = task_date_str
-        
-        # Calculate day number
-        day_number = None
-        if start_date_str:
-            try:
-                start_date_obj = date.fromisoformat(start_date_str)
-                day_num = (task_date - start_date_obj).days + 1
-                if day_num > 0:
-                    day_number = day_num
-            except:
-                pass
-        
-        if day_number:
-            formatted_date = task_date.strftime("%A, %d %B %Y") if isinstance(task_date, date) else date.fromisoformat(task_date_str).strftime("%A, %d %B %Y")
-            tasks_with_days.append({
-                "day_number": day_number,
-                "date": task_date_str,
-                "formatted_date": formatted_date,
-                "task": task.get("task", ""),
-                "id": str(task.get("id", ""))
-            })
-    
-    # Sort by day number
-    tasks_with_days.sort(key=lambda x: x["day_number"])
-    return tasks_with_days
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_gap_report(intern_id, data_version, start_date_str, today):
+    """Detect gaps for one intern, cached per data version, start date and day"""
+    return get_gap_reports([intern_id], today).get(intern_id)
 
-def get_tasks_for_download(start_date):
-    """Get all tasks for download with day numbers"""
-    tasks_with_days = get_tasks_sorted_by_day(start_date)
-    
-    if not tasks_with_days:
+@profiled("python")
+def get_gap_report(intern_id=None):
+    """Get missed days and streaks for an intern, or None without a start date"""
+    intern_id = intern_id or get_current_intern()
+    start_date_str = get_setting("start_date", intern_id)
+    if not start_date_str:
         return None
-    
-    # Create DataFrame
-    data = []
-    for task in tasks_with_days:
-        data.append({
-            "Day Number": task["day_number"],
-            "Date": task["formatted_date"],
-            "Task": task["task"]
-        })
-    
-    df = pd.DataFrame(data)
-    return df
-
-def create_csv_download(df):
-    """Create CSV file for download"""
-    output = io.StringIO()
-    df.to_csv(output, index=False)
-    return output.getvalue().encode('utf-8')
+    data_version = get_backend().data_version(intern_id)
+    if data_version is None:
+        return get_gap_reports([intern_id]).get(intern_id)
+    return build_gap_report(intern_id, data_version, start_date_str, date.today())
 
-def create_excel_download(df):
-    """Create Excel file for download (if openpyxl is available)"""
-    try:
-        import openpyxl
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Internship Tasks')
-            worksheet = writer.sheets['Internship Tasks']
-            
-            # Adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        return output.getvalue(), True
-    except ImportError:
-        return None, False
-
-def get_task_count():
-    """Get total task count"""
-    if conn:
-        result = execute_query("SELECT COUNT(*) as count FROM tasks", fetchone=True)
-        return result['count'] if result else 0
+def show_gap_report(gap_report, show_streaks=True):
+    """Show missed-day metrics and the list of missed ranges"""
+    if show_streaks:
+        col_missed, col_current, col_longest = st.columns(3)
+        with col_current:
+            st.metric("Current Streak", f"{gap_report['current_streak']} days")
+        with col_longest:
+            st.metric("Longest Streak", f"{gap_report['longest_streak']} days")
     else:
-        return len(st.session_state.get('local_tasks', []))
+        col_missed, _ = st.columns([1, 2])
+    with col_missed:
+        st.metric("Missed Days", gap_report["missed_days"])
+    
+    if gap_report["gaps"]:
+        with st.expander(f"🕳️ Missed Days ({len(gap_report['gaps'])} gaps)"):
+            st.dataframe(
+                pd.DataFrame(gap_report["gaps"]).rename(columns={"from": "From", "to": "To", "days": "Days"}),
+                hide_index=True,
+                use_container_width=True
+            )
 
-def get_active_days():
-    """Get count of distinct task dates"""
-    if conn:
-        result = execute_query("SELECT COUNT(DISTINCT task_date) as count FROM tasks", fetchone=True)
-        return result['count'] if result else 0
-    else:
-        dates = set(task.get("task_date") for task in st.session_state.get('local_tasks', []))
-        return len(dates)
+# ---------------- BACKGROUND JOBS ----------------
+def start_job(slot, kind, **params):
+    """Queue a background job and remember it in this session under slot"""
+    st.session_state.setdefault("jobs", {})[slot] = submit_job(kind, **params)
 
-def get_setting(key):
-    """Get a setting value"""
-    if conn:
-        result = execute_query(
-            "SELECT setting_value FROM settings WHERE setting_key = ?",
-            (key,),
-            fetchone=True
-        )
-        return result['setting_value'] if result else None
+def job_status(slot, file_prefix="internship_tasks"):
+    """Show the session's job in slot: progress while it runs, then its result"""
+    job_id = st.session_state.get("jobs", {}).get(slot)
+    job = get_job(job_id) if job_id is not None else None
+    if job is None:
+        return
+    
+    if job["status"] in ("queued", "running"):
+        job_progress(slot, job_id)
+    elif job["status"] == "done":
+        data = read_job_result(job) if job["kind"] in JOB_DOWNLOADS else None
+        if data:
+            label, extension, mime = JOB_DOWNLOADS[job["kind"]]
+            st.download_button(
+                label=label,
+                data=data,
+                file_name=f"{file_prefix}_{date.today().strftime('%Y%m%d')}.{extension}",
+                mime=mime,
+                use_container_width=True,
+                key=f"download_{slot}"
+            )
+        elif job["message"]:
+            st.success(job["message"])
+    elif job["status"] == "failed":
+        st.error(f"❌ {job['error']}")
     else:
-        return st.session_state.get('local_settings', {}).get(key)
+        st.info("Cancelled")
 
-def save_setting(key, value):
-    """Save a setting value"""
-    if conn:
-        execute_query(
-            """
-            INSERT INTO settings (setting_key, setting_value) 
-            VALUES (?, ?)
-            ON CONFLICT(setting_key) DO UPDATE 
-            SET setting_value = excluded.setting_value, updated_at = CURRENT_TIMESTAMP
-            """,
-            (key, value)
-        )
-    else:
-        local_settings = st.session_state.get('local_settings', {})
-        local_settings[key] = value
-        st.session_state.local_settings = local_settings
+@st.fragment(run_every=1)
+def job_progress(slot, job_id):
+    """Progress bar of a running job, polled every second without a full rerun"""
+    job = get_job(job_id)
+    if job["status"] not in ("queued", "running"):
+        if job["kind"] == "restore":
+            st.cache_data.clear()  # restored data versions can repeat ones cached earlier
+        st.rerun()  # Whole page, so job_status shows the result
+    
+    text = job["message"] or ("Waiting for a worker…" if job["status"] == "queued" else "Working…")
+    st.progress(job["progress"], text=f"⏳ {text}")
+    if st.button("✖️ Cancel", key=f"cancel_{slot}"):
+        cancel_job(job_id)
 
-def authenticate_user(username, password):
-    """Authenticate user"""
-    if conn:
-        result = execute_query(
-            "SELECT username, role FROM users WHERE username = ? AND password = ?",
-            (username, password),
-            fetchone=True
+# ---------------- INTERN SELECTION ----------------
+def intern_selector(allow_add=False):
+    """Select which intern's log is shown, optionally allowing new interns"""
+    interns = get_interns()
+    names = {intern["intern_id"]: intern["name"] for intern in interns}
+    intern_ids = list(names)
+    current = get_current_intern()
+    
+    col_intern, col_add = st.columns([2, 1])
+    with col_intern:
+        selected = st.selectbox(
+            "👥 Intern",
+            intern_ids,
+            index=intern_ids.index(current) if current in names else 0,
+            format_func=lambda intern_id: names[intern_id]
         )
-        return result
-    else:
-        # Fallback: Check against USERS dictionary
-        if username in USERS and USERS[username] == password:
-            return {
-                "username": username,
-                "role": "admin" if username == "admin" else "viewer"
-            }
-        return None
-
-def get_tasks_with_filter(filter_date=None, limit=20):
-    """Get tasks with optional filter and limit"""
-    if conn:
-        if filter_date:
-            tasks = execute_query(
-                "SELECT id, task_date, task FROM tasks WHERE task_date = ? ORDER BY task_date DESC LIMIT ?",
-                (filter_date.isoformat(), limit),
-                fetch=True
-            )
-        else:
-            tasks = execute_query(
-                "SELECT id, task_date, task FROM tasks ORDER BY task_date DESC LIMIT ?",
-                (limit,),
-                fetch=True
-            )
-    else:
-        # Fallback to session state
-        tasks = st.session_state.get('local_tasks', [])
-        
-        # Apply filter
-        if filter_date:
-            filter_date_str = filter_date.isoformat()
-            tasks = [task for task in tasks if task.get("task_date") == filter_date_str]
-        
-        # Sort and limit
-        tasks = sorted(tasks, key=lambda x: x.get("task_date", ""), reverse=True)[:limit]
+        if selected != current:
+            st.session_state.intern_id = selected
+            st.session_state.pop('selected_date', None)
+            st.session_state.pop('filter_date', None)
+            st.rerun()
     
-    return tasks or []
-
-# Initialize session state for fallback
-if 'local_tasks' not in st.session_state:
-    st.session_state.local_tasks = []
-if 'local_settings' not in st.session_state:
-    st.session_state.local_settings = {}
+    if allow_add:
+        with col_add:
+            with st.expander("➕ Add Intern"):
+                new_name = st.text_input("Intern Name", key="new_intern_name")
+                if st.button("Add", use_container_width=True, key="add_intern"):
+                    new_id = add_intern(new_name) if new_name.strip() else None
+                    if new_id:
+                        st.session_state.intern_id = new_id
+                        st.rerun()
+                    else:
+                        st.warning("⚠️ Enter a name that is not already used")
 
 # ---------------- LOGIN ----------------
+@profiled("render")
 def login():
     st.title("🔐 Login")
     
     # Database status indicator
-    db_class = "db-sqlite" if conn else "db-local"
-    db_text = "SQLite Database ✓" if conn else "Local Storage"
+    db_class = "db-sqlite" if backend.persistent else "db-local"
+    db_text = f"{backend.label} ✓" if backend.persistent else backend.label
     
     st.markdown(f"""
     <div style="text-align: center; margin-bottom: 20px;">
@@ -650,6 +403,7 @@ def login():
             st.markdown('</div>', unsafe_allow_html=True)
 
 # ---------------- REPORT VIEW (for admin2/viewer) ----------------
+@profiled("render")
 def report_view():
     """View for admin2 - shows reports in day order only"""
     st.title("📊 Internship Reports")
@@ -676,11 +430,14 @@ def report_view():
         """, unsafe_allow_html=True)
     
     # Database status
-    db_class = "db-sqlite" if conn else "db-local"
-    db_text = "SQLite Database ✓" if conn else "Local Storage"
+    db_class = "db-sqlite" if backend.persistent else "db-local"
+    db_text = f"{backend.label} ✓" if backend.persistent else backend.label
     st.markdown(f'<div style="text-align: center;"><span class="db-status {db_class}">{db_text}</span></div>', 
                unsafe_allow_html=True)
     
+    # Intern whose report is shown
+    intern_selector()
+    
     # Get start date for day calculation
     start_date_str = get_setting("start_date")
     if not start_date_str:
@@ -696,10 +453,10 @@ def report_view():
     
     start_date = date.fromisoformat(start_date_str)
     
-    # Get tasks sorted by day
-    tasks_with_days = get_tasks_sorted_by_day(start_date)
+    # Only the report bounds are loaded up front; tasks are fetched per page
+    bounds = get_report_bounds()
     
-    if not tasks_with_days:
+    if not bounds["count"]:
         st.info("📭 No tasks found yet. Tasks will appear here once added by admin.")
         # Logout button
         st.divider()
@@ -713,7 +470,7 @@ def report_view():
     # Statistics
     col_stat1, col_stat2 = st.columns(2)
     with col_stat1:
-        st.metric("Total Days with Tasks", len(tasks_with_days))
+        st.metric("Total Days with Tasks", bounds["count"])
     
     with col_stat2:
         current_day = (date.today() - start_date).days + 1
@@ -722,6 +479,10 @@ def report_view():
         else:
             st.metric("Internship Start", "Not started")
     
+    gap_report = get_gap_report()
+    if gap_report:
+        show_gap_report(gap_report)
+    
     # Report Header
     st.divider()
     st.markdown(f"""
@@ -735,28 +496,62 @@ def report_view():
     st.subheader("📅 Daily Tasks (Sorted by Day Number)")
     
     # Filter options
-    col_filter1, col_filter2 = st.columns(2)
+    col_filter1, col_filter2, col_filter3, col_filter4 = st.columns([2, 2, 1, 1])
     with col_filter1:
-        min_day = min(task["day_number"] for task in tasks_with_days)
-        max_day = max(task["day_number"] for task in tasks_with_days)
-        selected_range = st.slider(
-            "Select Day Range",
-            min_value=min_day,
-            max_value=max_day,
-            value=(min_day, max_day)
-        )
+        min_day = bounds["min_day"]
+        max_day = bounds["max_day"]
+        if min_day < max_day:
+            selected_range = st.slider(
+                "Select Day Range",
+                min_value=min_day,
+                max_value=max_day,
+                value=(min_day, max_day)
+            )
+        else:
+            selected_range = (min_day, max_day)
+            st.caption(f"Day {min_day}")
     
     with col_filter2:
-        search_term = st.text_input("🔍 Search in tasks", placeholder="Type to search...")
+        search_term = st.text_input(
+            "🔍 Search in tasks",
+            placeholder="Type to search...",
+            help='Words match by prefix; use "quotes" for an exact phrase'
+        )
+    
+    with col_filter3:
+        sort_label = st.selectbox(
+            "Sort by",
+            ["Day order", "Best match"],
+            disabled=not search_term,
+            key="report_sort"
+        )
+        order = "rank" if search_term and sort_label == "Best match" else "day"
+    
+    with col_filter4:
+        page_size = st.selectbox(
+            "Per page",
+            REPORT_PAGE_SIZES,
+            index=REPORT_PAGE_SIZES.index(DEFAULT_REPORT_PAGE_SIZE),
+            key="report_page_size"
+        )
+    
+    # Restart paging whenever the filters change
+    report_filter = (get_current_intern(), selected_range, search_term, page_size, order)
+    if st.session_state.get('report_filter') != report_filter:
+        st.session_state.report_filter = report_filter
+        st.session_state.report_cursors = [None]
     
-    # Filter tasks
-    filtered_tasks = [
-        task for task in tasks_with_days 
-        if selected_range[0] <= task["day_number"] <= selected_range[1]
-        and (not search_term or search_term.lower() in task["task"].lower())
-    ]
+    # Each cursor marks the last task shown on the previous page
+    cursors = st.session_state.report_cursors
+    filtered_tasks, has_more = get_report_page(
+        selected_range, search_term, after=cursors[-1], page_size=page_size, order=order
+    )
     
     if filtered_tasks:
+        match_count = count_report_tasks(selected_range, search_term)
+        first_shown = (len(cursors) - 1) * page_size + 1
+        st.caption(f"Showing {first_shown}–{first_shown + len(filtered_tasks) - 1} of {match_count} tasks")
+        
         # Display tasks
         for task in filtered_tasks:
             with st.container():
@@ -773,10 +568,26 @@ def report_view():
                         </div>
                     </div>
                     <div style="background: #f8f9fa; padding: 15px; border-radius: 8px; border-left: 3px solid #2196F3;">
-                        {task['task']}
+                        {task.get('task_html') or task['task']}
                     </div>
                 </div>
                 """, unsafe_allow_html=True)
+        
+        # Page controls
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("⬅️ Previous", use_container_width=True, disabled=len(cursors) == 1, key="report_prev"):
+                cursors.pop()
+                st.rerun()
+        
+        with col_page:
+            st.markdown(f'<div style="text-align: center; padding: 8px;">Page {len(cursors)}</div>',
+                       unsafe_allow_html=True)
+        
+        with col_next:
+            if st.button("Next ➡️", use_container_width=True, disabled=not has_more, key="report_next"):
+                cursors.append(report_cursor(filtered_tasks[-1], order))
+                st.rerun()
     else:
         st.info("No tasks found matching the selected criteria.")
     
@@ -790,40 +601,20 @@ def report_view():
         st.info("Download your internship reports in various formats.")
     
     with col_download2:
-        # Create download data
-        df = get_tasks_for_download(start_date)
-        
-        if df is not None and not df.empty:
+        if bounds["count"]:
             # Create download buttons
             col_csv, col_excel = st.columns(2)
             
             with col_csv:
-                # CSV Download
-                csv_data = create_csv_download(df)
-                st.download_button(
-                    label="📥 CSV Report",
-                    data=csv_data,
-                    file_name=f"internship_report_{date.today().strftime('%Y%m%d')}.csv",
-                    mime="text/csv",
-                    use_container_width=True,
-                    key="csv_report"
-                )
+                # Files are built by a background job and offered once ready
+                if st.button("📥 CSV Report", use_container_width=True, key="csv_report_prepare"):
+                    start_job("csv_report", "csv_export")
+                job_status("csv_report", "internship_report")
             
             with col_excel:
-                # Excel Download (if available)
-                excel_data, excel_available = create_excel_download(df)
-                if excel_available and excel_data:
-                    st.download_button(
-                        label="📊 Excel Report",
-                        data=excel_data,
-                        file_name=f"internship_report_{date.today().strftime('%Y%m%d')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True,
-                        key="excel_report"
-                    )
-                else:
-                    # Show info about Excel export
-                    st.info("Excel: Install openpyxl")
+                if st.button("📊 Excel Report", use_container_width=True, key="excel_report_prepare"):
+                    start_job("excel_report", "excel_export")
+                job_status("excel_report", "internship_report")
         else:
             st.warning("No reports available for download")
     
@@ -836,6 +627,7 @@ def report_view():
         st.rerun()
 
 # ---------------- ADMIN VIEW (for admin) ----------------
+@profiled("render")
 def admin_view():
     """Full admin view with all features"""
     # Header with user info and role badge
@@ -857,11 +649,14 @@ def admin_view():
         """, unsafe_allow_html=True)
     
     # Database status
-    db_class = "db-sqlite" if conn else "db-local"
-    db_text = "SQLite Database ✓" if conn else "Local Storage"
+    db_class = "db-sqlite" if backend.persistent else "db-local"
+    db_text = f"{backend.label} ✓" if backend.persistent else backend.label
     st.markdown(f'<div style="text-align: center;"><span class="db-status {db_class}">{db_text}</span></div>', 
                unsafe_allow_html=True)
     
+    # Intern whose log is being edited
+    intern_selector(allow_add=True)
+    
     # Start date configuration
     st.subheader("📅 Settings")
     
@@ -1032,45 +827,51 @@ def admin_view():
         task_count = get_task_count()
         
         if task_count > 0:
-            # Get data for download
-            df = get_tasks_for_download(start_date)
-            
-            if df is not None and not df.empty:
+            if get_report_bounds()["count"]:
                 # Create download buttons
                 col_csv, col_excel = st.columns(2)
                 
                 with col_csv:
-                    # CSV Download
-                    csv_data = create_csv_download(df)
-                    st.download_button(
-                        label="📥 CSV",
-                        data=csv_data,
-                        file_name=f"internship_tasks_{date.today().strftime('%Y%m%d')}.csv",
-                        mime="text/csv",
-                        use_container_width=True,
-                        key="csv_download"
-                    )
+                    # Files are built by a background job and offered once ready
+                    if st.button("📥 CSV", use_container_width=True, key="csv_prepare"):
+                        start_job("csv_download", "csv_export")
+                    job_status("csv_download")
                 
                 with col_excel:
-                    # Excel Download (if available)
-                    excel_data, excel_available = create_excel_download(df)
-                    if excel_available and excel_data:
-                        st.download_button(
-                            label="📊 Excel",
-                            data=excel_data,
-                            file_name=f"internship_tasks_{date.today().strftime('%Y%m%d')}.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True,
-                            key="excel_download"
-                        )
-                    else:
-                        # Show info about Excel export
-                        st.info("Excel: Install openpyxl")
+                    if st.button("📊 Excel", use_container_width=True, key="excel_prepare"):
+                        start_job("excel_download", "excel_export")
+                    job_status("excel_download")
             else:
                 st.warning("No tasks to download")
         else:
             st.warning("No tasks available for download")
     
+    # Bulk Import Section
+    st.divider()
+    st.subheader("📤 Import Tasks")
+    
+    uploaded_file = st.file_uploader(
+        "Upload a task log",
+        type=IMPORT_FILE_TYPES,
+        help="CSV, JSON or Excel with a date column (task_date or Date) and a task column (task or Task). "
+             "Dates that already have a task are updated."
+    )
+    if uploaded_file is not None:
+        if st.button("📤 Import Tasks", use_container_width=True, key="import_tasks"):
+            try:
+                records = read_import_file(uploaded_file.name, uploaded_file.getvalue())
+            except ValueError as e:
+                st.error(f"❌ {str(e)}")
+            else:
+                result = import_tasks(records)
+                st.success(
+                    f"✅ Import finished: {result['inserted']} added, {result['updated']} updated, "
+                    f"{result['rejected']} rejected, {result['duplicates']} duplicate dates merged"
+                )
+                if result["errors"]:
+                    with st.expander(f"⚠️ Rejected rows ({len(result['errors'])})"):
+                        st.text("\n".join(result["errors"][:100]))
+    
     # Task History
     st.divider()
     st.subheader("📚 Task History")
@@ -1119,22 +920,8 @@ def admin_view():
             else:
                 task_date_display = task_date_str
             
-            # Calculate day number if start date exists
-            day_number = ""
-            start_date_str = get_setting("start_date")
-            if start_date_str:
-                try:
-                    start_date_for_calc = date.fromisoformat(start_date_str)
-                    if isinstance(task_date_display, str):
-                        task_date_for_calc = date.fromisoformat(task_date_display)
-                    else:
-                        task_date_for_calc = task_date_display
-                    
-                    day_num = (task_date_for_calc - start_date_for_calc).days + 1
-                    if day_num > 0:
-                        day_number = f"Day {day_num} • "
-                except:
-                    pass
+            # Day number is stored with the task
+            day_number = f"Day {task['day_number']} • " if task.get("day_number") else ""
             
             # Display each task in a card
             with st.container():
@@ -1192,15 +979,14 @@ def admin_view():
     st.divider()
     st.subheader("📈 Statistics")
     
-    total_tasks = get_task_count()
-    active_days = get_active_days()
+    stats = get_task_stats()
     
     col_stat1, col_stat2, col_stat3 = st.columns(3)
     with col_stat1:
-        st.metric("Total Tasks", total_tasks)
+        st.metric("Total Tasks", stats["task_count"])
     
     with col_stat2:
-        st.metric("Active Days", active_days)
+        st.metric("Active Days", stats["task_count"])
     
     with col_stat3:
         current_day = (date.today() - start_date).days + 1
@@ -1209,40 +995,86 @@ def admin_view():
         else:
             st.metric("Internship Start", "Not started")
     
-    # Database Management (for SQLite only)
-    if conn:
+    # Streaks come from the gap report, which only counts days in the internship window
+    gap_report = get_gap_report()
+    
+    col_stat4, col_stat5, col_stat6 = st.columns(3)
+    with col_stat4:
+        st.metric("Current Streak", f"{gap_report['current_streak']} days" if gap_report else "-")
+    
+    with col_stat5:
+        st.metric("Longest Streak", f"{gap_report['longest_streak']} days" if gap_report else "-")
+    
+    with col_stat6:
+        st.metric("Last Entry", stats["last_date"] or "-")
+    
+    if gap_report:
+        show_gap_report(gap_report, show_streaks=False)
+    
+    with st.expander("👥 Missed Days for All Interns"):
+        if st.button("Check All Interns", key="check_all_gaps"):
+            names = {intern["intern_id"]: intern["name"] for intern in get_interns()}
+            gap_reports = get_gap_reports()
+            if gap_reports:
+                st.dataframe(
+                    pd.DataFrame([
+                        {
+                            "Intern": names.get(intern_id, intern_id),
+                            "Days Logged": report["logged_days"],
+                            "Missed Days": report["missed_days"],
+                            "Current Streak": report["current_streak"],
+                            "Longest Streak": report["longest_streak"]
+                        }
+                        for intern_id, report in gap_reports.items()
+                    ]),
+                    hide_index=True,
+                    use_container_width=True
+                )
+            else:
+                st.info("No intern has a start date yet.")
+    
+    if stats["task_count"]:
+        with st.expander("📅 Tasks per Week / Month"):
+            period_type = st.radio("Group by", ["month", "week"], horizontal=True, format_func=str.title)
+            period_counts = get_period_counts(period_type)
+            st.bar_chart(pd.DataFrame({"Tasks": period_counts}))
+    
+    # Database Management (for persistent backends only)
+    if backend.persistent:
         st.divider()
         st.subheader("🗄️ Database Management")
         
         col_db1, col_db2, col_db3 = st.columns(3)
         
         with col_db1:
-            if st.button("🗑️ Clear All Tasks", type="secondary", use_container_width=True):
-                if st.checkbox("Confirm delete all tasks"):
-                    execute_query("DELETE FROM tasks")
-                    st.success("All tasks deleted!")
-                    st.rerun()
+            confirm_delete = st.checkbox("Confirm delete all tasks")
+            if st.button("🗑️ Clear All Tasks", type="secondary", use_container_width=True, disabled=not confirm_delete):
+                start_job("delete_tasks", "delete_tasks")
+            job_status("delete_tasks")
         
         with col_db2:
             if st.button("📊 Database Info", use_container_width=True):
                 task_count = get_task_count()
-                user_count = execute_query("SELECT COUNT(*) as count FROM users", fetchone=True)['count']
-                db_size = Path(DB_FILE).stat().st_size if Path(DB_FILE).exists() else 0
+                user_count = backend.get_user_count()
+                intern_count = len(get_interns())
+                details = "".join(f"\n                - {line}" for line in backend.info_lines())
                 
                 st.info(f"""
-                **Database Information:**
+                **Database Information ({backend.label}):**
                 - Users: {user_count}
-                - Tasks: {task_count}
-                - Database File: {DB_FILE}
-                - File Size: {db_size / 1024:.1f} KB
+                - Interns: {intern_count}
+                - Tasks: {task_count}{details}
                 """)
         
         with col_db3:
-            if st.button("💾 Backup Database", use_container_width=True):
-                backup_file = f"internship_backup_{date.today().isoformat()}.db"
-                import shutil
-                shutil.copy2(DB_FILE, backup_file)
-                st.success(f"Database backed up to {backup_file}")
+            if isinstance(backend, SQLiteBackend):
+                if st.button("💾 Backup Database", use_container_width=True):
+                    start_job("backup", "backup")
+                job_status("backup")
+        
+        if isinstance(backend, SQLiteBackend):
+            backup_panel()
+        jobs_panel()
     
     # Logout button
     st.divider()
@@ -1260,6 +1092,144 @@ def admin_view():
                     st.session_state.pop(key, None)
             st.rerun()
 
+def backup_panel():
+    """Saved backups, with restore"""
+    backups = list_backups()
+    with st.expander(f"🗂️ Backups ({len(backups)})"):
+        if not backups:
+            st.info("📭 No backups yet.")
+            return
+        
+        st.dataframe(pd.DataFrame([
+            {
+                "Backup": backup["name"],
+                "Created": backup["created"].strftime("%d-%m-%Y %H:%M:%S"),
+                "Size (KB)": round(backup["size"] / 1024, 1)
+            }
+            for backup in backups
+        ]), use_container_width=True, hide_index=True)
+        
+        names = {backup["name"]: backup["path"] for backup in backups}
+        selected = st.selectbox("Backup to restore", list(names))
+        confirm = st.checkbox("Replace all current data with this backup")
+        if st.button("♻️ Restore", disabled=not confirm):
+            start_job("restore", "restore", path=str(names[selected]))
+        job_status("restore")
+
+def jobs_panel():
+    """Latest background jobs of every user"""
+    jobs = list_jobs()
+    with st.expander(f"⚙️ Background Jobs ({len(jobs)})"):
+        if not jobs:
+            st.info("📭 No jobs yet.")
+            return
+        
+        st.dataframe(pd.DataFrame([
+            {
+                "Job": job["id"],
+                "Kind": job["kind"],
+                "Intern": job["intern_id"],
+                "Status": job["status"],
+                "Progress": f"{job['progress']:.0%}",
+                "Created": job["created_at"],
+                "Finished": job["finished_at"],
+                "Details": job["error"] or job["message"]
+            }
+            for job in jobs
+        ]), use_container_width=True, hide_index=True)
+
+# ---------------- ANALYTICS VIEW ----------------
+@profiled("render")
+def analytics_view():
+    """Activity charts for the selected intern, available to every role"""
+    st.title("📈 Internship Analytics")
+    
+    intern_selector()
+    
+    start_date_str = get_setting("start_date")
+    if not start_date_str:
+        st.warning("⚠️ Start date not set. Analytics are measured from the internship start date.")
+        return
+    if date.fromisoformat(start_date_str) > date.today():
+        st.info("📭 The internship has not started yet.")
+        return
+    
+    analytics = get_analytics(start_date_str)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Days Logged", f"{analytics['logged_days']} / {analytics['elapsed_days']}")
+    with col2:
+        st.metric("Missed Days", analytics["missed_days"])
+    with col3:
+        st.metric("Completion Rate", f"{analytics['completion_rate']:.1f}%")
+    with col4:
+        st.metric("Avg Words per Task", f"{analytics['average_words']:.1f}")
+    
+    st.subheader("🗓️ Activity Heatmap")
+    import altair as alt
+    heatmap = alt.Chart(analytics["heatmap"]).mark_rect().encode(
+        x=alt.X("week:O", title="Week of"),
+        y=alt.Y("weekday:O", title=None, sort=["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]),
+        color=alt.Color("tasks:Q", title="Tasks", scale=alt.Scale(scheme="greens")),
+        tooltip=["week", "weekday", "tasks"]
+    )
+    st.altair_chart(heatmap, use_container_width=True)
+    
+    col_week, col_month = st.columns(2)
+    with col_week:
+        st.subheader("✅ Weekly Completion Rate")
+        st.line_chart(analytics["weekly_completion"])
+    with col_month:
+        st.subheader("📅 Tasks per Month")
+        st.bar_chart(analytics["monthly_tasks"])
+    
+    st.subheader("✍️ Words per Task")
+    if analytics["word_trend"].empty:
+        st.info("📭 No tasks logged yet.")
+    else:
+        st.line_chart(analytics["word_trend"])
+
+# ---------------- PROFILE PANEL (for admin) ----------------
+def profile_panel(profile):
+    """Collapsible breakdown of where the last rerun spent its time"""
+    with st.expander(f"⏱️ Rerun Profile ({profile.total_ms:.0f} ms)"):
+        summary = profile.summary()
+        columns = st.columns(len(summary))
+        for column, (kind, ms) in zip(columns, summary.items()):
+            with column:
+                st.metric(kind.upper() if kind == "sql" else kind.title(), f"{ms:.1f} ms")
+        
+        sections = pd.DataFrame([
+            {
+                "Section": "· " * entry["depth"] + entry["name"],
+                "Kind": entry["kind"],
+                "Total (ms)": round(entry["ms"], 2),
+                "Self (ms)": round(entry["ms"] - entry["child_ms"], 2),
+                "Rows": entry.get("rows"),
+                "Bytes": entry.get("bytes"),
+                "Cached": entry.get("cached", False),
+                "Query": entry.get("query", "")
+            }
+            for entry in profile.entries
+        ])
+        if sections.empty:
+            st.info("📭 Nothing was profiled in this rerun.")
+        else:
+            st.dataframe(sections, use_container_width=True, hide_index=True)
+        
+        st.download_button(
+            "📥 Download Profile (JSON)",
+            data=json.dumps(profile.to_record(), indent=2, default=str),
+            file_name=f"rerun_profile_{profile.started_at:%Y%m%d_%H%M%S}.json",
+            mime="application/json",
+            key="download_profile"
+        )
+        if PROFILE_LOG_FILE:
+            st.caption(f"Every rerun is appended to `{PROFILE_LOG_FILE}`.")
+        else:
+            st.caption("Set PROFILE_LOG_FILE to append every rerun to a JSON lines file.")
+
 # ---------------- MAIN ----------------
 if __name__ == "__main__":
     # Page configuration
@@ -1270,20 +1240,33 @@ if __name__ == "__main__":
         initial_sidebar_state="collapsed"
     )
     
-    # Apply custom CSS
-    apply_custom_css()
-    
-    # Initialize session state
-    if "logged_in" not in st.session_state:
-        st.session_state.logged_in = False
-    if "role" not in st.session_state:
-        st.session_state.role = None
+    # Show data layer messages in the page, for the intern chosen in the session
+    set_message_handler(show_message)
+    set_intern_resolver(get_current_intern)
+    backend = get_backend()
     
-    # Route based on login status and role
-    if not st.session_state.logged_in:
-        login()
-    else:
-        if st.session_state.role == "viewer" or st.session_state.username == "admin2":
-            report_view()  # Show report-only view for admin2
+    with rerun_profile() as profile:
+        # Apply custom CSS
+        apply_custom_css()
+        
+        # Initialize session state
+        if "logged_in" not in st.session_state:
+            st.session_state.logged_in = False
+        if "role" not in st.session_state:
+            st.session_state.role = None
+        
+        # Route based on login status and role
+        if not st.session_state.logged_in:
+            login()
         else:
-            admin_view()  # Show full admin view for admin
+            page = st.radio("Page", ["📋 Tracker", "📈 Analytics"], horizontal=True, label_visibility="collapsed")
+            if page == "📈 Analytics":
+                analytics_view()
+            elif st.session_state.role == "viewer" or st.session_state.username == "admin2":
+                report_view()  # Show report-only view for admin2
+            else:
+                admin_view()  # Show full admin view for admin
+    
+    # Timings of the rerun that just finished, for the full admin only
+    if st.session_state.role == "admin":
+        profile_panel(profile)
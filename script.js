@@ -1,10 +1,11 @@
 // Database Configuration
 const DB_NAME = 'InternshipTrackerDB';
-const DB_VERSION = 1;
+const DB_VERSION = 2;
 const STORES = {
     USERS: 'users',
     TASKS: 'tasks',
-    SETTINGS: 'settings'
+    SETTINGS: 'settings',
+    OUTBOX: 'outbox'
 };
 
 // Constants
@@ -14,14 +15,29 @@ const USERS = {
     'admin2': { password: 'admin@AHBETA', role: 'viewer' }
 };
 
+// Sync with the Python server (api.py)
+const SYNC_SERVER_URL = localStorage.getItem('syncServerUrl') || 'http://127.0.0.1:8000';
+const SYNC_INTERN_ID = 'default';
+const SYNC_BATCH_SIZE = 100; // changes pushed per request
+const SYNC_PAGE_SIZE = 500; // changes pulled per request
+const SYNC_SETTINGS = { startDate: 'start_date' }; // local setting key -> server setting key
+const REPORT_PAGE_SIZE = 50; // report tasks rendered per page
+const SEARCH_DELAY = 150; // ms to wait after a keystroke before searching
+
 // Global Variables
 let db = null;
 let currentUser = null;
 let currentRole = null;
+let currentPassword = null; // kept in memory only, for the sync requests
+let syncInProgress = false;
 let currentTaskId = null;
 let selectedDate = new Date();
 let filterDate = null;
 let tasksLimit = 20;
+let queryCache = new Map(); // counts and date bounds, dropped on every write
+let reportCursor = null; // last date shown in the report, to load the next page
+let reportRender = 0; // drops results of report renders that were overtaken
+let searchTimer = null;
 
 // Initialize Application
 document.addEventListener('DOMContentLoaded', () => {
@@ -60,6 +76,11 @@ function initializeDatabase() {
             const settingsStore = db.createObjectStore(STORES.SETTINGS, { keyPath: 'key' });
             settingsStore.createIndex('key', 'key', { unique: true });
         }
+
+        // Create outbox store: local changes not yet pushed, one per task date or setting
+        if (!db.objectStoreNames.contains(STORES.OUTBOX)) {
+            db.createObjectStore(STORES.OUTBOX, { keyPath: 'id' });
+        }
     };
 
     request.onsuccess = (event) => {
@@ -70,14 +91,76 @@ function initializeDatabase() {
     };
 }
 
-function initializeDefaultData() {
+async function initializeDefaultData() {
     // Initialize default users
     Object.entries(USERS).forEach(([username, userData]) => {
         addUser(username, userData.password, userData.role);
     });
 
-    // Initialize default settings
-    setSetting('startDate', new Date().toISOString().split('T')[0]);
+    // Initialize default settings, keeping a start date saved or synced earlier
+    if (!(await getSetting('startDate'))) {
+        await setSetting('startDate', new Date().toISOString().split('T')[0], false);
+    }
+}
+
+function requestResult(request) {
+    return new Promise((resolve, reject) => {
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+// Read-write transaction over tasks or settings; cached queries are dropped when it commits
+function writeTransaction(storeNames) {
+    const transaction = db.transaction(storeNames, 'readwrite');
+    transaction.addEventListener('complete', invalidateQueryCache);
+    return transaction;
+}
+
+// Run a read once and share its promise until the next write.
+// Writes replace the map, so reads still running then cannot store stale results.
+function cachedQuery(key, compute) {
+    if (!queryCache.has(key)) {
+        const cache = queryCache;
+        const result = compute();
+        cache.set(key, result);
+        result.catch(() => cache.delete(key));
+    }
+    return queryCache.get(key);
+}
+
+function invalidateQueryCache() {
+    queryCache = new Map();
+}
+
+function transactionDone(transaction) {
+    return new Promise((resolve, reject) => {
+        transaction.oncomplete = () => resolve();
+        transaction.onerror = () => reject(transaction.error);
+        transaction.onabort = () => reject(transaction.error || new Error('Transaction aborted'));
+    });
+}
+
+// Record a local change in the outbox, within the transaction that made it.
+// base is the server sequence number the change was made on; an entry
+// already waiting for the same key keeps its original base.
+function queueChange(transaction, kind, key, value, deleted, base) {
+    const outbox = transaction.objectStore(STORES.OUTBOX);
+    const id = `${kind}:${key}`;
+    const request = outbox.get(id);
+
+    request.onsuccess = () => {
+        const pending = request.result;
+        outbox.put({
+            id: id,
+            kind: kind,
+            key: key,
+            value: deleted ? null : value,
+            deleted: deleted,
+            base: pending ? pending.base : (base || 0),
+            updatedAt: new Date().toISOString()
+        });
+    };
 }
 
 // CRUD Operations
@@ -124,8 +207,10 @@ async function authenticateUser(username, password) {
 
 // Task Operations
 async function addOrUpdateTask(date, task) {
+    const startDate = await getSetting('startDate');
+
     return new Promise((resolve, reject) => {
-        const transaction = db.transaction([STORES.TASKS], 'readwrite');
+        const transaction = writeTransaction([STORES.TASKS, STORES.OUTBOX]);
         const store = transaction.objectStore(STORES.TASKS);
         const dateIndex = store.index('date');
         
@@ -141,11 +226,11 @@ async function addOrUpdateTask(date, task) {
                 existingTask.updatedAt = new Date().toISOString();
                 
                 const updateRequest = store.put(existingTask);
+                queueChange(transaction, 'task', date, task, false, existingTask.serverSeq);
                 updateRequest.onsuccess = () => resolve({ action: 'updated', task: existingTask });
                 updateRequest.onerror = () => reject(updateRequest.error);
             } else {
                 // Add new task
-                const startDate = getSetting('startDate');
                 const dayNumber = calculateDayNumber(date, startDate);
                 
                 const newTask = {
@@ -157,6 +242,7 @@ async function addOrUpdateTask(date, task) {
                 };
 
                 const addRequest = store.add(newTask);
+                queueChange(transaction, 'task', date, task, false, 0);
                 addRequest.onsuccess = () => resolve({ action: 'added', task: newTask });
                 addRequest.onerror = () => reject(addRequest.error);
             }
@@ -178,46 +264,107 @@ async function getTaskByDate(date) {
     });
 }
 
-async function getAllTasks(filterDate = null) {
+// Walk tasks in date order through the date index, calling visit(task)
+// until it returns false. ISO dates sort as strings, so key ranges on the
+// index select date ranges without loading other records.
+function iterateTasks(range, direction, visit) {
     return new Promise((resolve, reject) => {
         const transaction = db.transaction([STORES.TASKS], 'readonly');
-        const store = transaction.objectStore(STORES.TASKS);
-        const request = store.getAll();
+        const request = transaction.objectStore(STORES.TASKS).index('date').openCursor(range, direction);
 
         request.onsuccess = () => {
-            let tasks = request.result;
-            
-            if (filterDate) {
-                tasks = tasks.filter(task => task.date === filterDate);
+            const cursor = request.result;
+            if (cursor && visit(cursor.value) !== false) {
+                cursor.continue();
+            } else {
+                resolve();
             }
-            
-            // Sort by date descending
-            tasks.sort((a, b) => new Date(b.date) - new Date(a.date));
-            resolve(tasks);
         };
-
         request.onerror = () => reject(request.error);
     });
 }
 
-async function getTasksByDayOrder() {
-    const tasks = await getAllTasks();
-    const startDate = getSetting('startDate');
-    
-    // Calculate day numbers and filter valid tasks
-    const tasksWithDays = tasks.map(task => {
-        const dayNumber = calculateDayNumber(task.date, startDate);
-        return { ...task, dayNumber };
-    }).filter(task => task.dayNumber > 0);
-    
-    // Sort by day number
-    tasksWithDays.sort((a, b) => a.dayNumber - b.dayNumber);
-    return tasksWithDays;
+// Key range on the date index covering day numbers dayFrom..dayTo, or null
+// if none can match. Day numbers follow from the start date, so they map to
+// dates directly and stay right when the start date changes.
+// `after` continues a page after that date.
+function dayRange(startDate, dayFrom = 1, dayTo = null, after = null) {
+    if (!startDate) return null;
+
+    const lower = dayToDate(startDate, Math.max(dayFrom, 1));
+    const upper = dayTo ? dayToDate(startDate, dayTo) : null;
+    const from = after && after >= lower ? after : lower;
+    const fromOpen = Boolean(after && after >= lower);
+
+    if (upper === null) return IDBKeyRange.lowerBound(from, fromOpen);
+    if (from > upper || (from === upper && fromOpen)) return null;
+    return IDBKeyRange.bound(from, upper, fromOpen, false);
+}
+
+async function getAllTasks(filterDate = null, limit = Infinity) {
+    // Newest first
+    if (filterDate) {
+        const task = await getTaskByDate(filterDate);
+        return task ? [task] : [];
+    }
+
+    const tasks = [];
+    if (limit > 0) {
+        await iterateTasks(null, 'prev', task => tasks.push(task) < limit);
+    }
+    return tasks;
+}
+
+async function getTasksByDayOrder({ dayFrom = 1, dayTo = null, searchTerm = '', after = null, limit = Infinity } = {}) {
+    const startDate = await getSetting('startDate');
+    const range = dayRange(startDate, dayFrom, dayTo, after);
+    const tasks = [];
+    if (!range || limit <= 0) return tasks;
+
+    // Date order is day order; only tasks in the day range are read
+    await iterateTasks(range, 'next', task => {
+        if (searchTerm && !task.task.toLowerCase().includes(searchTerm)) return true;
+        tasks.push({ ...task, dayNumber: calculateDayNumber(task.date, startDate) });
+        return tasks.length < limit;
+    });
+    return tasks;
+}
+
+async function countReportTasks(dayFrom, dayTo, searchTerm = '') {
+    const startDate = await getSetting('startDate');
+    return cachedQuery(`report:${startDate}:${dayFrom}:${dayTo}:${searchTerm}`, async () => {
+        const range = dayRange(startDate, dayFrom, dayTo);
+        if (!range) return 0;
+
+        if (!searchTerm) {
+            const transaction = db.transaction([STORES.TASKS], 'readonly');
+            return requestResult(transaction.objectStore(STORES.TASKS).index('date').count(range));
+        }
+
+        let count = 0;
+        await iterateTasks(range, 'next', task => {
+            if (task.task.toLowerCase().includes(searchTerm)) count++;
+        });
+        return count;
+    });
+}
+
+// First and last task date ({ first, last }, null when there are no tasks)
+async function getTaskDateBounds() {
+    return cachedQuery('bounds', async () => {
+        const transaction = db.transaction([STORES.TASKS], 'readonly');
+        const index = transaction.objectStore(STORES.TASKS).index('date');
+        const [first, last] = await Promise.all([
+            requestResult(index.openKeyCursor(null, 'next')),
+            requestResult(index.openKeyCursor(null, 'prev'))
+        ]);
+        return { first: first ? first.key : null, last: last ? last.key : null };
+    });
 }
 
 async function updateTask(id, task) {
     return new Promise((resolve, reject) => {
-        const transaction = db.transaction([STORES.TASKS], 'readwrite');
+        const transaction = writeTransaction([STORES.TASKS, STORES.OUTBOX]);
         const store = transaction.objectStore(STORES.TASKS);
         
         const getRequest = store.get(Number(id));
@@ -229,6 +376,7 @@ async function updateTask(id, task) {
                 existingTask.updatedAt = new Date().toISOString();
                 
                 const updateRequest = store.put(existingTask);
+                queueChange(transaction, 'task', existingTask.date, task, false, existingTask.serverSeq);
                 updateRequest.onsuccess = () => resolve(true);
                 updateRequest.onerror = () => reject(updateRequest.error);
             } else {
@@ -242,49 +390,87 @@ async function updateTask(id, task) {
 
 async function deleteTask(id) {
     return new Promise((resolve, reject) => {
-        const transaction = db.transaction([STORES.TASKS], 'readwrite');
+        const transaction = writeTransaction([STORES.TASKS, STORES.OUTBOX]);
         const store = transaction.objectStore(STORES.TASKS);
-        const request = store.delete(Number(id));
+        const getRequest = store.get(Number(id));
 
-        request.onsuccess = () => resolve(true);
-        request.onerror = () => reject(request.error);
+        getRequest.onsuccess = () => {
+            const existingTask = getRequest.result;
+            if (!existingTask) {
+                resolve(true);
+                return;
+            }
+
+            const request = store.delete(Number(id));
+            queueChange(transaction, 'task', existingTask.date, null, true, existingTask.serverSeq);
+            request.onsuccess = () => resolve(true);
+            request.onerror = () => reject(request.error);
+        };
+
+        getRequest.onerror = () => reject(getRequest.error);
     });
 }
 
 async function clearAllTasks() {
     return new Promise((resolve, reject) => {
-        const transaction = db.transaction([STORES.TASKS], 'readwrite');
+        const transaction = writeTransaction([STORES.TASKS, STORES.OUTBOX]);
         const store = transaction.objectStore(STORES.TASKS);
-        const request = store.clear();
+        const request = store.openCursor();
 
-        request.onsuccess = () => resolve(true);
+        // Delete one by one so each deletion reaches the server on the next sync
+        request.onsuccess = () => {
+            const cursor = request.result;
+            if (cursor) {
+                queueChange(transaction, 'task', cursor.value.date, null, true, cursor.value.serverSeq);
+                cursor.delete();
+                cursor.continue();
+            }
+        };
         request.onerror = () => reject(request.error);
+
+        transaction.oncomplete = () => resolve(true);
+        transaction.onerror = () => reject(transaction.error);
     });
 }
 
 async function getTaskCount() {
-    const tasks = await getAllTasks();
-    return tasks.length;
+    return cachedQuery('count', () => {
+        const transaction = db.transaction([STORES.TASKS], 'readonly');
+        return requestResult(transaction.objectStore(STORES.TASKS).count());
+    });
 }
 
 async function getActiveDays() {
-    const tasks = await getAllTasks();
-    const uniqueDates = new Set(tasks.map(task => task.date));
-    return uniqueDates.size;
+    // The date index is unique, so it has one key per active day
+    return cachedQuery('activeDays', () => {
+        const transaction = db.transaction([STORES.TASKS], 'readonly');
+        return requestResult(transaction.objectStore(STORES.TASKS).index('date').count());
+    });
 }
 
 // Settings Operations
-function setSetting(key, value) {
-    const transaction = db.transaction([STORES.SETTINGS], 'readwrite');
+async function setSetting(key, value, track = true) {
+    const transaction = writeTransaction([STORES.SETTINGS, STORES.OUTBOX]);
     const store = transaction.objectStore(STORES.SETTINGS);
-    
-    const setting = {
-        key: key,
-        value: value,
-        updatedAt: new Date().toISOString()
+    const request = store.get(key);
+
+    // Settings the server knows about are queued for the next sync
+    request.onsuccess = () => {
+        const existing = request.result;
+        const setting = {
+            key: key,
+            value: value,
+            updatedAt: new Date().toISOString(),
+            serverSeq: existing ? existing.serverSeq : undefined
+        };
+
+        store.put(setting);
+        if (track && SYNC_SETTINGS[key]) {
+            queueChange(transaction, 'setting', SYNC_SETTINGS[key], value, false, setting.serverSeq);
+        }
     };
 
-    store.put(setting);
+    return transactionDone(transaction);
 }
 
 async function getSetting(key) {
@@ -298,6 +484,180 @@ async function getSetting(key) {
     });
 }
 
+// Sync Operations
+// Local writes queue changes in the outbox. A sync pushes them in batches
+// (admins only), then pulls what changed on the server since the stored
+// cursor. When both sides changed the same task, the later edit wins and
+// the server sends back its version of any local change that lost.
+async function syncRequest(method, path, body = null) {
+    const response = await fetch(`${SYNC_SERVER_URL}/api/interns/${encodeURIComponent(SYNC_INTERN_ID)}${path}`, {
+        method: method,
+        headers: {
+            'Authorization': 'Basic ' + btoa(`${currentUser}:${currentPassword}`),
+            'Content-Type': 'application/json'
+        },
+        body: body ? JSON.stringify(body) : undefined
+    });
+    const result = await response.json().catch(() => ({}));
+    if (!response.ok) {
+        throw new Error(result.error || `Server answered ${response.status}`);
+    }
+    return result;
+}
+
+async function applyServerChange(transaction, change, startDate) {
+    if (change.kind === 'setting') {
+        const localKey = Object.keys(SYNC_SETTINGS).find(key => SYNC_SETTINGS[key] === change.key);
+        if (localKey && !change.deleted) {
+            transaction.objectStore(STORES.SETTINGS).put({
+                key: localKey,
+                value: change.value,
+                updatedAt: change.changed_at,
+                serverSeq: change.seq
+            });
+        }
+        return;
+    }
+
+    const store = transaction.objectStore(STORES.TASKS);
+    const existingTask = await requestResult(store.index('date').get(change.key));
+    if (change.deleted) {
+        if (existingTask) {
+            store.delete(existingTask.id);
+        }
+        return;
+    }
+
+    const task = existingTask || { date: change.key, createdAt: change.changed_at };
+    task.task = change.value;
+    task.dayNumber = calculateDayNumber(change.key, startDate);
+    task.updatedAt = change.changed_at;
+    task.serverSeq = change.seq;
+    store.put(task);
+}
+
+async function pushChanges() {
+    const pending = await requestResult(
+        db.transaction([STORES.OUTBOX], 'readonly').objectStore(STORES.OUTBOX).getAll()
+    );
+    const startDate = await getSetting('startDate');
+
+    for (let i = 0; i < pending.length; i += SYNC_BATCH_SIZE) {
+        const batch = pending.slice(i, i + SYNC_BATCH_SIZE);
+        const result = await syncRequest('POST', '/sync', {
+            changes: batch.map(change => ({
+                kind: change.kind,
+                key: change.key,
+                value: change.value,
+                deleted: change.deleted,
+                base: change.base,
+                updated_at: change.updatedAt
+            }))
+        });
+
+        const transaction = writeTransaction([STORES.TASKS, STORES.SETTINGS, STORES.OUTBOX]);
+        const done = transactionDone(transaction);
+        const outbox = transaction.objectStore(STORES.OUTBOX);
+        const sent = new Map(batch.map(change => [change.id, change]));
+        const finished = async (kind, key, seq) => {
+            // An entry edited again while the request ran stays queued, based on the new sequence number
+            const id = `${kind}:${key}`;
+            const current = await requestResult(outbox.get(id));
+            if (current && current.updatedAt !== sent.get(id).updatedAt) {
+                current.base = seq;
+                outbox.put(current);
+                return false;
+            }
+            outbox.delete(id);
+            return true;
+        };
+
+        for (const change of result.applied) {
+            await finished(change.kind, change.key, change.seq);
+            const store = transaction.objectStore(change.kind === 'task' ? STORES.TASKS : STORES.SETTINGS);
+            const record = await requestResult(change.kind === 'task'
+                ? store.index('date').get(change.key)
+                : store.get(Object.keys(SYNC_SETTINGS).find(key => SYNC_SETTINGS[key] === change.key)));
+            if (record) {
+                record.serverSeq = change.seq;
+                store.put(record);
+            }
+        }
+        for (const change of result.conflicts) {
+            if (await finished(change.kind, change.key, change.seq)) {
+                await applyServerChange(transaction, change, startDate);
+            }
+        }
+        for (const change of result.rejected) {
+            // The server will never accept these, so stop sending them
+            console.warn('Sync rejected change:', change);
+            if (change.kind && change.key) {
+                outbox.delete(`${change.kind}:${change.key}`);
+            }
+        }
+        await done;
+    }
+}
+
+async function pullChanges() {
+    let epoch = await getSetting('syncEpoch');
+    let since = epoch ? Number(await getSetting('syncCursor')) || 0 : 0;
+    let more = true;
+
+    while (more) {
+        const page = await syncRequest('GET', `/sync?since=${since}&limit=${SYNC_PAGE_SIZE}`);
+        if (page.epoch !== epoch && since > 0) {
+            // The server database was replaced (restored); pull everything again
+            epoch = page.epoch;
+            since = 0;
+            continue;
+        }
+
+        const startDate = page.changes.find(change => change.kind === 'setting' && change.key === 'start_date');
+        const dayStart = startDate && !startDate.deleted ? startDate.value : await getSetting('startDate');
+        const transaction = writeTransaction([STORES.TASKS, STORES.SETTINGS, STORES.OUTBOX]);
+        const done = transactionDone(transaction);
+        const outbox = transaction.objectStore(STORES.OUTBOX);
+        for (const change of page.changes) {
+            // Local changes still waiting to be pushed are resolved by the next push
+            if (!(await requestResult(outbox.get(`${change.kind}:${change.key}`)))) {
+                await applyServerChange(transaction, change, dayStart);
+            }
+        }
+        transaction.objectStore(STORES.SETTINGS).put({ key: 'syncEpoch', value: page.epoch });
+        transaction.objectStore(STORES.SETTINGS).put({ key: 'syncCursor', value: page.cursor });
+        await done;
+
+        epoch = page.epoch;
+        since = page.cursor;
+        more = page.more;
+    }
+}
+
+async function syncWithServer() {
+    if (!currentUser || !currentPassword || syncInProgress || !navigator.onLine) return;
+    syncInProgress = true;
+
+    try {
+        if (currentRole === 'admin') {
+            await pushChanges();
+        }
+        await pullChanges();
+        showToast('Synced with server', 'success');
+
+        if (currentRole === 'admin') {
+            updateAdminDashboard();
+        } else {
+            updateReportDashboard();
+        }
+    } catch (error) {
+        console.error('Sync error:', error);
+        showToast('Sync failed: ' + error.message, 'warning');
+    } finally {
+        syncInProgress = false;
+    }
+}
+
 // Helper Functions
 function calculateDayNumber(date, startDate) {
     if (!startDate) return 0;
@@ -311,6 +671,12 @@ function calculateDayNumber(date, startDate) {
     return diffDays > 0 ? diffDays : 0;
 }
 
+function dayToDate(startDate, dayNumber) {
+    const date = new Date(startDate);
+    date.setUTCDate(date.getUTCDate() + dayNumber - 1);
+    return date.toISOString().split('T')[0];
+}
+
 function calculateProgress(startDate) {
     const today = new Date();
     const start = new Date(startDate);
@@ -447,8 +813,7 @@ async function updateTaskList() {
     const tasksContainer = document.getElementById('tasks-container');
     const noTasks = document.getElementById('no-tasks');
     
-    let tasks = await getAllTasks(filterDate);
-    tasks = tasks.slice(0, tasksLimit);
+    const tasks = await getAllTasks(filterDate, tasksLimit);
     
     if (tasks.length === 0) {
         tasksContainer.innerHTML = '';
@@ -509,20 +874,12 @@ async function updateReportDashboard() {
     await updateReportTasks();
 }
 
-async function updateReportTasks() {
+// Render the report's first page, or the next one when loadMore is true
+async function updateReportTasks(loadMore = false) {
+    const render = ++reportRender;
     const tasksContainer = document.getElementById('report-tasks-container');
     const noTasks = document.getElementById('no-report-tasks');
     
-    let tasks = await getTasksByDayOrder();
-    
-    if (tasks.length === 0) {
-        tasksContainer.innerHTML = '';
-        noTasks.style.display = 'block';
-        return;
-    }
-    
-    noTasks.style.display = 'none';
-    
     // Get filter values
     const minDay = parseInt(document.getElementById('day-range-min').value);
     const maxDay = parseInt(document.getElementById('day-range-max').value);
@@ -532,20 +889,47 @@ async function updateReportTasks() {
     document.getElementById('range-min').textContent = `Day ${minDay}`;
     document.getElementById('range-max').textContent = `Day ${maxDay}`;
     
-    // Filter tasks
-    const filteredTasks = tasks.filter(task => {
-        const dayMatch = task.dayNumber >= minDay && task.dayNumber <= maxDay;
-        const searchMatch = !searchTerm || task.task.toLowerCase().includes(searchTerm);
-        return dayMatch && searchMatch;
-    });
+    if (loadMore !== true) {
+        reportCursor = null;
+    }
+    
+    // Only the page is read; the total comes from a cached count
+    const bounds = await getTaskDateBounds();
+    const [tasks, total] = bounds.first ? await Promise.all([
+        getTasksByDayOrder({
+            dayFrom: minDay, dayTo: maxDay, searchTerm, after: reportCursor, limit: REPORT_PAGE_SIZE + 1
+        }),
+        countReportTasks(minDay, maxDay, searchTerm)
+    ]) : [[], 0];
+    if (render !== reportRender) return;
+    
+    if (!bounds.first) {
+        tasksContainer.innerHTML = '';
+        noTasks.style.display = 'block';
+        return;
+    }
+    
+    noTasks.style.display = 'none';
     
     // Update statistics
-    document.getElementById('report-days').textContent = filteredTasks.length;
+    document.getElementById('report-days').textContent = total;
     
     // Display tasks
-    tasksContainer.innerHTML = '';
+    if (loadMore !== true) {
+        tasksContainer.innerHTML = '';
+    }
+    const loadMoreButton = tasksContainer.querySelector('.report-load-more');
+    if (loadMoreButton) {
+        loadMoreButton.remove();
+    }
+    
+    const hasMore = tasks.length > REPORT_PAGE_SIZE;
+    const pageTasks = tasks.slice(0, REPORT_PAGE_SIZE);
+    if (pageTasks.length > 0) {
+        reportCursor = pageTasks[pageTasks.length - 1].date;
+    }
     
-    filteredTasks.forEach(task => {
+    pageTasks.forEach(task => {
         const taskElement = document.createElement('div');
         taskElement.className = 'report-task-item';
         taskElement.innerHTML = `
@@ -558,6 +942,14 @@ async function updateReportTasks() {
         
         tasksContainer.appendChild(taskElement);
     });
+    
+    if (hasMore) {
+        const button = document.createElement('button');
+        button.className = 'btn btn-secondary report-load-more';
+        button.innerHTML = '<i class="fas fa-chevron-down"></i> Load more';
+        button.addEventListener('click', () => updateReportTasks(true));
+        tasksContainer.appendChild(button);
+    }
 }
 
 async function updateStatistics() {
@@ -738,11 +1130,21 @@ function setupEventListeners() {
     
     document.getElementById('db-info').addEventListener('click', showDatabaseInfo);
     document.getElementById('backup-db').addEventListener('click', handleBackupDatabase);
+
+    // Sync (the button is optional in the page)
+    const syncButton = document.getElementById('sync-db');
+    if (syncButton) {
+        syncButton.addEventListener('click', syncWithServer);
+    }
+    window.addEventListener('online', syncWithServer);
     
     // Report filters
     document.getElementById('day-range-min').addEventListener('input', updateReportTasks);
     document.getElementById('day-range-max').addEventListener('input', updateReportTasks);
-    document.getElementById('search-tasks').addEventListener('input', updateReportTasks);
+    document.getElementById('search-tasks').addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(updateReportTasks, SEARCH_DELAY);
+    });
     
     // Modals
     document.querySelectorAll('.close-modal').forEach(button => {
@@ -792,6 +1194,7 @@ async function handleLogin() {
     if (user) {
         currentUser = user.username;
         currentRole = user.role;
+        currentPassword = password;
         
         // Switch to appropriate dashboard
         document.getElementById('login-screen').classList.remove('active');
@@ -807,6 +1210,7 @@ async function handleLogin() {
         }
         
         showToast(`Welcome ${currentUser}!`, 'success');
+        syncWithServer();
     } else {
         showToast('Invalid username or password', 'error');
     }
@@ -815,6 +1219,7 @@ async function handleLogin() {
 function handleLogout() {
     currentUser = null;
     currentRole = null;
+    currentPassword = null;
     
     document.querySelectorAll('.screen').forEach(screen => {
         screen.classList.remove('active');
@@ -937,18 +1342,19 @@ function showConfirmModal(message, callback) {
     showModal('confirm-modal');
 }
 
-function handleBackupDatabase() {
+async function handleBackupDatabase() {
     // This would typically export all data
-    // For simplicity, we'll export tasks as JSON
-    getAllTasks().then(tasks => {
-        if (tasks.length > 0) {
-            exportToJSON(tasks.map(task => ({
-                ...task,
-                dayNumber: calculateDayNumber(task.date, getSetting('startDate'))
-            })));
-            showToast('Database backup created!', 'success');
-        } else {
-            showToast('No data to backup', 'warning');
-        }
+    // For simplicity, we'll export tasks as JSON, oldest first
+    const startDate = await getSetting('startDate');
+    const tasks = [];
+    await iterateTasks(null, 'next', task => {
+        tasks.push({ ...task, dayNumber: calculateDayNumber(task.date, startDate) });
     });
+    
+    if (tasks.length > 0) {
+        exportToJSON(tasks);
+        showToast('Database backup created!', 'success');
+    } else {
+        showToast('No data to backup', 'warning');
+    }
 }
@@ -0,0 +1,3810 @@
+"""Data layer of the internship tracker: storage, statistics, exports and imports
+
+Nothing here imports Streamlit, and no database is opened until a helper
+first needs one, so workers, benchmarks and servers can import it cheaply.
+mytask.py is the Streamlit UI on top of it.
+"""
+from datetime import date, timedelta, datetime
+import io
+import csv
+import json
+import logging
+import sqlite3
+import os
+import re
+import threading
+import time
+import queue
+import bisect
+import itertools
+import functools
+import gzip
+import shutil
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# ---------------- CONFIG ----------------
+TOTAL_DAYS = 548
+DATE_DISPLAY_FORMAT = "%A, %d %B %Y"
+# User credentials
+USERS = {
+    "admin": "admin@asmath",  # Full admin access
+    "admin2": "admin@AHBETA"  # Report-only access
+}
+
+# SQLite Database File
+DB_FILE = "internship_tracker.db"
+# A postgres:// or postgresql:// URL stores data in PostgreSQL instead of DB_FILE
+DATABASE_URL = os.environ.get("DATABASE_URL", "")
+
+# SQLite connection tuning, applied to every connection the app opens
+DB_PRAGMAS = {
+    "journal_mode": "WAL",  # readers no longer block on the writer
+    "synchronous": "NORMAL",  # fsync at checkpoints only; safe with WAL
+    "cache_size": -16000,  # page cache per connection, in KiB
+    "mmap_size": 64 * 1024 * 1024,  # bytes of the file read via mmap
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000  # ms to wait for a lock held by another process
+}
+
+# Read connection pool shared by all sessions
+DB_POOL_SIZE = 8  # max concurrent read connections
+DB_POOL_TIMEOUT = 10  # seconds to wait for a free connection
+DB_POOL_HEALTH_CHECK_AFTER = 60  # seconds idle before a connection is re-checked
+DB_EXTERNAL_WRITE_CHECK = 1.0  # seconds between checks for commits by other processes
+
+# Interns (each has their own task log and start date)
+DEFAULT_INTERN = "default"
+DEFAULT_INTERN_NAME = "Default Intern"
+
+# Report pagination
+DEFAULT_REPORT_PAGE_SIZE = 25
+
+# Exports are streamed from the database in batches of this many rows
+EXPORT_BATCH_SIZE = 500
+EXPORT_COLUMNS = ["Day Number", "Date", "Task"]
+
+# Bulk import
+IMPORT_FILE_TYPES = ["csv", "json", "xlsx"]
+IMPORT_DATE_FORMATS = ["%Y-%m-%d", DATE_DISPLAY_FORMAT, "%A, %B %d, %Y"]
+IMPORT_DATE_COLUMNS = {"task_date", "date"}
+IMPORT_TASK_COLUMNS = {"task", "task_description", "description"}
+
+# Local storage journal (fallback mode)
+LOCAL_JOURNAL_FILE = "internship_local_journal.jsonl"
+JOURNAL_SYNC_RECORDS = 50  # fsync after this many writes
+JOURNAL_SYNC_INTERVAL = 1.0  # ...or this many seconds after the first unsynced write
+JOURNAL_COMPACT_AFTER = 5000  # rewrite the journal as a snapshot past this many records
+
+# Analytics
+ANALYTICS_ROLLING_TASKS = 7  # tasks averaged in the word count trend
+
+# Read query cache
+QUERY_CACHE_SIZE = 256  # max cached result sets
+QUERY_CACHE_TTL = 300  # seconds before a cached result is re-read
+
+# Rerun profiling
+# Append every rerun's timings to this file as JSON lines (off if empty)
+PROFILE_LOG_FILE = os.environ.get("PROFILE_LOG_FILE", "")
+PROFILE_KINDS = ["sql", "python", "export", "render"]
+
+# Online SQLite backups
+BACKUP_DIR = "backups"
+BACKUP_PAGES_PER_STEP = 256  # pages copied per step; the app can write in between
+BACKUP_STEP_PAUSE = 0.005  # seconds the write lock is left free between steps
+BACKUP_COMPRESS = True  # gzip finished backups
+BACKUP_KEEP = 10  # newest backups kept, older ones are deleted
+BACKUP_REQUIRED_TABLES = {"users", "tasks", "settings"}  # present since the first release
+
+# Delta sync with the browser client
+SYNC_PAGE_SIZE = 500  # changes returned per pull
+SYNC_SETTINGS = {"start_date"}  # settings clients may change
+
+# Background jobs (exports, backups and bulk operations)
+JOBS_DB_FILE = "internship_jobs.db"
+JOB_RESULT_DIR = "job_results"
+JOB_WORKERS = 2
+JOB_PROGRESS_INTERVAL = 0.5  # seconds between progress writes to the job table
+JOB_KEEP_DAYS = 7  # finished jobs and their result files are deleted after this
+
+# ---------------- CONTEXT ----------------
+def log_message(level, message):
+    """Log a status message (the default message handler)"""
+    logger.log(logging.ERROR if level == "error" else logging.INFO, message)
+
+# What the UI plugs in: where status messages go and which intern helpers
+# work with by default. Headless callers log and use DEFAULT_INTERN.
+context_hooks = {"message": log_message, "intern": lambda: DEFAULT_INTERN}
+
+def set_message_handler(handler):
+    """Send status messages to handler(level, message); level is error, success or info"""
+    context_hooks["message"] = handler
+
+def set_intern_resolver(resolver):
+    """Use resolver() as the intern of helper calls made without an intern_id"""
+    context_hooks["intern"] = resolver
+
+def notify(level, message):
+    """Report a status message through the message handler"""
+    context_hooks["message"](level, message)
+
+def resolve_intern(intern_id=None):
+    """Get the intern a helper works with: the one passed or the resolver's"""
+    return intern_id or context_hooks["intern"]()
+
+# ---------------- SQLITE DATABASE FUNCTIONS ----------------
+class PoolTimeout(Exception):
+    """No pooled connection became free within the checkout timeout"""
+
+class ConnectionPool:
+    """Thread-safe bounded pool of DB-API connections
+    
+    At most ``size`` connections are checked out at once; further callers
+    wait up to ``timeout`` seconds and then get PoolTimeout. Connections
+    idle for longer than ``health_check_after`` are tested with SELECT 1
+    before reuse and replaced if broken. Works with any DB-API driver,
+    e.g. sqlite3 or psycopg2 (see create_postgres_pool).
+    """
+
+    def __init__(self, connect, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 health_check_after=DB_POOL_HEALTH_CHECK_AFTER):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self.slots = threading.BoundedSemaphore(size)
+        self.idle = queue.LifoQueue()  # (connection, returned_at); reuse the warmest
+        self.lock = threading.Lock()
+        self.in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.created = 0
+        self.replaced = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def is_healthy(self, connection):
+        """Check a connection still answers queries"""
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """Check out a connection, waiting for a free slot if needed"""
+        started = time.monotonic()
+        if not self.slots.acquire(timeout=self.timeout):
+            with self.lock:
+                self.timeouts += 1
+            raise PoolTimeout(f"No database connection free after {self.timeout}s")
+        waited = time.monotonic() - started
+        
+        try:
+            connection, returned_at = self.idle.get_nowait()
+        except queue.Empty:
+            connection, returned_at = None, None
+        
+        try:
+            stale = returned_at is not None and time.monotonic() - returned_at > self.health_check_after
+            if stale and not self.is_healthy(connection):
+                connection.close()
+                connection = None
+                with self.lock:
+                    self.replaced += 1
+            if connection is None:
+                connection = self.connect()
+                with self.lock:
+                    self.created += 1
+        except Exception:
+            self.slots.release()
+            raise
+        
+        with self.lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return connection
+
+    def release(self, connection):
+        """Return a checked out connection to the pool"""
+        with self.lock:
+            self.in_use -= 1
+        self.idle.put((connection, time.monotonic()))
+        self.slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with block"""
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def stats(self):
+        """Get pool usage and wait time counters"""
+        with self.lock:
+            return {
+                "size": self.size,
+                "in_use": self.in_use,
+                "idle": self.idle.qsize(),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "created": self.created,
+                "replaced": self.replaced,
+                "avg_wait_ms": (self.total_wait / self.checkouts * 1000) if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000
+            }
+
+def create_postgres_pool(dsn, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT):
+    """Create a ConnectionPool of PostgreSQL connections (needs psycopg2)"""
+    import psycopg2
+    import psycopg2.extensions
+    
+    class PooledConnection(psycopg2.extensions.connection):
+        """psycopg2 connection that remembers its prepared statements"""
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.prepared = set()
+    
+    def connect():
+        connection = psycopg2.connect(dsn, connection_factory=PooledConnection)
+        connection.autocommit = True
+        return connection
+    
+    return ConnectionPool(connect, size=size, timeout=timeout)
+
+class ConnectionManager:
+    """SQLite connections: one serialized writer plus a pool of readers
+    
+    Sessions borrow read-only connections from a bounded pool, so they never
+    share a cursor and, in WAL mode, read alongside the single writer. The
+    manager also holds the database's query cache and, per thread, the open
+    transaction(). Other processes (the API, a second UI) may write to the
+    same file, so the cache is dropped when the file's data_version moves.
+    """
+
+    def __init__(self, db_file, pragmas=None, pool_size=DB_POOL_SIZE, pool_timeout=DB_POOL_TIMEOUT):
+        self.db_file = db_file
+        self.pragmas = dict(DB_PRAGMAS if pragmas is None else pragmas)
+        self.write_lock = threading.RLock()
+        self.query_cache = QueryCache()
+        self.transactions = threading.local()
+        self.external_version = None
+        self.external_checked_at = 0.0
+        self.writer = self.connect()
+        self.read_pool = ConnectionPool(
+            lambda: self.connect(read_only=True), size=pool_size, timeout=pool_timeout
+        )
+
+    def connect(self, read_only=False):
+        """Open a connection with the configured pragmas"""
+        # Pooled readers move between threads, and the writer is shared under write_lock
+        connection = sqlite3.connect(self.db_file, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        if read_only:
+            connection.execute("PRAGMA query_only = ON")
+        return connection
+
+    def read_connection(self):
+        """Borrow a read-only connection from the pool (context manager)"""
+        return self.read_pool.connection()
+
+    def check_external_writes(self, max_age=DB_EXTERNAL_WRITE_CHECK):
+        """Drop the query cache if another process committed since the last check
+        
+        The check is skipped when the last one is under max_age seconds old.
+        Returns the writer's PRAGMA data_version, which only moves on commits
+        made through other connections.
+        """
+        if time.monotonic() - self.external_checked_at < max_age:
+            return self.external_version
+        with self.write_lock:
+            self.external_checked_at = time.monotonic()
+            version = self.writer.execute("PRAGMA data_version").fetchone()[0]
+            if self.external_version is not None and version != self.external_version:
+                self.query_cache.invalidate()
+            self.external_version = version
+            return version
+
+    def effective_pragmas(self):
+        """Read back the pragma values SQLite actually applied"""
+        with self.write_lock:
+            return {
+                name: self.writer.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in self.pragmas
+            }
+
+def create_tables(conn):
+    """Create necessary tables if they don't exist"""
+    try:
+        cursor = conn.cursor()
+        
+        # Create users table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL,
+                role TEXT NOT NULL DEFAULT 'viewer',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Create interns table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS interns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                intern_id TEXT UNIQUE NOT NULL,
+                name TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute(
+            "INSERT OR IGNORE INTO interns (intern_id, name) VALUES (?, ?)",
+            (DEFAULT_INTERN, DEFAULT_INTERN_NAME)
+        )
+        
+        # Create tasks table
+        cursor.execute(TASKS_TABLE_SQL.format(table="tasks"))
+        
+        # Add columns missing from databases created by older versions
+        task_columns = {row[1] for row in cursor.execute("PRAGMA table_info(tasks)")}
+        if "day_number" not in task_columns:
+            cursor.execute("ALTER TABLE tasks ADD COLUMN day_number INTEGER")
+        if "formatted_date" not in task_columns:
+            cursor.execute("ALTER TABLE tasks ADD COLUMN formatted_date TEXT")
+        if "revision" not in task_columns:
+            cursor.execute("ALTER TABLE tasks ADD COLUMN revision INTEGER NOT NULL DEFAULT 1")
+        
+        # Create settings table
+        cursor.execute(SETTINGS_TABLE_SQL.format(table="settings"))
+        
+        # Move single-intern tables from older versions to the intern layout
+        migrate_to_interns(cursor)
+        
+        # Create full-text search index kept in sync with tasks by triggers
+        create_search_index(cursor)
+        
+        # Create pre-aggregated dashboard statistics kept current by triggers
+        create_stats_tables(cursor)
+        
+        # Create the change log that sync clients pull from
+        create_sync_tables(cursor)
+        
+        # Create indexes for better performance; every task and setting
+        # lookup is scoped to one intern
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_intern_date ON tasks(intern_id, task_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_intern_day ON tasks(intern_id, day_number)")
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_settings_intern_key ON settings(intern_id, setting_key)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)")
+        
+        # Backfill materialized day columns for rows written by older versions
+        missing = cursor.execute(
+            "SELECT id, task_date FROM tasks WHERE formatted_date IS NULL"
+        ).fetchall()
+        if missing:
+            cursor.executemany(
+                "UPDATE tasks SET formatted_date = ? WHERE id = ?",
+                [(format_task_date(row[1]), row[0]) for row in missing]
+            )
+            cursor.execute(RECALCULATE_DAY_NUMBERS_SQL)
+        
+        conn.commit()
+        
+        # Initialize default users
+        for username, password in USERS.items():
+            role = "admin" if username == "admin" else "viewer"
+            try:
+                cursor.execute("""
+                    INSERT INTO users (username, password, role)
+                    VALUES (?, ?, ?)
+                """, (username, password, role))
+            except sqlite3.IntegrityError:
+                pass  # User already exists
+        
+        conn.commit()
+        
+    except Exception as e:
+        conn.rollback()
+        notify("error", f"Error creating tables: {str(e)}")
+
+TASKS_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {{table}} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        intern_id TEXT NOT NULL DEFAULT '{DEFAULT_INTERN}',
+        task_date TEXT NOT NULL,
+        task TEXT NOT NULL,
+        day_number INTEGER,
+        formatted_date TEXT,
+        revision INTEGER NOT NULL DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+SETTINGS_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {{table}} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        intern_id TEXT NOT NULL DEFAULT '{DEFAULT_INTERN}',
+        setting_key TEXT NOT NULL,
+        setting_value TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+def migrate_to_interns(cursor):
+    """Rebuild tasks/settings tables from single-intern versions
+    
+    Older databases have UNIQUE constraints on task_date and setting_key,
+    which SQLite cannot drop in place, so both tables are copied into the
+    per-intern layout with existing rows assigned to the default intern.
+    """
+    task_columns = {row[1] for row in cursor.execute("PRAGMA table_info(tasks)")}
+    setting_columns = {row[1] for row in cursor.execute("PRAGMA table_info(settings)")}
+    if "intern_id" in task_columns and "intern_id" in setting_columns:
+        return
+    
+    cursor.execute("SAVEPOINT migrate_interns")
+    try:
+        if "intern_id" not in task_columns:
+            # The search index is rebuilt against the new table afterwards
+            cursor.execute("DROP TABLE IF EXISTS tasks_fts")
+            cursor.execute(TASKS_TABLE_SQL.format(table="tasks_migrated"))
+            cursor.execute("""
+                INSERT INTO tasks_migrated
+                    (id, intern_id, task_date, task, day_number, formatted_date, revision, created_at, updated_at)
+                SELECT id, ?, task_date, task, day_number, formatted_date, revision, created_at, updated_at
+                FROM tasks
+            """, (DEFAULT_INTERN,))
+            cursor.execute("DROP TABLE tasks")
+            cursor.execute("ALTER TABLE tasks_migrated RENAME TO tasks")
+        
+        if "intern_id" not in setting_columns:
+            cursor.execute(SETTINGS_TABLE_SQL.format(table="settings_migrated"))
+            cursor.execute("""
+                INSERT INTO settings_migrated (id, intern_id, setting_key, setting_value, updated_at)
+                SELECT id, ?, setting_key, setting_value, updated_at
+                FROM settings
+            """, (DEFAULT_INTERN,))
+            cursor.execute("DROP TABLE settings")
+            cursor.execute("ALTER TABLE settings_migrated RENAME TO settings")
+        
+        cursor.execute("RELEASE migrate_interns")
+    except Exception:
+        cursor.execute("ROLLBACK TO migrate_interns")
+        cursor.execute("RELEASE migrate_interns")
+        raise
+
+# ---------------- QUERY CACHE ----------------
+READ_TABLES_RE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)", re.IGNORECASE)
+WRITE_TABLE_RE = re.compile(
+    r"^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|UPDATE|DELETE\s+FROM|REPLACE\s+INTO)\s+(\w+)",
+    re.IGNORECASE
+)
+# Tables that triggers write whenever the key table is written
+TRIGGER_WRITES = {
+    "tasks": {"task_stats", "task_period_counts", "sync_changes", "sync_state"},
+    "settings": {"sync_changes", "sync_state"}
+}
+
+class QueryCache:
+    """LRU cache of read query results with TTL and per-table invalidation"""
+
+    def __init__(self, max_entries=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, tables, result)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.table_versions = {}  # table -> invalidation count when last written
+        self.cleared_version = 0
+
+    def get(self, key):
+        """Return (hit, result) for a cache key"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, _, result = entry
+                if expires_at > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True, copy_result(result)
+                del self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, tables, result):
+        """Store a result, evicting the least recently used entry when full"""
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, tables, copy_result(result))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, tables=None):
+        """Drop cached results reading any of the given tables (all if None)"""
+        with self.lock:
+            self.invalidations += 1
+            if tables is None:
+                self.entries.clear()
+                self.cleared_version = self.invalidations
+            else:
+                for key in [k for k, (_, t, _) in self.entries.items() if t & tables]:
+                    del self.entries[key]
+                for table in tables:
+                    self.table_versions[table] = self.invalidations
+
+    def table_version(self, table):
+        """Get a counter that changes whenever the table is written"""
+        with self.lock:
+            return max(self.table_versions.get(table, 0), self.cleared_version)
+
+    def stats(self):
+        """Get hit/miss counters"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups * 100) if lookups else 0.0,
+                "entries": len(self.entries),
+                "invalidations": self.invalidations
+            }
+
+def copy_result(result):
+    """Copy query rows so callers cannot mutate cached results"""
+    if isinstance(result, list):
+        return [dict(row) for row in result]
+    if isinstance(result, dict):
+        return dict(result)
+    return result
+
+def tables_read_by(query):
+    """Get the set of tables a SELECT query reads from"""
+    return frozenset(table.lower() for table in READ_TABLES_RE.findall(query))
+
+def table_written_by(query):
+    """Get the table a write query modifies, or None if unknown"""
+    match = WRITE_TABLE_RE.match(query)
+    return match.group(1).lower() if match else None
+
+# ---------------- PROFILING ----------------
+class RerunProfile:
+    """Timed sections of one script rerun, in the order they started"""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.entries = []
+        self.open_sections = []
+        self.total_ms = None
+
+    def start(self, name, kind, query=None):
+        """Open a section nested in the innermost open one"""
+        entry = {"name": name, "kind": kind, "depth": len(self.open_sections), "ms": 0.0, "child_ms": 0.0}
+        if query:
+            entry["query"] = " ".join(query.split())
+        self.entries.append(entry)
+        self.open_sections.append((entry, time.perf_counter()))
+        return entry
+
+    def stop(self):
+        """Close the innermost section, charging its time to its parent"""
+        entry, started = self.open_sections.pop()
+        entry["ms"] = (time.perf_counter() - started) * 1000
+        if self.open_sections:
+            self.open_sections[-1][0]["child_ms"] += entry["ms"]
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    def summary(self):
+        """Milliseconds spent per kind, excluding nested sections
+        
+        "other" is time outside any section, such as widget calls made
+        directly in the main script.
+        """
+        totals = dict.fromkeys(PROFILE_KINDS, 0.0)
+        for entry in self.entries:
+            totals[entry["kind"]] += entry["ms"] - entry["child_ms"]
+        top_level = sum(entry["ms"] for entry in self.entries if entry["depth"] == 0)
+        totals["other"] = max((self.total_ms or 0) - top_level, 0.0)
+        return totals
+
+    def to_record(self):
+        """JSON-ready record of the rerun"""
+        return {
+            "started_at": self.started_at.isoformat(timespec="milliseconds"),
+            "total_ms": round(self.total_ms or 0, 3),
+            "summary": {kind: round(ms, 3) for kind, ms in self.summary().items()},
+            "sections": [
+                {**entry, "ms": round(entry["ms"], 3), "child_ms": round(entry["child_ms"], 3)}
+                for entry in self.entries
+            ]
+        }
+
+active_profile = threading.local()
+profile_log_lock = threading.Lock()
+
+@contextmanager
+def rerun_profile(log_file=PROFILE_LOG_FILE):
+    """Profile one rerun on this thread, appending it to log_file if set"""
+    profile = RerunProfile()
+    active_profile.profile = profile
+    try:
+        yield profile
+    finally:
+        active_profile.profile = None
+        profile.finish()
+        if log_file:
+            line = json.dumps(profile.to_record(), default=str)
+            with profile_log_lock, open(log_file, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+@contextmanager
+def profile_section(name, kind="python", query=None):
+    """Time a block in the current rerun's profile, yielding its entry
+    
+    Callers can add details such as "rows" to the entry. Outside
+    rerun_profile() this does nothing.
+    """
+    profile = getattr(active_profile, "profile", None)
+    if profile is None:
+        yield {}
+        return
+    
+    entry = profile.start(name, kind, query)
+    try:
+        yield entry
+    finally:
+        profile.stop()
+
+def profiled(kind="python"):
+    """Decorator timing every call of a function as a profile section
+    
+    Lists and DataFrames record their row count, bytes and (bytes, ok)
+    export results their size.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with profile_section(function.__name__, kind) as entry:
+                result = function(*args, **kwargs)
+                size = result[0] if isinstance(result, tuple) and result else result
+                if isinstance(size, list) or hasattr(size, "columns"):
+                    entry["rows"] = len(size)
+                elif isinstance(size, bytes):
+                    entry["bytes"] = len(size)
+                return result
+        return wrapper
+    return decorator
+
+# ---------------- TRANSACTIONS ----------------
+class UnitOfWork:
+    """Tables written by an open transaction, invalidated when it ends"""
+
+    def __init__(self, query_cache):
+        self.query_cache = query_cache
+        self.tables = set()
+        self.unknown_tables = False
+
+    def touch(self, table):
+        """Record a write to a table (None if the table is unknown)"""
+        if table:
+            self.tables.add(table)
+            self.tables.update(TRIGGER_WRITES.get(table, ()))
+        else:
+            self.unknown_tables = True
+
+    def wrote_any(self, tables):
+        """Check whether this unit has uncommitted writes to any of the tables"""
+        return self.unknown_tables or bool(self.tables & tables)
+
+    def invalidate_cache(self):
+        """Drop cached reads of every table this unit wrote to"""
+        if self.unknown_tables:
+            self.query_cache.invalidate()
+        elif self.tables:
+            self.query_cache.invalidate(self.tables)
+
+@contextmanager
+def transaction(manager):
+    """Group writes to a database into a single commit, yielding the UnitOfWork
+    
+    Writes through execute_query inside the block share one
+    BEGIN IMMEDIATE ... COMMIT and are rolled back together if the block
+    raises. Nested blocks join the outermost transaction.
+    """
+    with manager.write_lock:
+        unit = getattr(manager.transactions, "unit", None)
+        if unit is not None:
+            yield unit
+            return
+        
+        unit = UnitOfWork(manager.query_cache)
+        manager.transactions.unit = unit
+        try:
+            if not manager.writer.in_transaction:
+                manager.writer.execute("BEGIN IMMEDIATE")
+            yield unit
+            manager.writer.commit()
+        except BaseException:
+            manager.writer.rollback()
+            raise
+        finally:
+            manager.transactions.unit = None
+            unit.invalidate_cache()
+
+def in_transaction(manager):
+    """Check whether this thread has a transaction() open on the database"""
+    return getattr(manager.transactions, "unit", None) is not None
+
+# ---------------- DAY NUMBERS ----------------
+# Day numbers and display dates are stored on each task row so the report
+# can be read in order straight from the idx_tasks_intern_day index.
+# They only need recalculating in bulk when the start date changes.
+RECALCULATE_DAY_NUMBERS_SQL = """
+    UPDATE tasks
+    SET day_number = NULLIF(MAX(CAST(
+        julianday(task_date) - julianday(
+            (SELECT setting_value FROM settings
+             WHERE settings.intern_id = tasks.intern_id AND setting_key = 'start_date')
+        ) AS INTEGER) + 1, 0), 0)
+"""
+
+def calculate_day_number(task_date_str, start_date_str):
+    """Get the 1-based internship day for a date, or None before the start"""
+    if not start_date_str:
+        return None
+    try:
+        day_num = (date.fromisoformat(task_date_str) - date.fromisoformat(start_date_str)).days + 1
+    except (TypeError, ValueError):
+        return None
+    return day_num if day_num > 0 else None
+
+def format_task_date(task_date_str):
+    """Format an ISO date for display in reports"""
+    return date.fromisoformat(task_date_str).strftime(DATE_DISPLAY_FORMAT)
+
+# ---------------- FULL-TEXT SEARCH ----------------
+SEARCH_TERM_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+def create_search_index(cursor):
+    """Create the FTS5 index over task text, if this SQLite build supports it"""
+    index_exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'"
+    ).fetchone()
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts
+            USING fts5(task, content='tasks', content_rowid='id')
+        """)
+    except sqlite3.OperationalError:
+        return  # No FTS5 support; searches fall back to LIKE
+    
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, task) VALUES (new.id, new.task);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, task) VALUES ('delete', old.id, old.task);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF task ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, task) VALUES ('delete', old.id, old.task);
+            INSERT INTO tasks_fts(rowid, task) VALUES (new.id, new.task);
+        END
+    """)
+    
+    # Index tasks written before the search index existed
+    if not index_exists:
+        cursor.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+# ---------------- TASK STATISTICS ----------------
+# Dashboard metrics are kept per intern in task_stats and task_period_counts
+# by triggers, so reading them costs one primary-key lookup however long the
+# log is. Streaks depend on every date, so writes only mark them stale and
+# the next read recalculates them once.
+PERIOD_FORMATS = {"week": "%Y-W%W", "month": "%Y-%m"}
+
+REBUILD_TASK_STATS_SQL = [
+    "DELETE FROM task_stats",
+    """
+    INSERT INTO task_stats (intern_id, task_count, numbered_count, min_day, max_day, first_date, last_date)
+    SELECT intern_id, COUNT(*), COUNT(day_number), MIN(day_number), MAX(day_number), MIN(task_date), MAX(task_date)
+    FROM tasks
+    GROUP BY intern_id
+    """,
+    "DELETE FROM task_period_counts",
+    f"""
+    INSERT INTO task_period_counts (intern_id, period_type, period, count)
+    SELECT intern_id, 'week', strftime('{PERIOD_FORMATS["week"]}', task_date), COUNT(*) FROM tasks GROUP BY 1, 3
+    UNION ALL
+    SELECT intern_id, 'month', strftime('{PERIOD_FORMATS["month"]}', task_date), COUNT(*) FROM tasks GROUP BY 1, 3
+    """
+]
+
+# Consecutive dates share julianday(date) - row number, so each group is one streak
+STREAKS_SQL = """
+    WITH runs AS (
+        SELECT task_date, julianday(task_date) - ROW_NUMBER() OVER (ORDER BY task_date) AS run
+        FROM tasks
+        WHERE intern_id = ?
+    ), streaks AS (
+        SELECT run, COUNT(*) AS length FROM runs GROUP BY run
+    )
+    SELECT COALESCE(MAX(length), 0) AS longest_streak,
+           COALESCE((SELECT length FROM streaks ORDER BY run DESC LIMIT 1), 0) AS last_streak
+    FROM streaks
+"""
+
+# Runs of consecutive dates per intern, the same gaps-and-islands grouping as STREAKS_SQL
+TASK_RUNS_SQL = """
+    SELECT intern_id, MIN(task_date) AS first_date, MAX(task_date) AS last_date
+    FROM (
+        SELECT intern_id, task_date,
+               julianday(task_date) - ROW_NUMBER() OVER (PARTITION BY intern_id ORDER BY task_date) AS run
+        FROM tasks
+        {where}
+    )
+    GROUP BY intern_id, run
+    ORDER BY intern_id, first_date
+"""
+
+def create_stats_tables(cursor):
+    """Create the statistics tables and the triggers that maintain them"""
+    triggers_exist = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'tasks_stats_insert'"
+    ).fetchone()
+    
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS task_stats (
+            intern_id TEXT PRIMARY KEY,
+            task_count INTEGER NOT NULL DEFAULT 0,
+            numbered_count INTEGER NOT NULL DEFAULT 0,
+            min_day INTEGER,
+            max_day INTEGER,
+            first_date TEXT,
+            last_date TEXT,
+            longest_streak INTEGER,
+            last_streak INTEGER,
+            streaks_stale INTEGER NOT NULL DEFAULT 1
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS task_period_counts (
+            intern_id TEXT NOT NULL,
+            period_type TEXT NOT NULL,
+            period TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (intern_id, period_type, period)
+        )
+    """)
+    
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_stats_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO task_stats (intern_id) VALUES (new.intern_id) ON CONFLICT DO NOTHING;
+            UPDATE task_stats SET
+                task_count = task_count + 1,
+                numbered_count = numbered_count + (new.day_number IS NOT NULL),
+                min_day = MIN(COALESCE(min_day, new.day_number), COALESCE(new.day_number, min_day)),
+                max_day = MAX(COALESCE(max_day, new.day_number), COALESCE(new.day_number, max_day)),
+                first_date = MIN(COALESCE(first_date, new.task_date), new.task_date),
+                last_date = MAX(COALESCE(last_date, new.task_date), new.task_date),
+                streaks_stale = 1
+            WHERE intern_id = new.intern_id;
+            INSERT INTO task_period_counts (intern_id, period_type, period, count)
+            VALUES (new.intern_id, 'week', strftime('{PERIOD_FORMATS["week"]}', new.task_date), 1),
+                   (new.intern_id, 'month', strftime('{PERIOD_FORMATS["month"]}', new.task_date), 1)
+            ON CONFLICT (intern_id, period_type, period) DO UPDATE SET count = count + 1;
+        END
+    """)
+    # Removing a task can move the bounds; the replacements are read from the indexes
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_stats_delete AFTER DELETE ON tasks BEGIN
+            UPDATE task_stats SET
+                task_count = task_count - 1,
+                numbered_count = numbered_count - (old.day_number IS NOT NULL),
+                min_day = (SELECT MIN(day_number) FROM tasks WHERE intern_id = old.intern_id),
+                max_day = (SELECT MAX(day_number) FROM tasks WHERE intern_id = old.intern_id),
+                first_date = (SELECT MIN(task_date) FROM tasks WHERE intern_id = old.intern_id),
+                last_date = (SELECT MAX(task_date) FROM tasks WHERE intern_id = old.intern_id),
+                streaks_stale = 1
+            WHERE intern_id = old.intern_id;
+            UPDATE task_period_counts SET count = count - 1
+            WHERE intern_id = old.intern_id AND (
+                (period_type = 'week' AND period = strftime('{PERIOD_FORMATS["week"]}', old.task_date))
+                OR (period_type = 'month' AND period = strftime('{PERIOD_FORMATS["month"]}', old.task_date))
+            );
+            DELETE FROM task_period_counts WHERE intern_id = old.intern_id AND count <= 0;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_stats_day_number AFTER UPDATE OF day_number ON tasks
+        WHEN old.day_number IS NOT new.day_number BEGIN
+            UPDATE task_stats SET
+                numbered_count = numbered_count + (new.day_number IS NOT NULL) - (old.day_number IS NOT NULL),
+                min_day = (SELECT MIN(day_number) FROM tasks WHERE intern_id = new.intern_id),
+                max_day = (SELECT MAX(day_number) FROM tasks WHERE intern_id = new.intern_id)
+            WHERE intern_id = new.intern_id;
+        END
+    """)
+    
+    # Count tasks written before the triggers existed
+    if not triggers_exist:
+        for statement in REBUILD_TASK_STATS_SQL:
+            cursor.execute(statement)
+
+def period_key(task_date_str, period_type):
+    """Get the week or month a date belongs to, e.g. 2024-W03 or 2024-01"""
+    return date.fromisoformat(task_date_str).strftime(PERIOD_FORMATS[period_type])
+
+def count_streaks(task_dates):
+    """Get (longest streak, streak ending at the last date) from sorted ISO dates"""
+    longest = length = 0
+    previous = None
+    for task_date in map(date.fromisoformat, task_dates):
+        length = length + 1 if previous and task_date - previous == timedelta(days=1) else 1
+        longest = max(longest, length)
+        previous = task_date
+    return longest, length
+
+# ---------------- CHANGE TRACKING ----------------
+# Every task date and setting key has one row in sync_changes holding the
+# sequence number of its latest change, so a client that has seen changes
+# up to N pulls only what moved since. Deletes stay as tombstones. The
+# epoch changes when the database is replaced (a restore), which makes
+# clients start over from 0.
+SYNC_NOW_SQL = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"  # same format as JS toISOString()
+
+def sync_change_sql(intern_id, kind, item_key, deleted):
+    """Trigger statements recording a change under the next sequence number"""
+    return f"""
+        UPDATE sync_state SET last_seq = last_seq + 1;
+        INSERT INTO sync_changes (intern_id, kind, item_key, seq, deleted, changed_at)
+        VALUES ({intern_id}, '{kind}', {item_key}, (SELECT last_seq FROM sync_state), {deleted}, {SYNC_NOW_SQL})
+        ON CONFLICT (intern_id, kind, item_key) DO UPDATE
+        SET seq = excluded.seq, deleted = excluded.deleted, changed_at = excluded.changed_at;
+    """
+
+def create_sync_tables(cursor):
+    """Create the change log tables and the triggers that fill them"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            epoch TEXT NOT NULL,
+            last_seq INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_changes (
+            intern_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            item_key TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            changed_at TEXT NOT NULL,
+            PRIMARY KEY (intern_id, kind, item_key)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sync_changes_seq ON sync_changes(intern_id, seq)")
+    
+    triggers = {
+        "tasks_sync_insert": ("AFTER INSERT ON tasks", sync_change_sql("new.intern_id", "task", "new.task_date", 0)),
+        "tasks_sync_update": (
+            "AFTER UPDATE OF task, task_date ON tasks "
+            "WHEN old.task IS NOT new.task OR old.task_date IS NOT new.task_date",
+            sync_change_sql("new.intern_id", "task", "new.task_date", 0)
+        ),
+        "tasks_sync_move": (
+            "AFTER UPDATE OF task_date ON tasks WHEN old.task_date <> new.task_date",
+            sync_change_sql("old.intern_id", "task", "old.task_date", 1)
+        ),
+        "tasks_sync_delete": ("AFTER DELETE ON tasks", sync_change_sql("old.intern_id", "task", "old.task_date", 1)),
+        "settings_sync_insert": (
+            "AFTER INSERT ON settings", sync_change_sql("new.intern_id", "setting", "new.setting_key", 0)
+        ),
+        "settings_sync_update": (
+            "AFTER UPDATE OF setting_value ON settings WHEN old.setting_value IS NOT new.setting_value",
+            sync_change_sql("new.intern_id", "setting", "new.setting_key", 0)
+        ),
+        "settings_sync_delete": (
+            "AFTER DELETE ON settings", sync_change_sql("old.intern_id", "setting", "old.setting_key", 1)
+        ),
+    }
+    for name, (event, body) in triggers.items():
+        # Recreated on every start so databases pick up changed conditions
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {event} BEGIN {body} END")
+    
+    # Log rows written before change tracking existed
+    if cursor.execute("SELECT 1 FROM sync_state").fetchone() is None:
+        cursor.execute(f"""
+            INSERT INTO sync_changes (intern_id, kind, item_key, seq, deleted, changed_at)
+            SELECT intern_id, kind, item_key, ROW_NUMBER() OVER (ORDER BY kind, intern_id, item_key), 0, {SYNC_NOW_SQL}
+            FROM (
+                SELECT intern_id, 'task' AS kind, task_date AS item_key FROM tasks
+                UNION ALL
+                SELECT intern_id, 'setting', setting_key FROM settings
+            )
+            WHERE true
+            ON CONFLICT DO NOTHING
+        """)
+        cursor.execute("""
+            INSERT INTO sync_state (epoch, last_seq)
+            SELECT lower(hex(randomblob(8))), COALESCE(MAX(seq), 0) FROM sync_changes
+        """)
+
+# Change log rows with the current value of what changed
+SYNC_CHANGES_SQL = """
+    SELECT c.seq, c.kind, c.item_key, c.deleted, c.changed_at,
+           CASE c.kind WHEN 'task' THEN t.task ELSE s.setting_value END AS value
+    FROM sync_changes c
+    LEFT JOIN tasks t ON c.kind = 'task' AND t.intern_id = c.intern_id AND t.task_date = c.item_key
+    LEFT JOIN settings s ON c.kind = 'setting' AND s.intern_id = c.intern_id AND s.setting_key = c.item_key
+"""
+
+# ---------------- HELPER FUNCTIONS ----------------
+def execute_query(manager, query, params=None, fetch=False, fetchone=False, use_cache=True):
+    """Execute a query on a database, serving reads from its query cache
+    
+    Writes commit immediately unless made inside transaction(); writes
+    with a RETURNING clause can fetch their rows like a read.
+    """
+    written_table = table_written_by(query)
+    is_read = (fetch or fetchone) and written_table is None
+    cache_key = (query, tuple(params or ()), fetch)
+    unit = getattr(manager.transactions, "unit", None)
+    if is_read and unit and unit.wrote_any(tables_read_by(query)):
+        use_cache = False  # Must see this transaction's own writes
+    if is_read and use_cache:
+        manager.check_external_writes()
+        hit, result = manager.query_cache.get(cache_key)
+        if hit:
+            with profile_section("execute_query", "sql", query) as entry:
+                entry["cached"] = True
+                entry["rows"] = len(result) if fetch else int(result is not None)
+            return result
+    
+    try:
+        with profile_section("execute_query", "sql", query) as entry, \
+                nullcontext(unit) if is_read else transaction(manager) as unit:
+            # Reads inside a transaction use the writer to see its changes
+            with manager.read_connection() if is_read and not unit else nullcontext(manager.writer) as connection:
+                cursor = connection.cursor()
+                cursor.execute(query, params or ())
+                if unit and not is_read:
+                    unit.touch(written_table)
+                
+                if fetch or fetchone:
+                    rows = [dict(row) for row in cursor.fetchall()]
+                    result = rows if fetch else (rows[0] if rows else None)
+                    entry["rows"] = len(rows)
+                else:
+                    result = cursor.lastrowid
+                    entry["rows"] = cursor.rowcount
+    except Exception as e:
+        if in_transaction(manager):
+            raise  # Let the enclosing transaction roll back
+        notify("error", f"Database error: {str(e)}")
+        return None
+    
+    if is_read and use_cache:
+        manager.query_cache.set(cache_key, tables_read_by(query), result)
+    return result
+
+def execute_many(manager, query, rows):
+    """Execute a write query once per parameter row in one transaction"""
+    with profile_section("execute_many", "sql", query) as entry, transaction(manager) as unit:
+        cursor = manager.writer.cursor()
+        cursor.executemany(query, rows)
+        unit.touch(table_written_by(query))
+        entry["rows"] = cursor.rowcount
+
+def like_pattern(search_term):
+    """Build a LIKE pattern matching the search term anywhere in the text"""
+    escaped = search_term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def parse_search_terms(search_term):
+    """Split search box text into (text, is_phrase) terms
+    
+    "Quoted text" is matched as an exact phrase, other words by prefix.
+    """
+    terms = []
+    for phrase, word in SEARCH_TERM_RE.findall(search_term or ""):
+        text = phrase or word
+        if re.search(r"\w", text):
+            terms.append((text, bool(phrase)))
+    return terms
+
+def build_fts_query(search_term):
+    """Build an FTS5 MATCH expression from search box text"""
+    parts = []
+    for text, is_phrase in parse_search_terms(search_term):
+        quoted = '"' + text.replace('"', '""') + '"'
+        parts.append(quoted if is_phrase else quoted + "*")
+    return " ".join(parts)
+
+def fts_enabled(manager):
+    """Check whether the FTS5 search index exists in the database"""
+    result = execute_query(
+        manager,
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'",
+        fetchone=True
+    )
+    return result is not None
+
+def match_local_task(task_text, search_term):
+    """Search a task in Python with FTS-like semantics (fallback only)
+    
+    Returns (rank, highlighted_text), or None when any term is missing.
+    Lower rank is a better match, as with FTS5.
+    """
+    patterns = []
+    for text, is_phrase in parse_search_terms(search_term):
+        words = r"\W+".join(re.escape(word) for word in re.findall(r"\w+", text))
+        patterns.append(rf"\b{words}\b" if is_phrase else rf"\b{words}\w*")
+    
+    if not patterns:
+        # No searchable words, match the raw text like the LIKE path does
+        return (0, task_text) if search_term.lower() in task_text.lower() else None
+    
+    score = 0
+    for pattern in patterns:
+        found = len(re.findall(pattern, task_text, re.IGNORECASE))
+        if not found:
+            return None
+        score += found
+    
+    highlighted = re.sub(
+        "|".join(f"(?:{pattern})" for pattern in patterns),
+        lambda match: f"<mark>{match.group(0)}</mark>",
+        task_text,
+        flags=re.IGNORECASE
+    )
+    return -score, highlighted
+
+def report_query_parts(manager, day_range, search_term, intern_id):
+    """Build the FROM clause, WHERE conditions and parameters for report queries
+    
+    Searches use the FTS5 index when present, otherwise a LIKE scan.
+    """
+    conditions = ["tasks.intern_id = ?", "tasks.day_number BETWEEN ? AND ?"]
+    params = [intern_id, day_range[0], day_range[1]]
+    
+    fts_query = build_fts_query(search_term) if search_term else ""
+    if fts_query and fts_enabled(manager):
+        # CROSS JOIN keeps the FTS table as the outer loop; otherwise SQLite may
+        # walk the day index and rerun the full-text query for every row
+        return "tasks_fts CROSS JOIN tasks ON tasks.id = tasks_fts.rowid", \
+            ["tasks_fts MATCH ?"] + conditions, [fts_query] + params, True
+    
+    if search_term:
+        conditions.append("tasks.task LIKE ? ESCAPE '\\'")
+        params.append(like_pattern(search_term))
+    return "tasks", conditions, params, False
+
+def report_cursor(task, order="day"):
+    """Get the keyset cursor for paging past a report task"""
+    if order == "rank" and task.get("rank") is not None:
+        return (task["rank"], task["day_number"])
+    return task["day_number"]
+
+def get_data_version(manager, intern_id=None):
+    """Get a token that changes whenever an intern's tasks or settings change
+    
+    Built from the change log (epoch and latest sequence number), so it is
+    the same in every process and across restarts, and can key results
+    stored on disk. Without an intern it covers the whole database.
+    """
+    # Checked first, so commits by other processes also clear stale cached reads
+    manager.check_external_writes(max_age=0)
+    if intern_id is None:
+        query, params = "SELECT epoch, last_seq AS seq FROM sync_state", ()
+    else:
+        query = "SELECT epoch, (SELECT MAX(seq) FROM sync_changes WHERE intern_id = ?) AS seq FROM sync_state"
+        params = (intern_id,)
+    result = execute_query(manager, query, params, fetchone=True, use_cache=False)
+    return (result["epoch"], result["seq"] or 0) if result else None
+
+# ---------------- STORAGE BACKENDS ----------------
+class StorageBackend:
+    """Interface every task store implements
+    
+    Methods take the intern explicitly; the module-level helpers below fill
+    in the current intern and derived values such as day numbers.
+    """
+    label = "Storage"
+    persistent = False  # survives restarts and is shared between sessions
+    errors = ()  # exception types a failed write can raise
+
+    def transaction(self):
+        """Group writes into one commit (context manager)"""
+        return nullcontext()
+
+    def get_interns(self):
+        raise NotImplementedError
+
+    def add_intern(self, intern_id, name):
+        raise NotImplementedError
+
+    def get_task_by_date(self, intern_id, date_str):
+        raise NotImplementedError
+
+    def upsert_task(self, intern_id, date_str, task_text, day_number, formatted_date):
+        """Insert or update the task on a date, returning True if it was an update"""
+        raise NotImplementedError
+
+    def upsert_tasks(self, intern_id, rows):
+        """Upsert (date, task, day number, formatted date) rows, returning the dates that existed"""
+        raise NotImplementedError
+
+    def update_task(self, intern_id, task_id, task_text):
+        """Change a task's text; True if the task exists"""
+        raise NotImplementedError
+
+    def delete_task(self, intern_id, task_id):
+        """Delete a task; True if the task existed"""
+        raise NotImplementedError
+
+    def delete_all_tasks(self, intern_id):
+        raise NotImplementedError
+
+    def get_tasks_sorted_by_day(self, intern_id):
+        raise NotImplementedError
+
+    def count_report_tasks(self, intern_id, day_range, search_term):
+        raise NotImplementedError
+
+    def get_report_page(self, intern_id, day_range, search_term, after, page_size, order):
+        """Get up to page_size + 1 report tasks following the cursor"""
+        raise NotImplementedError
+
+    def iter_export_rows(self, intern_id, batch_size):
+        raise NotImplementedError
+
+    def get_export_lengths(self, intern_id):
+        """Get the longest value in each export column"""
+        raise NotImplementedError
+
+    def get_task_frame(self, intern_id):
+        """Load the intern's task_date and task columns into a DataFrame in one read"""
+        raise NotImplementedError
+
+    def get_task_stats(self, intern_id):
+        """Get task_count, numbered_count, min/max_day, first/last_date and streaks"""
+        raise NotImplementedError
+
+    def get_period_counts(self, intern_id, period_type):
+        """Get {period: task count} per "week" or "month" in period order"""
+        raise NotImplementedError
+
+    def get_setting(self, intern_id, key):
+        raise NotImplementedError
+
+    def get_setting_values(self, key):
+        """Get {intern_id: value} of a setting for every intern that has it"""
+        raise NotImplementedError
+
+    def iter_task_runs(self, intern_ids=None):
+        """Yield (intern_id, first_date, last_date) of each run of consecutive task dates
+        
+        Runs are ordered by intern and date; all interns are included if
+        intern_ids is None.
+        """
+        raise NotImplementedError
+
+    def save_setting(self, intern_id, key, value):
+        """Save a setting, recalculating day numbers when it is the start date"""
+        raise NotImplementedError
+
+    def authenticate_user(self, username, password):
+        raise NotImplementedError
+
+    def get_recent_tasks(self, intern_id, date_str, limit):
+        """Get the latest tasks, optionally only those on one date"""
+        raise NotImplementedError
+
+    def get_user_count(self):
+        raise NotImplementedError
+
+    def data_version(self, intern_id):
+        """Get a token that changes with the intern's tasks, or None if unversioned"""
+        return None
+
+    def get_sync_epoch(self):
+        """Get the ID that changes when the change log starts over"""
+        raise NotImplementedError(f"{self.label} does not support sync")
+
+    def get_changes(self, intern_id, since, limit):
+        """Get change log rows after sequence number `since`, oldest first"""
+        raise NotImplementedError(f"{self.label} does not support sync")
+
+    def get_change(self, intern_id, kind, key):
+        """Get the change log row of one task date or setting, or None"""
+        raise NotImplementedError(f"{self.label} does not support sync")
+
+    def info_lines(self):
+        """Describe the backend for the Database Info panel"""
+        return []
+
+class SQLiteBackend(StorageBackend):
+    """Tasks in the local SQLite file, read through the query cache"""
+    label = "SQLite Database"
+    persistent = True
+    errors = (sqlite3.Error, PoolTimeout)
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def transaction(self):
+        return transaction(self.manager)
+
+    def execute(self, query, params=None, fetch=False, fetchone=False, use_cache=True):
+        """Run a query through execute_query on this database"""
+        return execute_query(self.manager, query, params, fetch, fetchone, use_cache)
+
+    def execute_many(self, query, rows):
+        """Run a write once per parameter row through execute_many"""
+        execute_many(self.manager, query, rows)
+
+    def get_interns(self):
+        return self.execute(
+            "SELECT intern_id, name FROM interns ORDER BY name",
+            fetch=True
+        ) or []
+
+    def add_intern(self, intern_id, name):
+        self.execute(
+            "INSERT INTO interns (intern_id, name) VALUES (?, ?)",
+            (intern_id, name)
+        )
+
+    def get_task_by_date(self, intern_id, date_str):
+        return self.execute(
+            "SELECT * FROM tasks WHERE intern_id = ? AND task_date = ?",
+            (intern_id, date_str),
+            fetchone=True
+        )
+
+    def upsert_task(self, intern_id, date_str, task_text, day_number, formatted_date):
+        # The returned revision tells whether the row was inserted (1) or updated
+        result = self.execute(
+            UPSERT_TASK_SQL + " RETURNING id, revision",
+            (intern_id, date_str, task_text, day_number, formatted_date),
+            fetchone=True
+        )
+        return bool(result) and result["revision"] > 1
+
+    def upsert_tasks(self, intern_id, rows):
+        with self.transaction():
+            existing = {
+                row["task_date"] for row in self.execute(
+                    "SELECT task_date FROM tasks WHERE intern_id = ? AND task_date BETWEEN ? AND ?",
+                    (intern_id, rows[0][0], rows[-1][0]),
+                    fetch=True,
+                    use_cache=False
+                )
+            }
+            self.execute_many(UPSERT_TASK_SQL, [(intern_id,) + tuple(row) for row in rows])
+        return existing
+
+    def update_task(self, intern_id, task_id, task_text):
+        return self.execute(
+            """
+            UPDATE tasks SET task = ?, revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND intern_id = ?
+            RETURNING id
+            """,
+            (task_text, task_id, intern_id),
+            fetchone=True
+        ) is not None
+
+    def delete_task(self, intern_id, task_id):
+        return self.execute(
+            "DELETE FROM tasks WHERE id = ? AND intern_id = ? RETURNING id",
+            (task_id, intern_id),
+            fetchone=True
+        ) is not None
+
+    def delete_all_tasks(self, intern_id):
+        self.execute("DELETE FROM tasks WHERE intern_id = ?", (intern_id,))
+
+    def get_tasks_sorted_by_day(self, intern_id):
+        return self.execute(
+            """
+            SELECT day_number, task_date AS date, formatted_date, task, CAST(id AS TEXT) AS id
+            FROM tasks
+            WHERE intern_id = ? AND day_number IS NOT NULL
+            ORDER BY day_number
+            """,
+            (intern_id,),
+            fetch=True
+        ) or []
+
+    def count_report_tasks(self, intern_id, day_range, search_term):
+        from_clause, conditions, params, _ = report_query_parts(self.manager, day_range, search_term, intern_id)
+        result = self.execute(
+            f"SELECT COUNT(*) AS count FROM {from_clause} WHERE {' AND '.join(conditions)}",
+            tuple(params),
+            fetchone=True
+        )
+        return result['count'] if result else 0
+
+    def get_report_page(self, intern_id, day_range, search_term, after, page_size, order):
+        from_clause, conditions, params, searched = report_query_parts(self.manager, day_range, search_term, intern_id)
+        rank_order = order == "rank" and searched
+        columns = """tasks.day_number, tasks.task_date AS date, tasks.formatted_date, tasks.task,
+                     CAST(tasks.id AS TEXT) AS id"""
+        if searched:
+            columns += """, tasks_fts.rank AS rank,
+                     highlight(tasks_fts, 0, '<mark>', '</mark>') AS task_html,
+                     snippet(tasks_fts, 0, '<mark>', '</mark>', '…', 24) AS snippet"""
+        
+        if after is not None:
+            if rank_order:
+                conditions.append("(tasks_fts.rank, tasks.day_number) > (?, ?)")
+                params.extend(after)
+            else:
+                conditions.append("tasks.day_number > ?")
+                params.append(after)
+        
+        order_by = "tasks_fts.rank, tasks.day_number" if rank_order else "tasks.day_number"
+        return self.execute(
+            f"""
+            SELECT {columns}
+            FROM {from_clause}
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {order_by}
+            LIMIT ?
+            """,
+            tuple(params) + (page_size + 1,),
+            fetch=True
+        ) or []
+
+    def iter_export_rows(self, intern_id, batch_size):
+        try:
+            with self.manager.read_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(
+                    """
+                    SELECT day_number, formatted_date, task
+                    FROM tasks
+                    WHERE intern_id = ? AND day_number IS NOT NULL
+                    ORDER BY day_number
+                    """,
+                    (intern_id,)
+                )
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield tuple(row)
+        except self.errors as e:
+            notify("error", f"Database error: {str(e)}")
+
+    def get_export_lengths(self, intern_id):
+        result = self.execute(
+            """
+            SELECT MAX(LENGTH(CAST(day_number AS TEXT))) AS day_length,
+                   MAX(LENGTH(formatted_date)) AS date_length,
+                   MAX(LENGTH(task)) AS task_length
+            FROM tasks
+            WHERE intern_id = ? AND day_number IS NOT NULL
+            """,
+            (intern_id,),
+            fetchone=True
+        ) or {}
+        return [result.get("day_length"), result.get("date_length"), result.get("task_length")]
+
+    def get_task_frame(self, intern_id):
+        import pandas as pd
+        try:
+            with self.manager.read_connection() as connection:
+                return pd.read_sql_query(
+                    "SELECT task_date, task FROM tasks WHERE intern_id = ? ORDER BY task_date",
+                    connection,
+                    params=(intern_id,)
+                )
+        except self.errors as e:
+            notify("error", f"Database error: {str(e)}")
+            return pd.DataFrame(columns=["task_date", "task"])
+
+    def get_task_stats(self, intern_id):
+        stats = self.execute(
+            "SELECT * FROM task_stats WHERE intern_id = ?",
+            (intern_id,),
+            fetchone=True
+        )
+        if stats and stats["streaks_stale"]:
+            with self.transaction():
+                streaks = self.execute(STREAKS_SQL, (intern_id,), fetchone=True)
+                self.execute(
+                    """
+                    UPDATE task_stats SET longest_streak = ?, last_streak = ?, streaks_stale = 0
+                    WHERE intern_id = ?
+                    """,
+                    (streaks["longest_streak"], streaks["last_streak"], intern_id)
+                )
+            stats = dict(stats, **streaks)
+        # Only the documented fields, not intern_id or the staleness flag
+        return {key: stats[key] for key in EMPTY_TASK_STATS} if stats else None
+
+    def get_period_counts(self, intern_id, period_type):
+        rows = self.execute(
+            """
+            SELECT period, count FROM task_period_counts
+            WHERE intern_id = ? AND period_type = ?
+            ORDER BY period
+            """,
+            (intern_id, period_type),
+            fetch=True
+        ) or []
+        return {row["period"]: row["count"] for row in rows}
+
+    def get_setting(self, intern_id, key):
+        result = self.execute(
+            "SELECT setting_value FROM settings WHERE intern_id = ? AND setting_key = ?",
+            (intern_id, key),
+            fetchone=True
+        )
+        return result['setting_value'] if result else None
+
+    def get_setting_values(self, key):
+        rows = self.execute(
+            "SELECT intern_id, setting_value FROM settings WHERE setting_key = ?",
+            (key,),
+            fetch=True
+        ) or []
+        return {row["intern_id"]: row["setting_value"] for row in rows}
+
+    def iter_task_runs(self, intern_ids=None):
+        where, params = "", ()
+        if intern_ids is not None:
+            where = f"WHERE intern_id IN ({', '.join('?' * len(intern_ids))})"
+            params = tuple(intern_ids)
+        try:
+            with self.manager.read_connection() as connection:
+                cursor = connection.execute(TASK_RUNS_SQL.format(where=where), params)
+                while True:
+                    rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield tuple(row)
+        except self.errors as e:
+            notify("error", f"Database error: {str(e)}")
+
+    def save_setting(self, intern_id, key, value):
+        # The setting and the day numbers derived from it commit together
+        with self.transaction():
+            self.execute(
+                """
+                INSERT INTO settings (intern_id, setting_key, setting_value)
+                VALUES (?, ?, ?)
+                ON CONFLICT(intern_id, setting_key) DO UPDATE
+                SET setting_value = excluded.setting_value, updated_at = CURRENT_TIMESTAMP
+                """,
+                (intern_id, key, value)
+            )
+            if key == "start_date":
+                self.execute(RECALCULATE_DAY_NUMBERS_SQL + " WHERE intern_id = ?", (intern_id,))
+
+    def authenticate_user(self, username, password):
+        return self.execute(
+            "SELECT username, role FROM users WHERE username = ? AND password = ?",
+            (username, password),
+            fetchone=True
+        )
+
+    def get_recent_tasks(self, intern_id, date_str, limit):
+        if date_str:
+            return self.execute(
+                """
+                SELECT id, task_date, task, day_number FROM tasks
+                WHERE intern_id = ? AND task_date = ?
+                ORDER BY task_date DESC LIMIT ?
+                """,
+                (intern_id, date_str, limit),
+                fetch=True
+            )
+        return self.execute(
+            """
+            SELECT id, task_date, task, day_number FROM tasks
+            WHERE intern_id = ?
+            ORDER BY task_date DESC LIMIT ?
+            """,
+            (intern_id, limit),
+            fetch=True
+        )
+
+    def get_user_count(self):
+        result = self.execute("SELECT COUNT(*) as count FROM users", fetchone=True)
+        return result['count'] if result else 0
+
+    def data_version(self, intern_id):
+        return get_data_version(self.manager, intern_id)
+
+    def get_sync_epoch(self):
+        result = self.execute("SELECT epoch FROM sync_state", fetchone=True)
+        return result["epoch"] if result else None
+
+    def get_changes(self, intern_id, since, limit):
+        return self.execute(
+            SYNC_CHANGES_SQL + " WHERE c.intern_id = ? AND c.seq > ? ORDER BY c.seq LIMIT ?",
+            (intern_id, since, limit),
+            fetch=True
+        ) or []
+
+    def get_change(self, intern_id, kind, key):
+        return self.execute(
+            SYNC_CHANGES_SQL + " WHERE c.intern_id = ? AND c.kind = ? AND c.item_key = ?",
+            (intern_id, kind, key),
+            fetchone=True
+        )
+
+    def info_lines(self):
+        db_file = self.manager.db_file
+        db_size = Path(db_file).stat().st_size if Path(db_file).exists() else 0
+        cache_stats = self.manager.query_cache.stats()
+        pragmas = self.manager.effective_pragmas()
+        pool_stats = self.manager.read_pool.stats()
+        return [
+            f"Database File: {db_file}",
+            f"File Size: {db_size / 1024:.1f} KB",
+            f"Connections: {str(pragmas['journal_mode']).upper()} journal, synchronous={pragmas['synchronous']}, "
+            f"cache_size={pragmas['cache_size']}, mmap_size={pragmas['mmap_size'] // (1024 * 1024)} MB",
+            f"Read Pool: {pool_stats['in_use']}/{pool_stats['size']} in use, {pool_stats['checkouts']} checkouts, "
+            f"{pool_stats['avg_wait_ms']:.2f} ms avg / {pool_stats['max_wait_ms']:.2f} ms max wait, "
+            f"{pool_stats['timeouts']} timeouts",
+            f"Query Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.1f}% hit rate, {cache_stats['entries']} entries)"
+        ]
+
+POSTGRES_SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id BIGSERIAL PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL DEFAULT 'viewer',
+        created_at TIMESTAMPTZ DEFAULT now()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS interns (
+        id BIGSERIAL PRIMARY KEY,
+        intern_id TEXT UNIQUE NOT NULL,
+        name TEXT NOT NULL,
+        created_at TIMESTAMPTZ DEFAULT now()
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS tasks (
+        id BIGSERIAL PRIMARY KEY,
+        intern_id TEXT NOT NULL DEFAULT '{DEFAULT_INTERN}',
+        task_date TEXT NOT NULL,
+        task TEXT NOT NULL,
+        day_number INTEGER,
+        formatted_date TEXT,
+        revision INTEGER NOT NULL DEFAULT 1,
+        created_at TIMESTAMPTZ DEFAULT now(),
+        updated_at TIMESTAMPTZ DEFAULT now()
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS settings (
+        id BIGSERIAL PRIMARY KEY,
+        intern_id TEXT NOT NULL DEFAULT '{DEFAULT_INTERN}',
+        setting_key TEXT NOT NULL,
+        setting_value TEXT,
+        updated_at TIMESTAMPTZ DEFAULT now()
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_intern_date ON tasks(intern_id, task_date)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_intern_day ON tasks(intern_id, day_number)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_settings_intern_key ON settings(intern_id, setting_key)"
+]
+
+POSTGRES_TASK_RUNS_SQL = """
+    SELECT intern_id, MIN(task_date) AS first_date, MAX(task_date) AS last_date
+    FROM (
+        SELECT intern_id, task_date,
+               task_date::date - (ROW_NUMBER() OVER (PARTITION BY intern_id ORDER BY task_date))::int AS run
+        FROM tasks
+        {where}
+    ) AS numbered
+    GROUP BY intern_id, run
+    ORDER BY intern_id, first_date
+"""
+
+# Statements every Postgres connection prepares on first use ($n parameters)
+POSTGRES_STATEMENTS = {
+    "get_interns": "SELECT intern_id, name FROM interns ORDER BY name",
+    "add_intern": "INSERT INTO interns (intern_id, name) VALUES ($1, $2) ON CONFLICT (intern_id) DO NOTHING",
+    "task_by_date": "SELECT * FROM tasks WHERE intern_id = $1 AND task_date = $2",
+    "upsert_task": """
+        INSERT INTO tasks (intern_id, task_date, task, day_number, formatted_date)
+        VALUES ($1, $2, $3, $4, $5)
+        ON CONFLICT (intern_id, task_date) DO UPDATE
+        SET task = excluded.task, revision = tasks.revision + 1, updated_at = now()
+        RETURNING id, revision
+    """,
+    "existing_dates": "SELECT task_date FROM tasks WHERE intern_id = $1 AND task_date BETWEEN $2 AND $3",
+    "update_task": """
+        UPDATE tasks SET task = $1, revision = revision + 1, updated_at = now()
+        WHERE id = $2 AND intern_id = $3
+        RETURNING id
+    """,
+    "delete_task": "DELETE FROM tasks WHERE id = $1 AND intern_id = $2 RETURNING id",
+    "delete_all_tasks": "DELETE FROM tasks WHERE intern_id = $1",
+    "tasks_by_day": """
+        SELECT day_number, task_date AS date, formatted_date, task, id::text AS id
+        FROM tasks
+        WHERE intern_id = $1 AND day_number IS NOT NULL
+        ORDER BY day_number
+    """,
+    "task_frame": "SELECT task_date, task FROM tasks WHERE intern_id = $1 ORDER BY task_date",
+    "export_lengths": """
+        SELECT MAX(LENGTH(day_number::text)) AS day_length,
+               MAX(LENGTH(formatted_date)) AS date_length,
+               MAX(LENGTH(task)) AS task_length
+        FROM tasks
+        WHERE intern_id = $1 AND day_number IS NOT NULL
+    """,
+    "task_stats": """
+        SELECT COUNT(*) AS task_count, COUNT(day_number) AS numbered_count,
+               MIN(day_number) AS min_day, MAX(day_number) AS max_day,
+               MIN(task_date) AS first_date, MAX(task_date) AS last_date
+        FROM tasks
+        WHERE intern_id = $1
+    """,
+    "task_streaks": """
+        WITH runs AS (
+            SELECT task_date::date - (ROW_NUMBER() OVER (ORDER BY task_date))::int AS run
+            FROM tasks
+            WHERE intern_id = $1
+        ), streaks AS (
+            SELECT run, COUNT(*) AS length FROM runs GROUP BY run
+        )
+        SELECT COALESCE(MAX(length), 0) AS longest_streak,
+               COALESCE((SELECT length FROM streaks ORDER BY run DESC LIMIT 1), 0) AS last_streak
+        FROM streaks
+    """,
+    # Same keys as PERIOD_FORMATS: %W counts Mondays, so days before the first one are week 00
+    "week_counts": """
+        SELECT to_char(task_date::date, 'YYYY') || '-W' || lpad(
+                   ((EXTRACT(DOY FROM task_date::date)::int + 7 - EXTRACT(ISODOW FROM task_date::date)::int) / 7)::text,
+                   2, '0') AS period,
+               COUNT(*) AS count
+        FROM tasks
+        WHERE intern_id = $1
+        GROUP BY 1
+        ORDER BY 1
+    """,
+    "month_counts": """
+        SELECT to_char(task_date::date, 'YYYY-MM') AS period, COUNT(*) AS count
+        FROM tasks
+        WHERE intern_id = $1
+        GROUP BY 1
+        ORDER BY 1
+    """,
+    "get_setting": "SELECT setting_value FROM settings WHERE intern_id = $1 AND setting_key = $2",
+    "setting_values": "SELECT intern_id, setting_value FROM settings WHERE setting_key = $1",
+    "all_task_runs": POSTGRES_TASK_RUNS_SQL.format(where=""),
+    "task_runs": POSTGRES_TASK_RUNS_SQL.format(where="WHERE intern_id = ANY($1::text[])"),
+    "save_setting": """
+        INSERT INTO settings (intern_id, setting_key, setting_value)
+        VALUES ($1, $2, $3)
+        ON CONFLICT (intern_id, setting_key) DO UPDATE
+        SET setting_value = excluded.setting_value, updated_at = now()
+    """,
+    "recalculate_day_numbers": """
+        UPDATE tasks
+        SET day_number = NULLIF(GREATEST(tasks.task_date::date - settings.setting_value::date + 1, 0), 0)
+        FROM settings
+        WHERE settings.intern_id = tasks.intern_id AND settings.setting_key = 'start_date'
+          AND tasks.intern_id = $1
+    """,
+    "authenticate_user": "SELECT username, role FROM users WHERE username = $1 AND password = $2",
+    "recent_tasks": """
+        SELECT id, task_date, task, day_number FROM tasks
+        WHERE intern_id = $1
+        ORDER BY task_date DESC LIMIT $2
+    """,
+    "recent_tasks_on_date": """
+        SELECT id, task_date, task, day_number FROM tasks
+        WHERE intern_id = $1 AND task_date = $2
+        ORDER BY task_date DESC LIMIT $3
+    """,
+    "user_count": "SELECT COUNT(*) AS count FROM users",
+    "data_version": """
+        SELECT COUNT(*) AS count, COALESCE(SUM(revision), 0) AS revisions, MAX(updated_at)::text AS updated_at
+        FROM tasks
+        WHERE intern_id = $1
+    """
+}
+
+class PostgresBackend(StorageBackend):
+    """Tasks in a shared PostgreSQL database, for running several app replicas
+    
+    Statements are prepared once per pooled connection and exports stream
+    through a server-side cursor. Nothing is cached in-process, since other
+    replicas write to the same tables. Report searches use ILIKE; ranked
+    full-text search needs the SQLite FTS5 index.
+    """
+    label = "PostgreSQL Database"
+    persistent = True
+
+    def __init__(self, dsn, pool_size=DB_POOL_SIZE, pool_timeout=DB_POOL_TIMEOUT):
+        import psycopg2
+        import psycopg2.extras
+        self.extras = psycopg2.extras
+        self.errors = (psycopg2.Error, PoolTimeout)
+        self.pool = create_postgres_pool(dsn, size=pool_size, timeout=pool_timeout)
+        self.local = threading.local()
+        self.create_schema()
+
+    def create_schema(self):
+        """Create tables and default rows; replicas starting together take turns"""
+        with self.transaction() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('internship_tracker_schema'))")
+                for statement in POSTGRES_SCHEMA_SQL:
+                    cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO interns (intern_id, name) VALUES (%s, %s) ON CONFLICT (intern_id) DO NOTHING",
+                    (DEFAULT_INTERN, DEFAULT_INTERN_NAME)
+                )
+                for username, password in USERS.items():
+                    cursor.execute(
+                        "INSERT INTO users (username, password, role) VALUES (%s, %s, %s) "
+                        "ON CONFLICT (username) DO NOTHING",
+                        (username, password, "admin" if username == "admin" else "viewer")
+                    )
+
+    @contextmanager
+    def connection(self):
+        """Use this thread's transaction connection, or borrow one from the pool"""
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            yield connection
+            return
+        with self.pool.connection() as connection:
+            yield connection
+
+    @contextmanager
+    def transaction(self):
+        """Run the block's statements on one connection in one transaction"""
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            yield connection  # Join the enclosing transaction
+            return
+        
+        with self.pool.connection() as connection:
+            connection.autocommit = False
+            self.local.connection = connection
+            try:
+                yield connection
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                raise
+            finally:
+                self.local.connection = None
+                connection.autocommit = True
+
+    def prepare(self, cursor, name):
+        """Prepare a named statement on the cursor's connection, returning its EXECUTE query"""
+        connection = cursor.connection
+        if name not in connection.prepared:
+            cursor.execute(f"PREPARE {name} AS {POSTGRES_STATEMENTS[name]}")
+            connection.prepared.add(name)
+        placeholders = ", ".join(["%s"] * len(set(re.findall(r"\$\d+", POSTGRES_STATEMENTS[name]))))
+        return f"EXECUTE {name} ({placeholders})" if placeholders else f"EXECUTE {name}"
+
+    def query(self, statement, params=(), fetch=False, fetchone=False, prepared=True):
+        """Run a prepared statement by name, or plain SQL with prepared=False"""
+        sql = POSTGRES_STATEMENTS[statement] if prepared else statement
+        try:
+            with profile_section(statement if prepared else "query", "sql", sql) as entry, \
+                    self.connection() as connection:
+                with connection.cursor(cursor_factory=self.extras.RealDictCursor) as cursor:
+                    query = self.prepare(cursor, statement) if prepared else statement
+                    cursor.execute(query, tuple(params))
+                    entry["rows"] = cursor.rowcount
+                    if fetch:
+                        return [dict(row) for row in cursor.fetchall()]
+                    if fetchone:
+                        row = cursor.fetchone()
+                        return dict(row) if row else None
+        except self.errors as e:
+            if getattr(self.local, "connection", None) is not None:
+                raise  # Let the enclosing transaction roll back
+            notify("error", f"Database error: {str(e)}")
+            return [] if fetch else None
+
+    def report_conditions(self, intern_id, day_range, search_term):
+        """Build the WHERE clause and parameters for report queries"""
+        conditions = ["intern_id = %s", "day_number BETWEEN %s AND %s"]
+        params = [intern_id, day_range[0], day_range[1]]
+        if search_term:
+            conditions.append("task ILIKE %s")
+            params.append(like_pattern(search_term))
+        return conditions, params
+
+    def get_interns(self):
+        return self.query("get_interns", fetch=True)
+
+    def add_intern(self, intern_id, name):
+        self.query("add_intern", (intern_id, name))
+
+    def get_task_by_date(self, intern_id, date_str):
+        return self.query("task_by_date", (intern_id, date_str), fetchone=True)
+
+    def upsert_task(self, intern_id, date_str, task_text, day_number, formatted_date):
+        result = self.query(
+            "upsert_task", (intern_id, date_str, task_text, day_number, formatted_date), fetchone=True
+        )
+        return bool(result) and result["revision"] > 1
+
+    def upsert_tasks(self, intern_id, rows):
+        with self.transaction() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(self.prepare(cursor, "existing_dates"), (intern_id, rows[0][0], rows[-1][0]))
+                existing = {row[0] for row in cursor.fetchall()}
+                self.extras.execute_batch(
+                    cursor,
+                    self.prepare(cursor, "upsert_task"),
+                    [(intern_id,) + tuple(row) for row in rows],
+                    page_size=EXPORT_BATCH_SIZE
+                )
+        return existing
+
+    def update_task(self, intern_id, task_id, task_text):
+        return self.query("update_task", (task_text, task_id, intern_id), fetchone=True) is not None
+
+    def delete_task(self, intern_id, task_id):
+        return self.query("delete_task", (task_id, intern_id), fetchone=True) is not None
+
+    def delete_all_tasks(self, intern_id):
+        self.query("delete_all_tasks", (intern_id,))
+
+    def get_tasks_sorted_by_day(self, intern_id):
+        return self.query("tasks_by_day", (intern_id,), fetch=True)
+
+    def count_report_tasks(self, intern_id, day_range, search_term):
+        conditions, params = self.report_conditions(intern_id, day_range, search_term)
+        result = self.query(
+            f"SELECT COUNT(*) AS count FROM tasks WHERE {' AND '.join(conditions)}",
+            params, fetchone=True, prepared=False
+        )
+        return result['count'] if result else 0
+
+    def get_report_page(self, intern_id, day_range, search_term, after, page_size, order):
+        conditions, params = self.report_conditions(intern_id, day_range, search_term)
+        if after is not None:
+            conditions.append("day_number > %s")
+            params.append(after)
+        return self.query(
+            f"""
+            SELECT day_number, task_date AS date, formatted_date, task, id::text AS id
+            FROM tasks
+            WHERE {' AND '.join(conditions)}
+            ORDER BY day_number
+            LIMIT %s
+            """,
+            params + [page_size + 1], fetch=True, prepared=False
+        )
+
+    def iter_export_rows(self, intern_id, batch_size):
+        try:
+            with self.pool.connection() as connection:
+                # Server-side cursors only live inside a transaction
+                connection.autocommit = False
+                try:
+                    with connection.cursor(name="export_rows") as cursor:
+                        cursor.itersize = batch_size
+                        cursor.execute(
+                            """
+                            SELECT day_number, formatted_date, task
+                            FROM tasks
+                            WHERE intern_id = %s AND day_number IS NOT NULL
+                            ORDER BY day_number
+                            """,
+                            (intern_id,)
+                        )
+                        for row in cursor:
+                            yield tuple(row)
+                finally:
+                    connection.rollback()
+                    connection.autocommit = True
+        except self.errors as e:
+            notify("error", f"Database error: {str(e)}")
+
+    def get_export_lengths(self, intern_id):
+        result = self.query("export_lengths", (intern_id,), fetchone=True) or {}
+        return [result.get("day_length"), result.get("date_length"), result.get("task_length")]
+
+    def get_task_frame(self, intern_id):
+        import pandas as pd
+        rows = self.query("task_frame", (intern_id,), fetch=True)
+        return pd.DataFrame.from_records(rows, columns=["task_date", "task"])
+
+    def get_task_stats(self, intern_id):
+        # Aggregated on read from the indexes; replicas would contend on a shared stats row
+        stats = self.query("task_stats", (intern_id,), fetchone=True)
+        if not stats or not stats["task_count"]:
+            return None
+        return dict(stats, **(self.query("task_streaks", (intern_id,), fetchone=True) or {}))
+
+    def get_period_counts(self, intern_id, period_type):
+        rows = self.query(f"{period_type}_counts", (intern_id,), fetch=True)
+        return {row["period"]: row["count"] for row in rows}
+
+    def get_setting(self, intern_id, key):
+        result = self.query("get_setting", (intern_id, key), fetchone=True)
+        return result['setting_value'] if result else None
+
+    def get_setting_values(self, key):
+        rows = self.query("setting_values", (key,), fetch=True)
+        return {row["intern_id"]: row["setting_value"] for row in rows}
+
+    def iter_task_runs(self, intern_ids=None):
+        if intern_ids is None:
+            rows = self.query("all_task_runs", fetch=True)
+        else:
+            rows = self.query("task_runs", (list(intern_ids),), fetch=True)
+        for row in rows:
+            yield row["intern_id"], row["first_date"], row["last_date"]
+
+    def save_setting(self, intern_id, key, value):
+        with self.transaction():
+            self.query("save_setting", (intern_id, key, value))
+            if key == "start_date":
+                self.query("recalculate_day_numbers", (intern_id,))
+
+    def authenticate_user(self, username, password):
+        return self.query("authenticate_user", (username, password), fetchone=True)
+
+    def get_recent_tasks(self, intern_id, date_str, limit):
+        if date_str:
+            return self.query("recent_tasks_on_date", (intern_id, date_str, limit), fetch=True)
+        return self.query("recent_tasks", (intern_id, limit), fetch=True)
+
+    def get_user_count(self):
+        result = self.query("user_count", fetchone=True)
+        return result['count'] if result else 0
+
+    def data_version(self, intern_id):
+        result = self.query("data_version", (intern_id,), fetchone=True)
+        return tuple(result.values()) if result else None
+
+    def info_lines(self):
+        pool_stats = self.pool.stats()
+        return [
+            f"Connection Pool: {pool_stats['in_use']}/{pool_stats['size']} in use, "
+            f"{pool_stats['checkouts']} checkouts, {pool_stats['avg_wait_ms']:.2f} ms avg / "
+            f"{pool_stats['max_wait_ms']:.2f} ms max wait, {pool_stats['timeouts']} timeouts"
+        ]
+
+class LocalTaskStore:
+    """Indexed in-memory tasks (fallback only)
+    
+    Tasks are found by id or by (intern, date) in O(1), and each intern's
+    dates are kept sorted so date ranges and newest-first listings are
+    read with bisect instead of scanning every task. Ids come from a
+    counter and are never reused, even after deletes. Weekly and monthly
+    counts are kept up to date, and streaks are cached until the next
+    add or remove.
+    """
+
+    def __init__(self):
+        self.tasks_by_id = {}
+        self.ids_by_date = {}  # (intern_id, task_date) -> id
+        self.dates = {}  # intern_id -> sorted task dates
+        self.period_counts = {}  # (intern_id, period_type) -> {period: count}
+        self.cached_streaks = {}  # intern_id -> (longest, last)
+        self.next_id = 1
+
+    def count_period(self, intern_id, date_str, change):
+        """Add change to the week and month counts of a date"""
+        for period_type in PERIOD_FORMATS:
+            counts = self.period_counts.setdefault((intern_id, period_type), {})
+            period = period_key(date_str, period_type)
+            counts[period] = counts.get(period, 0) + change
+            if not counts[period]:
+                del counts[period]
+        self.cached_streaks.pop(intern_id, None)
+
+    def streaks(self, intern_id):
+        """Get (longest streak, streak ending at the last date) for an intern"""
+        if intern_id not in self.cached_streaks:
+            self.cached_streaks[intern_id] = count_streaks(self.dates.get(intern_id, []))
+        return self.cached_streaks[intern_id]
+
+    def get(self, task_id):
+        """Get a task by id (int or numeric string)"""
+        try:
+            return self.tasks_by_id.get(int(task_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_by_date(self, intern_id, date_str):
+        """Get an intern's task on a date"""
+        task_id = self.ids_by_date.get((intern_id, date_str))
+        return self.tasks_by_id.get(task_id)
+
+    def add(self, intern_id, date_str, **fields):
+        """Add a task on a date the intern has no task for yet"""
+        task = dict(fields, id=self.next_id, intern_id=intern_id, task_date=date_str)
+        self.next_id += 1
+        self.tasks_by_id[task["id"]] = task
+        self.ids_by_date[(intern_id, date_str)] = task["id"]
+        bisect.insort(self.dates.setdefault(intern_id, []), date_str)
+        self.count_period(intern_id, date_str, 1)
+        return task
+
+    def remove(self, task):
+        """Remove a task from every index"""
+        del self.tasks_by_id[task["id"]]
+        del self.ids_by_date[(task["intern_id"], task["task_date"])]
+        dates = self.dates[task["intern_id"]]
+        del dates[bisect.bisect_left(dates, task["task_date"])]
+        self.count_period(task["intern_id"], task["task_date"], -1)
+
+    def remove_intern(self, intern_id):
+        """Remove all of an intern's tasks"""
+        for date_str in self.dates.pop(intern_id, []):
+            del self.tasks_by_id[self.ids_by_date.pop((intern_id, date_str))]
+        for period_type in PERIOD_FORMATS:
+            self.period_counts.pop((intern_id, period_type), None)
+        self.cached_streaks.pop(intern_id, None)
+
+    def date_bounds(self, intern_id, first=None, last=None):
+        """Get the index range of the intern's dates between first and last (inclusive)"""
+        dates = self.dates.get(intern_id, [])
+        start = bisect.bisect_left(dates, first) if first else 0
+        end = bisect.bisect_right(dates, last) if last else len(dates)
+        return start, max(start, end)
+
+    def count(self, intern_id, first=None, last=None):
+        """Count the intern's tasks dated between first and last"""
+        start, end = self.date_bounds(intern_id, first, last)
+        return end - start
+
+    def iter_tasks(self, intern_id, first=None, last=None, newest_first=False):
+        """Yield the intern's tasks dated between first and last in date order"""
+        dates = self.dates.get(intern_id, [])
+        start, end = self.date_bounds(intern_id, first, last)
+        indexes = range(end - 1, start - 1, -1) if newest_first else range(start, end)
+        for index in indexes:
+            yield self.tasks_by_id[self.ids_by_date[(intern_id, dates[index])]]
+
+class MemoryBackend(StorageBackend):
+    """Tasks kept in a dict (fallback only)
+    
+    Data lives only as long as the store, i.e. the browser session.
+    Day numbers grow with the date, so an intern's numbered tasks are the
+    ones dated from the start date on, already in day order in the index.
+    """
+    label = "Local Storage"
+
+    def __init__(self, store):
+        self.store = store
+        if 'local_store' not in store:
+            store['local_store'] = LocalTaskStore()
+        if 'local_settings' not in store:
+            store['local_settings'] = {}
+        if 'local_interns' not in store:
+            store['local_interns'] = {DEFAULT_INTERN: DEFAULT_INTERN_NAME}
+        self.tasks = store['local_store']
+
+    def day_dates(self, intern_id, day_range=None):
+        """Get the (first, last) dates of a day range, or None if no day is numbered"""
+        start_date_str = self.get_setting(intern_id, "start_date")
+        try:
+            start_date = date.fromisoformat(start_date_str)
+        except (TypeError, ValueError):
+            return None
+        if day_range is None:
+            return start_date.isoformat(), None
+        first_day = max(day_range[0], 1)
+        if day_range[1] < first_day:
+            return None
+        return (
+            (start_date + timedelta(days=first_day - 1)).isoformat(),
+            (start_date + timedelta(days=day_range[1] - 1)).isoformat()
+        )
+
+    def iter_numbered_tasks(self, intern_id, day_range=None):
+        """Yield tasks with a day number in day order"""
+        bounds = self.day_dates(intern_id, day_range)
+        if bounds is not None:
+            yield from self.tasks.iter_tasks(intern_id, *bounds)
+
+    def iter_report_tasks(self, intern_id, day_range, search_term):
+        """Yield report rows in a day range matching the search term, in day order"""
+        for task in map(self.report_row, self.iter_numbered_tasks(intern_id, day_range)):
+            if search_term:
+                match = match_local_task(task["task"], search_term)
+                if match is None:
+                    continue
+                task["rank"], task["task_html"] = match
+            yield task
+
+    def report_row(self, task):
+        """Shape a task like the report rows of the SQL backends"""
+        return {
+            "day_number": task["day_number"],
+            "date": task["task_date"],
+            "formatted_date": task["formatted_date"],
+            "task": task.get("task", ""),
+            "id": str(task["id"])
+        }
+
+    def get_interns(self):
+        return sorted(
+            ({"intern_id": intern_id, "name": name} for intern_id, name in self.store['local_interns'].items()),
+            key=lambda intern: intern["name"]
+        )
+
+    def add_intern(self, intern_id, name):
+        self.store['local_interns'][intern_id] = name
+
+    def get_task_by_date(self, intern_id, date_str):
+        return self.tasks.get_by_date(intern_id, date_str)
+
+    def upsert_task(self, intern_id, date_str, task_text, day_number, formatted_date):
+        existing_task = self.tasks.get_by_date(intern_id, date_str)
+        if existing_task:
+            existing_task["task"] = task_text
+            existing_task["updated_at"] = datetime.now().isoformat()
+            return True
+        
+        self.tasks.add(
+            intern_id, date_str,
+            task=task_text,
+            day_number=day_number,
+            formatted_date=formatted_date,
+            created_at=datetime.now().isoformat(),
+            updated_at=datetime.now().isoformat()
+        )
+        return False
+
+    def upsert_tasks(self, intern_id, rows):
+        return {
+            row[0] for row in rows
+            if self.upsert_task(intern_id, *row)
+        }
+
+    def update_task(self, intern_id, task_id, task_text):
+        task = self.tasks.get(task_id)
+        if not task or task["intern_id"] != intern_id:
+            return False
+        task["task"] = task_text
+        task["updated_at"] = datetime.now().isoformat()
+        return True
+
+    def delete_task(self, intern_id, task_id):
+        task = self.tasks.get(task_id)
+        if not task or task["intern_id"] != intern_id:
+            return False
+        self.tasks.remove(task)
+        return True
+
+    def delete_task_on_date(self, intern_id, date_str):
+        task = self.tasks.get_by_date(intern_id, date_str)
+        if task:
+            self.tasks.remove(task)
+
+    def delete_all_tasks(self, intern_id):
+        self.tasks.remove_intern(intern_id)
+
+    def get_tasks_sorted_by_day(self, intern_id):
+        return [self.report_row(task) for task in self.iter_numbered_tasks(intern_id)]
+
+    def count_report_tasks(self, intern_id, day_range, search_term):
+        if not search_term:
+            bounds = self.day_dates(intern_id, day_range)
+            return self.tasks.count(intern_id, *bounds) if bounds else 0
+        return sum(1 for _ in self.iter_report_tasks(intern_id, day_range, search_term))
+
+    def get_report_page(self, intern_id, day_range, search_term, after, page_size, order):
+        if order == "rank" and search_term:
+            tasks = list(self.iter_report_tasks(intern_id, day_range, search_term))
+            tasks.sort(key=lambda task: (task["rank"], task["day_number"]))
+            if after is not None:
+                tasks = [task for task in tasks if report_cursor(task, order) > after]
+            return tasks[:page_size + 1]
+        
+        # Day order: start after the cursor and stop once the page is full
+        if after is not None:
+            day_range = (max(day_range[0], after + 1), day_range[1])
+        return list(itertools.islice(self.iter_report_tasks(intern_id, day_range, search_term), page_size + 1))
+
+    def iter_export_rows(self, intern_id, batch_size):
+        for task in self.iter_numbered_tasks(intern_id):
+            yield task["day_number"], task["formatted_date"], task["task"]
+
+    def get_export_lengths(self, intern_id):
+        rows = list(self.iter_export_rows(intern_id, EXPORT_BATCH_SIZE))
+        return [max((len(str(row[i])) for row in rows), default=0) for i in range(len(EXPORT_COLUMNS))]
+
+    def get_task_frame(self, intern_id):
+        import pandas as pd
+        tasks = list(self.tasks.iter_tasks(intern_id))
+        return pd.DataFrame({
+            "task_date": [task["task_date"] for task in tasks],
+            "task": [task["task"] for task in tasks]
+        })
+
+    def get_task_stats(self, intern_id):
+        dates = self.tasks.dates.get(intern_id)
+        if not dates:
+            return None
+        bounds = self.day_dates(intern_id)
+        numbered_count = self.tasks.count(intern_id, *bounds) if bounds else 0
+        min_day = max_day = None
+        if numbered_count:
+            min_day = next(self.tasks.iter_tasks(intern_id, *bounds))["day_number"]
+            max_day = next(self.tasks.iter_tasks(intern_id, *bounds, newest_first=True))["day_number"]
+        longest_streak, last_streak = self.tasks.streaks(intern_id)
+        return {
+            "task_count": len(dates),
+            "numbered_count": numbered_count,
+            "min_day": min_day,
+            "max_day": max_day,
+            "first_date": dates[0],
+            "last_date": dates[-1],
+            "longest_streak": longest_streak,
+            "last_streak": last_streak
+        }
+
+    def get_period_counts(self, intern_id, period_type):
+        counts = self.tasks.period_counts.get((intern_id, period_type), {})
+        return dict(sorted(counts.items()))
+
+    def get_setting(self, intern_id, key):
+        return self.store['local_settings'].get(intern_id, {}).get(key)
+
+    def get_setting_values(self, key):
+        return {
+            intern_id: settings[key]
+            for intern_id, settings in self.store['local_settings'].items() if key in settings
+        }
+
+    def iter_task_runs(self, intern_ids=None):
+        one_day = timedelta(days=1)
+        for intern_id in sorted(self.tasks.dates if intern_ids is None else intern_ids):
+            first = previous = None
+            for task_date in map(date.fromisoformat, self.tasks.dates.get(intern_id, [])):
+                if previous and task_date - previous != one_day:
+                    yield intern_id, first.isoformat(), previous.isoformat()
+                    first = None
+                first = first or task_date
+                previous = task_date
+            if first:
+                yield intern_id, first.isoformat(), previous.isoformat()
+
+    def save_setting(self, intern_id, key, value):
+        self.store['local_settings'].setdefault(intern_id, {})[key] = value
+        if key == "start_date":
+            for task in self.tasks.iter_tasks(intern_id):
+                task["day_number"] = calculate_day_number(task["task_date"], value)
+
+    def authenticate_user(self, username, password):
+        # Check against the USERS dictionary
+        if username in USERS and USERS[username] == password:
+            return {
+                "username": username,
+                "role": "admin" if username == "admin" else "viewer"
+            }
+        return None
+
+    def get_recent_tasks(self, intern_id, date_str, limit):
+        if date_str:
+            task = self.tasks.get_by_date(intern_id, date_str)
+            return [task] if task and limit > 0 else []
+        return list(itertools.islice(self.tasks.iter_tasks(intern_id, newest_first=True), limit))
+
+    def get_user_count(self):
+        return len(USERS)
+
+class WriteBehindJournal:
+    """Append-only JSON lines log of fallback writes
+    
+    Appends go to the file buffer and are fsynced in batches: after
+    sync_every records or sync_interval seconds, whichever comes first.
+    A torn last line from a crash is dropped on replay.
+    """
+
+    def __init__(self, path, sync_every=JOURNAL_SYNC_RECORDS, sync_interval=JOURNAL_SYNC_INTERVAL):
+        self.path = Path(path)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.lock = threading.Lock()
+        self.file = None
+        self.timer = None
+        self.pending = 0
+        self.records = 0  # records in the file
+
+    def append(self, op, args):
+        """Log one write, fsyncing when the batch is full"""
+        line = json.dumps({"op": op, "args": list(args)}) + "\n"
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, "a", encoding="utf-8")
+            self.file.write(line)
+            self.pending += 1
+            self.records += 1
+            if self.pending >= self.sync_every:
+                self._sync()
+            elif self.timer is None:
+                # Sync the rest of the batch even if no more writes come
+                self.timer = threading.Timer(self.sync_interval, self.sync)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def sync(self):
+        """Flush and fsync pending records"""
+        with self.lock:
+            self._sync()
+
+    def _sync(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.file is not None and self.pending:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.pending = 0
+
+    def close(self):
+        """Sync and close the log file"""
+        with self.lock:
+            self._sync()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def replay(self, apply):
+        """Call apply(op, args) for every logged write, returning the count"""
+        self.close()
+        if not self.path.exists():
+            return 0
+        
+        count = 0
+        with open(self.path, "rb+") as log:
+            offset = 0
+            for line in log:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Unfinished write from a crash; cut it off so appends start clean
+                    log.truncate(offset)
+                    break
+                offset += len(line)
+                apply(record["op"], record["args"])
+                count += 1
+        self.records = count
+        return count
+
+    def compact(self, records):
+        """Replace the log with the given (op, args) records, e.g. a snapshot"""
+        with self.lock:
+            self._sync()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(temp_path, "w", encoding="utf-8") as temp:
+                for op, args in records:
+                    temp.write(json.dumps({"op": op, "args": list(args)}) + "\n")
+                temp.flush()
+                os.fsync(temp.fileno())
+            os.replace(temp_path, self.path)
+            self.records = len(records)
+
+    def clear(self):
+        """Delete the log"""
+        with self.lock:
+            self._sync()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.path.unlink(missing_ok=True)
+            self.records = 0
+
+class JournaledMemoryBackend(MemoryBackend):
+    """In-memory store shared by all sessions whose writes are journaled
+    
+    The journal is replayed on startup, so fallback data survives restarts,
+    and is rewritten as a snapshot once it grows past compact_after records
+    so replay time stays proportional to the live data.
+    """
+
+    def __init__(self, store, journal, compact_after=JOURNAL_COMPACT_AFTER):
+        super().__init__(store)
+        self.journal = journal
+        self.compact_after = compact_after
+        self.lock = threading.RLock()
+        journal.replay(self.apply)
+
+    def apply(self, op, args):
+        """Apply a journaled write without logging it again"""
+        getattr(MemoryBackend, op)(self, *args)
+
+    def record(self, op, *args):
+        """Journal a write, compacting the journal when it gets long"""
+        self.journal.append(op, args)
+        if self.journal.records > self.compact_after:
+            self.journal.compact(self.snapshot())
+
+    def snapshot(self):
+        """Get the journal records that rebuild the current data"""
+        records = [("add_intern", (intern_id, name)) for intern_id, name in self.store['local_interns'].items()]
+        for intern_id, settings in self.store['local_settings'].items():
+            records.extend(("save_setting", (intern_id, key, value)) for key, value in settings.items())
+        for task in self.tasks.tasks_by_id.values():
+            records.append(("upsert_task", (
+                task["intern_id"], task["task_date"], task["task"], task["day_number"], task["formatted_date"]
+            )))
+        return records
+
+    def add_intern(self, intern_id, name):
+        with self.lock:
+            super().add_intern(intern_id, name)
+            self.record("add_intern", intern_id, name)
+
+    def upsert_task(self, intern_id, date_str, task_text, day_number, formatted_date):
+        with self.lock:
+            was_update = super().upsert_task(intern_id, date_str, task_text, day_number, formatted_date)
+            self.record("upsert_task", intern_id, date_str, task_text, day_number, formatted_date)
+            return was_update
+
+    def update_task(self, intern_id, task_id, task_text):
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if not task or task["intern_id"] != intern_id:
+                return False
+            # Ids are not stable across replays, so log by date
+            self.upsert_task(intern_id, task["task_date"], task_text, task["day_number"], task["formatted_date"])
+            return True
+
+    def delete_task(self, intern_id, task_id):
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if not task or task["intern_id"] != intern_id:
+                return False
+            self.delete_task_on_date(intern_id, task["task_date"])
+            return True
+
+    def delete_task_on_date(self, intern_id, date_str):
+        with self.lock:
+            super().delete_task_on_date(intern_id, date_str)
+            self.record("delete_task_on_date", intern_id, date_str)
+
+    def delete_all_tasks(self, intern_id):
+        with self.lock:
+            super().delete_all_tasks(intern_id)
+            self.record("delete_all_tasks", intern_id)
+
+    def save_setting(self, intern_id, key, value):
+        with self.lock:
+            super().save_setting(intern_id, key, value)
+            self.record("save_setting", intern_id, key, value)
+
+def flush_local_journal(target, journal):
+    """Copy the data journaled in fallback mode into target in bulk, then clear the journal
+    
+    Settings and tasks from the journal overwrite the target's values for
+    the same intern and key/date. Returns the number of tasks copied, or
+    None if the copy failed and the journal was kept.
+    """
+    local = MemoryBackend({})
+    if not journal.replay(lambda op, args: getattr(local, op)(*args)):
+        return 0
+    
+    known = {intern["intern_id"] for intern in target.get_interns()}
+    count = 0
+    try:
+        with target.transaction():
+            for intern in local.get_interns():
+                intern_id = intern["intern_id"]
+                if intern_id not in known:
+                    target.add_intern(intern_id, intern["name"])
+                for key, value in local.store['local_settings'].get(intern_id, {}).items():
+                    target.save_setting(intern_id, key, value)
+                
+                start_date_str = target.get_setting(intern_id, "start_date")
+                rows = [
+                    (task["task_date"], task["task"],
+                     calculate_day_number(task["task_date"], start_date_str), task["formatted_date"])
+                    for task in local.tasks.iter_tasks(intern_id)
+                ]
+                if rows:
+                    target.upsert_tasks(intern_id, rows)
+                    count += len(rows)
+    except target.errors as e:
+        notify("error", f"❌ Could not copy local data into the database: {str(e)}")
+        return None
+    
+    journal.clear()
+    return count
+
+def connect_sqlite(db_file=DB_FILE):
+    """Open a SQLite database file as a backend, or None if that fails"""
+    try:
+        manager = ConnectionManager(db_file)
+        create_tables(manager.writer)
+        notify("success", "✅ Connected to SQLite Database!")
+        return SQLiteBackend(manager)
+    except Exception as e:
+        notify("error", f"❌ Database Connection Failed: {str(e)}")
+        notify("info", "⚠️ Falling back to local data storage...")
+        return None
+
+def connect_postgres(dsn):
+    """Connect to PostgreSQL as a backend, or None if that fails"""
+    try:
+        backend = PostgresBackend(dsn)
+        notify("success", "✅ Connected to PostgreSQL Database!")
+        return backend
+    except Exception as e:
+        notify("error", f"❌ Database Connection Failed: {str(e)}")
+        notify("info", "⚠️ Falling back to local data storage...")
+        return None
+
+def open_backend(database_url=DATABASE_URL, db_file=DB_FILE, journal_file=LOCAL_JOURNAL_FILE):
+    """Open the configured storage backend, falling back to local storage
+    
+    Data saved in fallback mode by an earlier run is moved into the
+    database once it can be opened again.
+    """
+    if database_url.startswith(("postgres://", "postgresql://")):
+        backend = connect_postgres(database_url)
+    else:
+        backend = connect_sqlite(db_file)
+    if backend is None:
+        # Shared by all sessions and persisted through the journal
+        return JournaledMemoryBackend({}, WriteBehindJournal(journal_file))
+    
+    if Path(journal_file).exists():
+        count = flush_local_journal(backend, WriteBehindJournal(journal_file))
+        if count:
+            notify("success", f"✅ Copied {count} task(s) saved in local storage into the database")
+    return backend
+
+current_backend = None
+current_backend_lock = threading.Lock()
+
+def get_backend():
+    """Get the backend the helpers use, opening the configured one on first use"""
+    global current_backend
+    if current_backend is None:
+        with current_backend_lock:
+            if current_backend is None:
+                current_backend = open_backend()
+    return current_backend
+
+def set_backend(backend):
+    """Make the helpers use another backend, e.g. one opened by a worker"""
+    global current_backend
+    with current_backend_lock:
+        current_backend = backend
+
+# ---------------- BACKUPS ----------------
+# Stamps have microseconds so backups in the same second get their own files; older ones have none
+BACKUP_NAME_RE = re.compile(r"^internship_backup_(\d{8}_\d{6}(?:_\d{6})?)(?:_[\w-]+)?\.db(?:\.gz)?$")
+
+class BackupJob:
+    """One online backup of a SQLite database, run by the "backup" job
+    
+    Pages are copied a step at a time (see copy_database), so the app keeps
+    reading and writing meanwhile and the result is a consistent snapshot.
+    The copy is checked, optionally gzipped and only then renamed into
+    place, and backups beyond the retention limit are deleted.
+    """
+
+    def __init__(self, manager, backup_dir=BACKUP_DIR, compress=BACKUP_COMPRESS, keep=BACKUP_KEEP, label="",
+                 on_progress=None):
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        name = f"internship_backup_{stamp}{'_' + label if label else ''}.db"
+        self.manager = manager
+        self.backup_dir = Path(backup_dir)
+        self.path = self.backup_dir / (name + ".gz" if compress else name)
+        self.compress = compress
+        self.keep = keep
+        self.on_progress = on_progress  # called with the share done after each step
+        self.status = "pending"  # then copying, verifying, compressing, done or failed
+        self.pages_done = 0
+        self.pages_total = 0
+        self.task_count = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def running(self):
+        return self.status not in ("done", "failed")
+
+    @property
+    def progress(self):
+        """Share of the backup done, from 0.0 to 1.0"""
+        if self.status == "done":
+            return 1.0
+        return self.pages_done / self.pages_total if self.pages_total else 0.0
+
+    def report_progress(self, status, remaining, total):
+        """Progress callback of Connection.backup()"""
+        self.pages_total = total
+        self.pages_done = total - remaining
+        if self.on_progress:
+            self.on_progress(self.progress)
+
+    def run(self):
+        """Copy, verify, compress and rotate; failures end up in status and error"""
+        self.started_at = datetime.now()
+        copy_path = self.backup_dir / (self.path.name.removesuffix(".gz") + ".part")
+        gzip_path = self.backup_dir / (self.path.name + ".part")
+        try:
+            self.backup_dir.mkdir(parents=True, exist_ok=True)
+            self.status = "copying"
+            copy_database(self.manager, copy_path, progress=self.report_progress)
+            self.status = "verifying"
+            self.task_count = verify_database(copy_path)
+            if self.path.exists():
+                raise FileExistsError(f"{self.path.name} already exists")
+            if self.compress:
+                self.status = "compressing"
+                with open(copy_path, "rb") as source, gzip.open(gzip_path, "wb") as target:
+                    shutil.copyfileobj(source, target)
+                copy_path.unlink()
+                os.replace(gzip_path, self.path)
+            else:
+                os.replace(copy_path, self.path)
+            if self.keep:
+                prune_backups(self.backup_dir, self.keep)
+            self.status = "done"
+        except Exception as e:
+            logger.exception("Backup of %s failed", self.manager.db_file)
+            self.error = str(e)
+            self.status = "failed"
+            for path in (copy_path, gzip_path):
+                path.unlink(missing_ok=True)
+        finally:
+            self.finished_at = datetime.now()
+
+def copy_database(manager, target_file, progress=None, pages=BACKUP_PAGES_PER_STEP, pause=BACKUP_STEP_PAUSE):
+    """Copy a live database into a new single-file database, a few pages at a time
+    
+    The copy reads through the manager's writer and holds its write lock
+    only while a step runs. Writes made in between go through the same
+    connection, so SQLite carries them into the copy instead of restarting
+    it; only writes from other processes cause a restart.
+    """
+    lock = manager.write_lock
+    
+    def step_done(status, remaining, total):
+        if progress:
+            progress(status, remaining, total)
+        if remaining:
+            lock.release()
+            try:
+                time.sleep(pause)
+            finally:
+                lock.acquire()
+    
+    target = sqlite3.connect(target_file)
+    try:
+        with lock:
+            manager.writer.backup(target, pages=pages, progress=step_done)
+        target.execute("PRAGMA journal_mode = DELETE")  # no -wal file next to the copy
+    finally:
+        target.close()
+
+def verify_database(path):
+    """Check a database file is intact and has the tracker's tables
+    
+    Returns its number of tasks; raises ValueError if the check fails.
+    """
+    try:
+        connection = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    except sqlite3.Error as e:
+        raise ValueError(f"Cannot open backup: {e}")
+    try:
+        result = connection.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != "ok":
+            raise ValueError(f"Integrity check failed: {result}")
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        missing = BACKUP_REQUIRED_TABLES - tables
+        if missing:
+            raise ValueError(f"Not a tracker database, missing tables: {', '.join(sorted(missing))}")
+        return connection.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"Not a valid SQLite database: {e}")
+    finally:
+        connection.close()
+
+def list_backups(backup_dir=BACKUP_DIR):
+    """List finished backups, newest first, with name, path, size and creation time"""
+    backups = []
+    for path in Path(backup_dir).glob("internship_backup_*"):
+        match = BACKUP_NAME_RE.match(path.name)
+        if match:
+            backups.append({
+                "name": path.name,
+                "path": path,
+                "size": path.stat().st_size,
+                "created": datetime.strptime(
+                    match.group(1), "%Y%m%d_%H%M%S_%f" if match.group(1).count("_") == 2 else "%Y%m%d_%H%M%S"
+                )
+            })
+    backups.sort(key=lambda backup: (backup["created"], backup["name"]), reverse=True)
+    return backups
+
+def prune_backups(backup_dir=BACKUP_DIR, keep=BACKUP_KEEP):
+    """Delete all but the newest keep backups, returning the deleted names"""
+    removed = []
+    for backup in list_backups(backup_dir)[keep:]:
+        backup["path"].unlink(missing_ok=True)
+        removed.append(backup["name"])
+    return removed
+
+def restore_backup(manager, path, backup_dir=BACKUP_DIR):
+    """Replace the database contents with a backup, returning its task count
+    
+    The backup is unpacked and verified before anything is touched, and the
+    current data is first saved as a "pre-restore" backup so the restore can
+    be undone. Backups from older versions are migrated to the current schema.
+    """
+    path = Path(path)
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Checked on a private copy, so the file cannot change before loading
+        candidate = Path(work_dir) / "restore.db"
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rb") as source, open(candidate, "wb") as target:
+            shutil.copyfileobj(source, target)
+        task_count = verify_database(candidate)
+        
+        safety = BackupJob(manager, backup_dir, keep=None, label="pre-restore")
+        safety.run()
+        if safety.status == "failed":
+            raise RuntimeError(f"Could not back up the current data: {safety.error}")
+        
+        try:
+            load_database(manager, candidate)
+        except sqlite3.Error as e:
+            load_database(manager, safety.path)
+            raise RuntimeError(f"Restored data could not be migrated, kept the current data: {e}")
+        finally:
+            manager.query_cache.invalidate()
+    return task_count
+
+def load_database(manager, path):
+    """Overwrite a live database with a (gzipped) database file and migrate it
+    
+    Raises sqlite3.Error if the result lacks the current schema.
+    """
+    path = Path(path)
+    with tempfile.TemporaryDirectory() as work_dir:
+        if path.suffix == ".gz":
+            unpacked = Path(work_dir) / "load.db"
+            with gzip.open(path, "rb") as source, open(unpacked, "wb") as target:
+                shutil.copyfileobj(source, target)
+            path = unpacked
+        source = sqlite3.connect(path)
+        try:
+            with manager.write_lock:
+                source.backup(manager.writer)
+                create_tables(manager.writer)
+                # create_tables reports failures itself; make sure the schema is usable
+                manager.writer.execute("SELECT intern_id, day_number, formatted_date FROM tasks LIMIT 1")
+                manager.writer.execute("SELECT task_count FROM task_stats LIMIT 1")
+                # Sequence numbers from before the restore mean nothing now
+                manager.writer.execute("UPDATE sync_state SET epoch = lower(hex(randomblob(8)))")
+                manager.writer.commit()
+        finally:
+            source.close()
+
+# ---------------- TASK DATA ----------------
+def get_interns():
+    """Get all interns ordered by name"""
+    return get_backend().get_interns()
+
+def add_intern(name):
+    """Add an intern, returning their ID, or None if the ID is taken"""
+    intern_id = re.sub(r"[^a-z0-9]+", "-", name.strip().lower()).strip("-")
+    if not intern_id or any(intern["intern_id"] == intern_id for intern in get_interns()):
+        return None
+    
+    get_backend().add_intern(intern_id, name.strip())
+    return intern_id
+
+def check_date_exists(selected_date, intern_id=None):
+    """Check if a task exists for the given date"""
+    intern_id = resolve_intern(intern_id)
+    return get_backend().get_task_by_date(intern_id, selected_date.isoformat())
+
+UPSERT_TASK_SQL = """
+    INSERT INTO tasks (intern_id, task_date, task, day_number, formatted_date)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(intern_id, task_date) DO UPDATE
+    SET task = excluded.task, revision = tasks.revision + 1, updated_at = CURRENT_TIMESTAMP
+"""
+
+def save_or_update_task(selected_date, task_text, intern_id=None):
+    """Save or update the task on a date
+    
+    Uses a single upsert. Can run inside transaction() with other writes.
+    """
+    intern_id = resolve_intern(intern_id)
+    date_str = selected_date.isoformat()
+    
+    was_update = get_backend().upsert_task(
+        intern_id, date_str, task_text,
+        calculate_day_number(date_str, get_setting("start_date", intern_id)),
+        format_task_date(date_str)
+    )
+    action = "updated" if was_update else "saved"
+    return action, was_update
+
+def update_task(task_id, new_task, intern_id=None):
+    """Update task by ID, returning False if there is no such task"""
+    return get_backend().update_task(resolve_intern(intern_id), task_id, new_task)
+
+def delete_task(task_id, intern_id=None):
+    """Delete task by ID, returning False if there is no such task"""
+    return get_backend().delete_task(resolve_intern(intern_id), task_id)
+
+def delete_all_tasks(intern_id=None):
+    """Delete every task of an intern"""
+    get_backend().delete_all_tasks(resolve_intern(intern_id))
+
+@profiled("python")
+def get_tasks_sorted_by_day(intern_id=None):
+    """Get all tasks sorted by day number"""
+    return get_backend().get_tasks_sorted_by_day(resolve_intern(intern_id))
+
+EMPTY_TASK_STATS = {
+    "task_count": 0, "numbered_count": 0, "min_day": None, "max_day": None,
+    "first_date": None, "last_date": None, "longest_streak": 0, "last_streak": 0
+}
+
+@profiled("python")
+def get_task_stats(intern_id=None):
+    """Get the dashboard statistics of an intern's log
+    
+    Returns task_count, numbered_count, min/max_day, first/last_date,
+    longest_streak and current_streak. current_streak counts the run of
+    consecutive days ending at the last task, as long as that task is from
+    today or yesterday. The streaks count every logged date; the dashboards
+    show the ones from get_gap_reports, which only count days in the
+    internship window.
+    """
+    backend_stats = get_backend().get_task_stats(resolve_intern(intern_id)) or EMPTY_TASK_STATS
+    stats = {key: backend_stats[key] for key in EMPTY_TASK_STATS}
+    last_streak = stats.pop("last_streak")
+    recent = stats["last_date"] and stats["last_date"] >= (date.today() - timedelta(days=1)).isoformat()
+    stats["current_streak"] = last_streak if recent else 0
+    return stats
+
+def get_period_counts(period_type="month", intern_id=None):
+    """Get task counts per "week" or "month", oldest first"""
+    return get_backend().get_period_counts(resolve_intern(intern_id), period_type)
+
+def get_report_bounds(intern_id=None):
+    """Get first/last day number and number of tasks in the report"""
+    stats = get_task_stats(intern_id)
+    return {"min_day": stats["min_day"], "max_day": stats["max_day"], "count": stats["numbered_count"]}
+
+def count_report_tasks(day_range, search_term="", intern_id=None):
+    """Count report tasks in a day range matching the search term"""
+    return get_backend().count_report_tasks(resolve_intern(intern_id), day_range, search_term)
+
+@profiled("python")
+def get_report_page(day_range, search_term="", after=None, page_size=DEFAULT_REPORT_PAGE_SIZE,
+                    order="day", intern_id=None):
+    """Get one page of report tasks following a cursor (keyset pagination)
+    
+    ``order`` is "day" (cursor is a day number) or "rank" for best search
+    matches first (cursor is a (rank, day number) pair from report_cursor).
+    Returns the tasks on the page and whether another page follows.
+    """
+    tasks = get_backend().get_report_page(
+        resolve_intern(intern_id), day_range, search_term, after, page_size, order
+    )
+    return tasks[:page_size], len(tasks) > page_size
+
+@profiled("export")
+def get_tasks_for_download(intern_id=None):
+    """Get all tasks for download with day numbers"""
+    import pandas as pd
+    df = pd.DataFrame(list(iter_export_rows(intern_id)), columns=EXPORT_COLUMNS)
+    return df if not df.empty else None
+
+def iter_export_rows(intern_id=None, batch_size=EXPORT_BATCH_SIZE):
+    """Yield (day number, date, task) export rows straight from a cursor"""
+    return get_backend().iter_export_rows(resolve_intern(intern_id), batch_size)
+
+def iter_csv_chunks(intern_id=None, batch_size=EXPORT_BATCH_SIZE):
+    """Yield the CSV export as UTF-8 chunks of up to batch_size rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    
+    for count, row in enumerate(iter_export_rows(intern_id, batch_size), 1):
+        writer.writerow(row)
+        if count % batch_size == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    
+    yield buffer.getvalue().encode('utf-8')
+
+def write_csv_export(output, intern_id=None):
+    """Stream the CSV export into a binary file object"""
+    for chunk in iter_csv_chunks(intern_id):
+        output.write(chunk)
+
+@profiled("export")
+def create_csv_download(intern_id=None):
+    """Create CSV file for download"""
+    return b"".join(iter_csv_chunks(intern_id))
+
+def get_export_column_widths(intern_id=None):
+    """Get Excel column widths from the longest value in each export column"""
+    lengths = get_backend().get_export_lengths(resolve_intern(intern_id))
+    return [
+        min(max(len(header), length or 0) + 2, 50)
+        for header, length in zip(EXPORT_COLUMNS, lengths)
+    ]
+
+@profiled("export")
+def create_excel_download(intern_id=None):
+    """Create Excel file for download (if openpyxl is available)"""
+    output = io.BytesIO()
+    if not write_excel_export(output, intern_id):
+        return None, False
+    return output.getvalue(), True
+
+def write_excel_export(output, intern_id=None, progress=None):
+    """Write the Excel export into a binary file object, False without openpyxl
+    
+    Rows are streamed into a write-only workbook, so the sheet is never
+    held in memory as cell objects. progress(rows) is called every
+    EXPORT_BATCH_SIZE rows.
+    """
+    try:
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+    except ImportError:
+        return False
+    
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Internship Tasks')
+    
+    # Write-only sheets need their column widths before any rows
+    for index, width in enumerate(get_export_column_widths(intern_id), 1):
+        worksheet.column_dimensions[get_column_letter(index)].width = width
+    
+    header = []
+    for title in EXPORT_COLUMNS:
+        cell = WriteOnlyCell(worksheet, value=title)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    worksheet.append(header)
+    
+    for count, row in enumerate(iter_export_rows(intern_id), 1):
+        worksheet.append(row)
+        if progress and count % EXPORT_BATCH_SIZE == 0:
+            progress(count)
+    
+    workbook.save(output)
+    return True
+
+def get_task_count(intern_id=None):
+    """Get total task count"""
+    return get_task_stats(intern_id)["task_count"]
+
+def get_active_days(intern_id=None):
+    """Get count of distinct task dates"""
+    # An intern has at most one task per date
+    return get_task_stats(intern_id)["task_count"]
+
+def get_setting(key, intern_id=None):
+    """Get a setting value"""
+    return get_backend().get_setting(resolve_intern(intern_id), key)
+
+def save_setting(key, value, intern_id=None):
+    """Save a setting value"""
+    backend = get_backend()
+    try:
+        backend.save_setting(resolve_intern(intern_id), key, value)
+    except backend.errors as e:
+        notify("error", f"Database error: {str(e)}")
+
+def authenticate_user(username, password):
+    """Authenticate user"""
+    return get_backend().authenticate_user(username, password)
+
+def get_tasks_with_filter(filter_date=None, limit=20, intern_id=None):
+    """Get tasks with optional filter and limit"""
+    intern_id = resolve_intern(intern_id)
+    date_str = filter_date.isoformat() if filter_date else None
+    return get_backend().get_recent_tasks(intern_id, date_str, limit) or []
+
+# ---------------- ANALYTICS ----------------
+def compute_analytics(frame, start_date_str, today, total_days=TOTAL_DAYS):
+    """Compute the analytics charts from a task_date/task DataFrame
+    
+    Everything is vectorized over the columns: dates are parsed once with
+    pd.to_datetime and the daily, weekly and monthly series come from
+    groupby/resample. Days are counted from the start date up to today or
+    the end of the internship, whichever comes first.
+    """
+    import pandas as pd
+    
+    dates = pd.to_datetime(frame["task_date"], errors="coerce")
+    words = frame["task"].fillna("").str.split().str.len()
+    
+    start = pd.Timestamp(start_date_str)
+    end = min(start + pd.Timedelta(days=total_days - 1), pd.Timestamp(today))
+    window = pd.date_range(start, end, freq="D")
+    
+    # Tasks per internship day so far, 0 where nothing was logged
+    daily = dates[dates.between(start, end)].value_counts().reindex(window, fill_value=0).sort_index()
+    logged = daily.gt(0)
+    
+    heatmap = pd.DataFrame({
+        "week": (window - pd.to_timedelta(window.dayofweek, unit="D")).strftime("%Y-%m-%d"),
+        "weekday": window.day_name().str[:3],
+        "tasks": daily.to_numpy()
+    })
+    
+    valid = dates.notna()
+    word_trend = pd.DataFrame(
+        {"Words": words[valid].to_numpy()}, index=pd.DatetimeIndex(dates[valid], name="Date")
+    ).sort_index()
+    word_trend["Rolling Average"] = word_trend["Words"].rolling(ANALYTICS_ROLLING_TASKS, min_periods=1).mean()
+    
+    return {
+        "elapsed_days": len(window),
+        "logged_days": int(logged.sum()),
+        "missed_days": int((~logged).sum()),
+        "completion_rate": float(logged.mean() * 100) if len(window) else 0.0,
+        "average_words": float(words.mean()) if len(words) else 0.0,
+        "weekly_completion": (logged.resample("W-SUN").mean() * 100).rename("Completion %").to_frame(),
+        "monthly_tasks": daily.resample("MS").sum().rename("Tasks").to_frame(),
+        "heatmap": heatmap,
+        "word_trend": word_trend
+    }
+
+# ---------------- MISSED DAYS ----------------
+def detect_gaps(task_runs, start_date, today, total_days=TOTAL_DAYS):
+    """Find missed days and streaks in one pass over sorted runs of logged days
+    
+    task_runs are (first, last) ISO dates of consecutive logged days, as
+    yielded by iter_task_runs. Only days from the start date to the end of
+    the internship or today count, and the space between two runs is a
+    missed range, so no calendar of every day is built. Today is not
+    missed until it is over; the current streak is the run reaching
+    yesterday or today.
+    """
+    one_day = timedelta(days=1)
+    last_day = min(start_date + timedelta(days=total_days - 1), today)
+    gaps = []
+    logged_days = longest_streak = run = 0
+    expected = start_date  # first day not yet logged or marked missed
+    
+    for first_str, last_str in task_runs:
+        first = max(date.fromisoformat(first_str), start_date)
+        last = min(date.fromisoformat(last_str), last_day)
+        if first > last:
+            if first > last_day:
+                break
+            continue  # Run entirely before the start date
+        if first > expected:
+            gaps.append((expected, first - one_day))
+        run = (last - first).days + 1
+        logged_days += run
+        longest_streak = max(longest_streak, run)
+        expected = last + one_day
+    
+    # Days since the last entry, up to yesterday
+    trailing_end = min(last_day, today - one_day)
+    if expected <= trailing_end:
+        gaps.append((expected, trailing_end))
+        run = 0
+    
+    return {
+        "logged_days": logged_days,
+        "missed_days": sum((last - first).days + 1 for first, last in gaps),
+        "longest_streak": longest_streak,
+        "current_streak": run,
+        "gaps": [
+            {"from": first.isoformat(), "to": last.isoformat(), "days": (last - first).days + 1}
+            for first, last in gaps
+        ]
+    }
+
+def get_gap_reports(intern_ids=None, today=None):
+    """Detect gaps for many interns from one query of consecutive-day runs
+    
+    Returns {intern_id: detect_gaps result} for interns with a start date.
+    """
+    today = today or date.today()
+    backend = get_backend()
+    start_dates = backend.get_setting_values("start_date")
+    if intern_ids is not None:
+        start_dates = {intern_id: start_dates[intern_id] for intern_id in intern_ids if intern_id in start_dates}
+    
+    reports = {
+        intern_id: detect_gaps([], date.fromisoformat(start_date_str), today)
+        for intern_id, start_date_str in start_dates.items()
+    }
+    rows = backend.iter_task_runs(list(start_dates) if intern_ids is not None else None)
+    for intern_id, intern_rows in itertools.groupby(rows, key=lambda row: row[0]):
+        if intern_id in start_dates:
+            reports[intern_id] = detect_gaps(
+                (row[1:] for row in intern_rows), date.fromisoformat(start_dates[intern_id]), today
+            )
+    return reports
+
+# ---------------- BULK IMPORT ----------------
+def parse_import_date(value):
+    """Parse a date from an import file into ISO format, or None if invalid"""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if not isinstance(value, str):
+        return None
+    
+    value = value.strip()
+    for date_format in IMPORT_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date().isoformat()
+        except ValueError:
+            pass
+    try:
+        # Also accept full ISO timestamps such as 2024-01-05T00:00:00
+        return datetime.fromisoformat(value).date().isoformat()
+    except ValueError:
+        return None
+
+def read_import_file(file_name, data):
+    """Read task records from CSV, JSON or Excel file contents
+    
+    Accepts this app's exports and the browser client's JSON export.
+    Raises ValueError if the file cannot be read.
+    """
+    extension = Path(file_name).suffix.lower().lstrip(".")
+    
+    if extension == "csv":
+        try:
+            text = data.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValueError("CSV file must be UTF-8 encoded")
+        return list(csv.DictReader(io.StringIO(text)))
+    
+    if extension == "json":
+        try:
+            content = json.loads(data)
+        except ValueError:
+            raise ValueError("File is not valid JSON")
+        if isinstance(content, dict):
+            content = content.get("tasks")
+        if not isinstance(content, list) or not all(isinstance(item, dict) for item in content):
+            raise ValueError("JSON must be a list of tasks or an object with a 'tasks' list")
+        return content
+    
+    if extension == "xlsx":
+        try:
+            import openpyxl
+        except ImportError:
+            raise ValueError("Excel import needs openpyxl")
+        try:
+            workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+        except Exception:
+            raise ValueError("File is not a valid Excel workbook")
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [str(header) if header is not None else "" for header in next(rows, [])]
+        records = [dict(zip(headers, row)) for row in rows if any(cell is not None for cell in row)]
+        workbook.close()
+        return records
+    
+    raise ValueError(f"Unsupported file type: .{extension}")
+
+def import_tasks(records, intern_id=None):
+    """Validate, deduplicate and upsert task records in one transaction
+    
+    Each record needs a date (task_date/date column) and task text. When a
+    date appears more than once, the last record wins. Returns counts of
+    inserted, updated, duplicate and rejected rows plus rejection reasons.
+    """
+    intern_id = resolve_intern(intern_id)
+    result = {"inserted": 0, "updated": 0, "duplicates": 0, "rejected": 0, "errors": []}
+    
+    tasks_by_date = {}
+    for row_number, record in enumerate(records, 1):
+        fields = {
+            str(key).strip().lower().replace(" ", "_"): value
+            for key, value in record.items() if key is not None
+        }
+        date_value = next((fields[key] for key in IMPORT_DATE_COLUMNS if fields.get(key)), None)
+        task_value = next((fields[key] for key in IMPORT_TASK_COLUMNS if fields.get(key)), None)
+        
+        date_str = parse_import_date(date_value)
+        task_text = str(task_value).strip() if task_value is not None else ""
+        if not date_str:
+            result["rejected"] += 1
+            result["errors"].append(f"Row {row_number}: missing or invalid date {date_value!r}")
+            continue
+        if not task_text:
+            result["rejected"] += 1
+            result["errors"].append(f"Row {row_number}: empty task")
+            continue
+        
+        if date_str in tasks_by_date:
+            result["duplicates"] += 1
+        tasks_by_date[date_str] = task_text
+    
+    if not tasks_by_date:
+        return result
+    
+    start_date_str = get_setting("start_date", intern_id)
+    rows = [
+        (date_str, task_text, calculate_day_number(date_str, start_date_str), format_task_date(date_str))
+        for date_str, task_text in sorted(tasks_by_date.items())
+    ]
+    backend = get_backend()
+    try:
+        existing = backend.upsert_tasks(intern_id, rows)
+    except backend.errors as e:
+        notify("error", f"Database error: {str(e)}")
+        result["rejected"] += len(rows)
+        result["errors"].append(f"Import rolled back: {str(e)}")
+        return result
+    
+    result["updated"] = len(existing & tasks_by_date.keys())
+    result["inserted"] = len(rows) - result["updated"]
+    return result
+
+# ---------------- DELTA SYNC ----------------
+def sync_change(row):
+    """A change log row in the shape sync clients exchange"""
+    return {
+        "kind": row["kind"],
+        "key": row["item_key"],
+        "value": None if row["deleted"] else row["value"],
+        "deleted": bool(row["deleted"]),
+        "seq": row["seq"],
+        "changed_at": row["changed_at"]
+    }
+
+def get_sync_changes(since=0, limit=SYNC_PAGE_SIZE, intern_id=None):
+    """Get the tasks and settings that changed after sequence number `since`
+    
+    Returns the log epoch, the changes oldest first, the cursor to pull
+    from next and whether more changes are waiting. A client whose stored
+    epoch differs from the returned one must pull again from 0.
+    """
+    intern_id = resolve_intern(intern_id)
+    backend = get_backend()
+    rows = backend.get_changes(intern_id, since, limit + 1)
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "epoch": backend.get_sync_epoch(),
+        "changes": [
+            sync_change(row) for row in rows
+            if row["kind"] == "task" or row["item_key"] in SYNC_SETTINGS
+        ],
+        "cursor": rows[-1]["seq"] if rows else since,
+        "more": more
+    }
+
+def check_sync_change(change):
+    """Validate a pushed change, returning an error message or None"""
+    if not isinstance(change, dict):
+        return "change must be an object"
+    kind, key = change.get("kind"), change.get("key")
+    if kind == "task":
+        if not isinstance(key, str) or parse_import_date(key) != key:
+            return f"invalid task date {key!r}"
+        if not change.get("deleted") and not str(change.get("value") or "").strip():
+            return "empty task"
+    elif kind == "setting":
+        if key not in SYNC_SETTINGS:
+            return f"setting {key!r} cannot be synced"
+        if change.get("deleted"):
+            return "settings cannot be deleted"
+        if key == "start_date" and parse_import_date(change.get("value")) != change.get("value"):
+            return f"invalid start date {change.get('value')!r}"
+    else:
+        return f"unknown kind {kind!r}"
+    if not isinstance(change.get("base", 0), int):
+        return "base must be a sequence number"
+    return None
+
+def apply_sync_change(backend, intern_id, change):
+    """Write one pushed change through the backend"""
+    key = change["key"]
+    if change["kind"] == "setting":
+        backend.save_setting(intern_id, key, change["value"])
+    elif change.get("deleted"):
+        task = backend.get_task_by_date(intern_id, key)
+        if task:
+            backend.delete_task(intern_id, task["id"])
+    else:
+        backend.upsert_task(
+            intern_id, key, str(change["value"]).strip(),
+            calculate_day_number(key, backend.get_setting(intern_id, "start_date")),
+            format_task_date(key)
+        )
+
+def push_sync_changes(changes, intern_id=None):
+    """Apply changes made offline by a client, in one transaction
+    
+    Each change names a task date or setting, its new value or deletion,
+    `base` (the sequence number the client last saw for it) and
+    `updated_at` (when the client made it, in ISO 8601 UTC). When the
+    server's copy changed after `base` as well, the later edit wins and a
+    losing client change comes back in `conflicts` with the server's
+    version. Backend errors are raised so the whole push can be retried.
+    """
+    intern_id = resolve_intern(intern_id)
+    backend = get_backend()
+    result = {"applied": [], "conflicts": [], "rejected": []}
+    
+    with backend.transaction():
+        for change in changes:
+            error = check_sync_change(change)
+            if error:
+                result["rejected"].append({
+                    "kind": change.get("kind") if isinstance(change, dict) else None,
+                    "key": change.get("key") if isinstance(change, dict) else None,
+                    "error": error
+                })
+                continue
+            
+            kind, key = change["kind"], change["key"]
+            current = backend.get_change(intern_id, kind, key)
+            if (
+                current and current["seq"] > change.get("base", 0)
+                and current["changed_at"] >= str(change.get("updated_at") or "")
+            ):
+                result["conflicts"].append(sync_change(current))
+                continue
+            
+            apply_sync_change(backend, intern_id, change)
+            current = backend.get_change(intern_id, kind, key)
+            result["applied"].append({"kind": kind, "key": key, "seq": current["seq"] if current else None})
+    return result
+
+# ---------------- BACKGROUND JOBS ----------------
+JOBS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    intern_id TEXT,
+    params TEXT NOT NULL DEFAULT '{}',
+    cache_key TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    result_path TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+)
+"""
+JOB_STATUSES = ["queued", "running", "done", "failed", "cancelled"]
+JOB_FINISHED = ("done", "failed", "cancelled")
+
+class JobCancelled(Exception):
+    """The job was cancelled while it ran"""
+
+class RunningJob:
+    """What a job function gets: its row, progress reporting and cancellation"""
+
+    def __init__(self, runner, row, cancel_event):
+        self.runner = runner
+        self.id = row["id"]
+        self.intern_id = row["intern_id"]
+        self.params = json.loads(row["params"])
+        self.cancel_event = cancel_event
+        self.reported_at = 0.0
+
+    def check(self):
+        """Raise JobCancelled if the job was asked to stop"""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def report(self, progress, message=None):
+        """Record progress (0.0 to 1.0), at most every JOB_PROGRESS_INTERVAL seconds"""
+        self.check()
+        now = time.monotonic()
+        if message is not None or now - self.reported_at >= JOB_PROGRESS_INTERVAL:
+            self.reported_at = now
+            fields = {"progress": min(max(progress, 0.0), 1.0)}
+            if message is not None:
+                fields["message"] = message
+            self.runner.update(self.id, **fields)
+
+    def result_file(self, suffix):
+        """Path for the job's result file"""
+        self.runner.result_dir.mkdir(parents=True, exist_ok=True)
+        return self.runner.result_dir / f"job_{self.id}{suffix}"
+
+class JobRunner:
+    """Runs heavy operations on a thread pool and records them in a job table
+
+    Jobs are rows in their own SQLite file, whatever the data backend, so
+    any rerun can poll them by ID. Results are files that later requests
+    for the same data version reuse instead of running the job again.
+    Jobs run inside the process that queued them; ones left unfinished by
+    a restart are marked failed when the next runner starts.
+    """
+
+    def __init__(self, db_file=JOBS_DB_FILE, result_dir=JOB_RESULT_DIR, workers=JOB_WORKERS):
+        self.manager = ConnectionManager(db_file)
+        self.manager.writer.execute(JOBS_TABLE_SQL)
+        self.manager.writer.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_cache_key ON jobs(cache_key, status)"
+        )
+        self.result_dir = Path(result_dir)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tracker-job")
+        self.active = {}  # job id -> (future, cancel event)
+        self.lock = threading.Lock()
+
+        now = datetime.now().isoformat(timespec="seconds")
+        execute_query(
+            self.manager,
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE status IN ('queued', 'running')",
+            ("Interrupted by a restart", now)
+        )
+        self.prune()
+
+    def update(self, job_id, **fields):
+        """Set columns of a job row"""
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        execute_query(self.manager, f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id):
+        """Get a job row as a dict, or None"""
+        return execute_query(self.manager, "SELECT * FROM jobs WHERE id = ?", (job_id,), fetchone=True, use_cache=False)
+
+    def recent(self, limit=20, intern_id=None):
+        """Get the latest jobs, newest first, optionally for one intern"""
+        if intern_id is None:
+            return execute_query(
+                self.manager, "SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,), fetch=True, use_cache=False
+            ) or []
+        return execute_query(
+            self.manager, "SELECT * FROM jobs WHERE intern_id = ? ORDER BY id DESC LIMIT ?",
+            (intern_id, limit), fetch=True, use_cache=False
+        ) or []
+
+    def submit(self, kind, intern_id=None, cache_key=None, **params):
+        """Queue a job and return its ID
+
+        A job with the same cache key that is still queued or running is
+        returned instead, and so is a finished one of CACHED_JOB_KINDS whose
+        result file is still in place.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        with self.lock:
+            if cache_key is not None:
+                for job in execute_query(
+                    self.manager,
+                    "SELECT * FROM jobs WHERE cache_key = ? AND status IN ('queued', 'running', 'done') ORDER BY id DESC",
+                    (cache_key,), fetch=True, use_cache=False
+                ) or []:
+                    if job["status"] != "done":
+                        return job["id"]
+                    if kind in CACHED_JOB_KINDS and job["result_path"] and Path(job["result_path"]).exists():
+                        return job["id"]
+
+            job_id = execute_query(
+                self.manager,
+                "INSERT INTO jobs (kind, intern_id, params, cache_key, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, intern_id, json.dumps(params), cache_key, datetime.now().isoformat(timespec="seconds"))
+            )
+            if job_id is None:
+                raise RuntimeError(f"Could not queue the {kind} job")
+            cancel_event = threading.Event()
+            self.active[job_id] = (self.executor.submit(self.run, job_id, cancel_event), cancel_event)
+        return job_id
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; True if it was still active"""
+        with self.lock:
+            future, cancel_event = self.active.get(job_id, (None, None))
+            if future is None:
+                return False
+            cancel_event.set()
+            if future.cancel():
+                # Never started, so nothing else will finish the row
+                self.active.pop(job_id, None)
+                self.update(job_id, status="cancelled", finished_at=datetime.now().isoformat(timespec="seconds"))
+        return True
+
+    def run(self, job_id, cancel_event):
+        """Run one job on a worker thread and record how it ended"""
+        row = self.get(job_id)
+        job = RunningJob(self, row, cancel_event)
+        kind = row["kind"]
+        self.update(job_id, status="running", started_at=datetime.now().isoformat(timespec="seconds"))
+        fields = {}
+        try:
+            job.check()
+            result_path = JOB_KINDS[kind](job)
+            fields = {"status": "done", "progress": 1.0, "result_path": str(result_path) if result_path else None}
+        except JobCancelled:
+            fields = {"status": "cancelled"}
+        except Exception as e:
+            if cancel_event.is_set():
+                # Cancelled through a callback that turned JobCancelled into another error
+                fields = {"status": "cancelled"}
+            else:
+                logger.exception("Job %s (%s) failed", job_id, kind)
+                fields = {"status": "failed", "error": str(e)}
+        finally:
+            if fields.get("status") != "done":
+                for path in self.result_dir.glob(f"job_{job_id}.*"):
+                    path.unlink(missing_ok=True)
+            with self.lock:
+                self.active.pop(job_id, None)
+            self.update(job_id, finished_at=datetime.now().isoformat(timespec="seconds"), **fields)
+
+    def prune(self, keep_days=JOB_KEEP_DAYS):
+        """Delete finished jobs older than keep_days, with their result files"""
+        cutoff = (datetime.now() - timedelta(days=keep_days)).isoformat(timespec="seconds")
+        old_jobs = execute_query(
+            self.manager, "SELECT id, result_path FROM jobs WHERE finished_at < ?", (cutoff,),
+            fetch=True, use_cache=False
+        ) or []
+        for job in old_jobs:
+            # Backups live in BACKUP_DIR and are rotated on their own
+            if job["result_path"] and Path(job["result_path"]).parent == self.result_dir:
+                Path(job["result_path"]).unlink(missing_ok=True)
+        execute_query(self.manager, "DELETE FROM jobs WHERE finished_at < ?", (cutoff,))
+
+    def shutdown(self):
+        """Cancel queued jobs and wait for running ones"""
+        for job_id in list(self.active):
+            self.cancel(job_id)
+        self.executor.shutdown(wait=True)
+
+def run_csv_export(job):
+    """Write the CSV export to a result file"""
+    total = max(get_task_count(job.intern_id), 1)
+    path = job.result_file(".csv")
+    with open(path, "wb") as output:
+        for count, chunk in enumerate(iter_csv_chunks(job.intern_id), 1):
+            job.report(count * EXPORT_BATCH_SIZE / total)
+            output.write(chunk)
+    return path
+
+def run_excel_export(job):
+    """Write the Excel export to a result file"""
+    total = max(get_task_count(job.intern_id), 1)
+    path = job.result_file(".xlsx")
+    with open(path, "wb") as output:
+        if not write_excel_export(output, job.intern_id, progress=lambda rows: job.report(rows / total)):
+            raise RuntimeError("Excel export needs openpyxl (pip install openpyxl)")
+    return path
+
+def sqlite_manager(action):
+    """The SQLite backend's connection manager, for jobs that only work there"""
+    backend = get_backend()
+    if not isinstance(backend, SQLiteBackend):
+        raise ValueError(f"{action} needs the SQLite database, not {backend.label}")
+    return backend.manager
+
+def run_backup(job):
+    """Back up the SQLite database into BACKUP_DIR"""
+    backup = BackupJob(sqlite_manager("Backup"), on_progress=job.report)
+    backup.run()
+    job.check()
+    if backup.status == "failed":
+        raise RuntimeError(backup.error)
+    job.report(1.0, f"{backup.task_count} tasks in {backup.path.name}")
+    return backup.path
+
+def run_restore(job):
+    """Restore the SQLite database from a backup"""
+    task_count = restore_backup(sqlite_manager("Restore"), job.params["path"])
+    job.report(1.0, f"Restored {task_count} tasks from {Path(job.params['path']).name}")
+
+def run_delete_tasks(job):
+    """Delete every task of the job's intern"""
+    count = get_task_count(job.intern_id)
+    delete_all_tasks(job.intern_id)
+    job.report(1.0, f"Deleted {count} tasks")
+
+# Job functions take a RunningJob and return a result path or None
+JOB_KINDS = {
+    "csv_export": run_csv_export,
+    "excel_export": run_excel_export,
+    "backup": run_backup,
+    "restore": run_restore,
+    "delete_tasks": run_delete_tasks,
+}
+# Results that only depend on an intern's data, so a data version can reuse them
+CACHED_JOB_KINDS = {"csv_export", "excel_export"}
+
+current_job_runner = None
+current_job_runner_lock = threading.Lock()
+
+def get_job_runner():
+    """Get the process's job runner, starting it on first use"""
+    global current_job_runner
+    if current_job_runner is None:
+        with current_job_runner_lock:
+            if current_job_runner is None:
+                current_job_runner = JobRunner()
+    return current_job_runner
+
+def submit_job(kind, intern_id=None, **params):
+    """Queue a background job and return its ID
+
+    Exports of unchanged data reuse the earlier result, and a job already
+    queued or running for the same kind and intern is returned as is.
+    """
+    if kind in ("csv_export", "excel_export", "delete_tasks"):
+        intern_id = resolve_intern(intern_id)
+    cache_key = f"{kind}:{intern_id or ''}"
+    if kind in CACHED_JOB_KINDS:
+        data_version = get_backend().data_version(intern_id)
+        # Unversioned stores (session state) are always rerun
+        cache_key = None if data_version is None else f"{cache_key}:{data_version}"
+    elif params:
+        cache_key = None
+    return get_job_runner().submit(kind, intern_id, cache_key, **params)
+
+def get_job(job_id):
+    """Get a job's row (status, progress, message, result_path, error...), or None"""
+    return get_job_runner().get(job_id)
+
+def list_jobs(limit=20, intern_id=None):
+    """Get the latest jobs, newest first"""
+    return get_job_runner().recent(limit, intern_id)
+
+def cancel_job(job_id):
+    """Ask a job to stop; True if it was still queued or running"""
+    return get_job_runner().cancel(job_id)
+
+def read_job_result(job):
+    """Read a finished job's result file, or None if it is gone"""
+    if job["status"] != "done" or not job["result_path"]:
+        return None
+    try:
+        return Path(job["result_path"]).read_bytes()
+    except OSError:
+        return None